@@ -1,5 +1,5 @@
 from logging.config import fileConfig
-from app.database import Base
+from app.database import Base, DATABASE_URL
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
@@ -14,6 +14,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# La misma base que la app (DATABASE_URL, también desde .env); alembic.ini queda de respaldo
+if DATABASE_URL:
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -57,6 +61,12 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # Quien llama puede pasar su propia conexión (tests): config.attributes["connection"]
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_on(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -64,12 +74,16 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=Base.metadata, compare_type=True
-        )
+        _run_on(connection)
+
+
+def _run_on(connection) -> None:
+    context.configure(
+        connection=connection, target_metadata=Base.metadata, compare_type=True
+    )
 
-        with context.begin_transaction():
-            context.run_migrations()
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,99 @@
+"""Initial schema: professors, courses, modules, professor_courses and course_module_sessions
+
+Revision ID: 1f0c6a2b8e47
+Revises:
+Create Date: 2025-05-30 18:20:00.000000
+
+Las tablas tal como las creaba `Base.metadata.create_all` antes de la primera
+migración; session_number y todo lo posterior lo añaden las siguientes revisiones.
+Una base creada en su día con create_all ya tiene estas tablas: márcala con
+`alembic stamp cd276e41ac50` antes de `alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f0c6a2b8e47'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'professors',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('first_name', sa.String(), nullable=True),
+        sa.Column('last_name', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('bio', sa.String(), nullable=True),
+        sa.Column('specialties', sa.String(), nullable=True),
+        sa.Column('created_at', sa.Date(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.UniqueConstraint('email', name='professors_email_key'),
+    )
+    op.create_index('ix_professors_id', 'professors', ['id'])
+
+    op.create_table(
+        'courses',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('duration_months', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=True),
+        sa.Column('schedule', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+    )
+    op.create_index('ix_courses_id', 'courses', ['id'])
+    op.create_index('ix_courses_name', 'courses', ['name'], unique=True)
+
+    op.create_table(
+        'professor_courses',
+        sa.Column('professor_id', sa.Integer(), sa.ForeignKey('professors.id'), nullable=True),
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id'), nullable=True),
+    )
+
+    op.create_table(
+        'modules',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('order', sa.Integer(), nullable=True),
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('courses.id'), nullable=True),
+        sa.Column('syllabus_status', sa.String(), nullable=True),
+        sa.Column('observations', sa.String(), nullable=True),
+        sa.Column('professor_id', sa.Integer(), sa.ForeignKey('professors.id'), nullable=True),
+        sa.Column('hours', sa.Integer(), nullable=True),
+    )
+    op.create_index('ix_modules_id', 'modules', ['id'])
+
+    op.create_table(
+        'course_module_sessions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('date', sa.Date(), nullable=True),
+        sa.Column('status', sa.Enum('ACTIVE', 'INACTIVE', 'COMPLETED', name='sessionstatusenum'), nullable=True),
+        sa.Column('extra_note', sa.String(), nullable=True),
+        sa.Column('module_id', sa.Integer(), sa.ForeignKey('modules.id'), nullable=True),
+        sa.Column('hours', sa.Integer(), nullable=True),
+    )
+    op.create_index('ix_course_module_sessions_id', 'course_module_sessions', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_course_module_sessions_id', table_name='course_module_sessions')
+    op.drop_table('course_module_sessions')
+    op.drop_index('ix_modules_id', table_name='modules')
+    op.drop_table('modules')
+    op.drop_table('professor_courses')
+    op.drop_index('ix_courses_name', table_name='courses')
+    op.drop_index('ix_courses_id', table_name='courses')
+    op.drop_table('courses')
+    op.drop_index('ix_professors_id', table_name='professors')
+    op.drop_table('professors')
+    sa.Enum(name='sessionstatusenum').drop(op.get_bind(), checkfirst=True)
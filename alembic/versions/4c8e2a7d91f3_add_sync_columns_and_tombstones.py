@@ -0,0 +1,55 @@
+"""Add updated_at/sync_seq columns and sync_tombstones for delta sync
+
+Revision ID: 4c8e2a7d91f3
+Revises: d5755d16f1b9
+Create Date: 2026-10-19 16:40:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e2a7d91f3'
+down_revision: Union[str, None] = 'd5755d16f1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_TABLES = ('courses', 'modules', 'professors', 'course_module_sessions')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in SYNCED_TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.add_column(table, sa.Column('sync_seq', sa.BigInteger(), nullable=True))
+        # Las filas existentes van en la secuencia 0: solo llegan con una sincronización completa
+        op.execute(f'UPDATE {table} SET sync_seq = 0')
+        op.create_index(f'ix_{table}_sync_seq', table, ['sync_seq'])
+
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=True),
+        sa.Column('sync_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_sync_tombstones_sync_seq', 'sync_tombstones', ['sync_seq'])
+
+    data_versions = sa.table('data_versions', sa.column('table_name', sa.String), sa.column('version', sa.BigInteger))
+    op.bulk_insert(data_versions, [{'table_name': 'sync', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM data_versions WHERE table_name = 'sync'")
+    op.drop_index('ix_sync_tombstones_sync_seq', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+
+    for table in SYNCED_TABLES:
+        op.drop_index(f'ix_{table}_sync_seq', table_name=table)
+        op.drop_column(table, 'sync_seq')
+        op.drop_column(table, 'updated_at')
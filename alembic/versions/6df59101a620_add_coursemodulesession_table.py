@@ -1,7 +1,7 @@
 """Add CourseModuleSession table
 
 Revision ID: 6df59101a620
-Revises: 
+Revises: 1f0c6a2b8e47
 Create Date: 2025-05-31 01:46:08.635809
 """
 
@@ -13,7 +13,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '6df59101a620'
-down_revision: Union[str, None] = None
+down_revision: Union[str, None] = '1f0c6a2b8e47'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
@@ -0,0 +1,28 @@
+"""Add row version to courses
+
+Revision ID: 9a437c09579b
+Revises: 9fcfcdd2dd06
+Create Date: 2026-10-19 11:20:03.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a437c09579b'
+down_revision: Union[str, None] = '9fcfcdd2dd06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('courses', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('courses', 'version')
@@ -0,0 +1,58 @@
+"""Add deleted_at tombstones to courses, modules and professors
+
+Revision ID: 9b52784a4860
+Revises: cd276e41ac50
+Create Date: 2026-10-19 09:12:41.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b52784a4860'
+down_revision: Union[str, None] = 'cd276e41ac50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('courses', 'modules', 'professors'):
+        op.add_column(table, sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        op.create_index(f'ix_{table}_deleted_at', table, ['deleted_at'])
+
+    # Unicidad solo entre filas vivas, para poder recrear mientras se purgan las antiguas
+    op.drop_index('ix_courses_name', table_name='courses')
+    op.create_index('ix_courses_name', 'courses', ['name'])
+    op.create_index(
+        'uq_courses_name_live', 'courses', ['name'], unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+        sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+
+    # En modo batch para que también funcione en SQLite (que no altera constraints)
+    with op.batch_alter_table('professors') as batch:
+        batch.drop_constraint('professors_email_key', type_='unique')
+    op.create_index(
+        'uq_professors_email_live', 'professors', ['email'], unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+        sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_professors_email_live', table_name='professors')
+    with op.batch_alter_table('professors') as batch:
+        batch.create_unique_constraint('professors_email_key', ['email'])
+
+    op.drop_index('uq_courses_name_live', table_name='courses')
+    op.drop_index('ix_courses_name', table_name='courses')
+    op.create_index('ix_courses_name', 'courses', ['name'], unique=True)
+
+    for table in ('courses', 'modules', 'professors'):
+        op.drop_index(f'ix_{table}_deleted_at', table_name=table)
+        op.drop_column(table, 'deleted_at')
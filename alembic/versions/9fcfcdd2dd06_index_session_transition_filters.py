@@ -0,0 +1,34 @@
+"""Index the columns used by session transition filters
+
+Revision ID: 9fcfcdd2dd06
+Revises: 9b52784a4860
+Create Date: 2026-10-19 10:05:17.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fcfcdd2dd06'
+down_revision: Union[str, None] = '9b52784a4860'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_course_module_sessions_date', 'course_module_sessions', ['date'])
+    op.create_index('ix_course_module_sessions_module_id', 'course_module_sessions', ['module_id'])
+    op.create_index('ix_modules_course_id', 'modules', ['course_id'])
+    op.create_index('ix_modules_professor_id', 'modules', ['professor_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_modules_professor_id', table_name='modules')
+    op.drop_index('ix_modules_course_id', table_name='modules')
+    op.drop_index('ix_course_module_sessions_module_id', table_name='course_module_sessions')
+    op.drop_index('ix_course_module_sessions_date', table_name='course_module_sessions')
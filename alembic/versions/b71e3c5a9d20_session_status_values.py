@@ -0,0 +1,74 @@
+"""Store session status values (Programada, Confirmada...) in a session_status enum
+
+Revision ID: b71e3c5a9d20
+Revises: 4c8e2a7d91f3
+Create Date: 2026-10-20 09:12:40.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e3c5a9d20'
+down_revision: Union[str, None] = '4c8e2a7d91f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUSES = ('Programada', 'Cancelada', 'Recuperación', 'Confirmada', 'Falta profe', 'Pendiente')
+OLD_STATUSES = ('ACTIVE', 'INACTIVE', 'COMPLETED')
+
+# Etiquetas del tipo anterior (nombres del enum del modelo) -> valor equivalente de la API
+LEGACY = {'ACTIVE': 'Programada', 'INACTIVE': 'Cancelada', 'COMPLETED': 'Confirmada'}
+# Al volver atrás, los valores sin equivalente en el tipo anterior
+LEGACY_FALLBACK = "'ACTIVE'"
+
+
+def _case(mapping, otherwise, column='status'):
+    whens = ' '.join(f"WHEN '{old}' THEN '{new}'" for old, new in mapping.items())
+    return f'CASE {column} {whens} ELSE {otherwise} END'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        sa.Enum(*STATUSES, name='session_status').create(bind, checkfirst=True)
+        op.execute(
+            'ALTER TABLE course_module_sessions ALTER COLUMN status TYPE session_status '
+            f"USING ({_case(LEGACY, 'status::text', 'status::text')})::session_status"
+        )
+        op.execute('DROP TYPE IF EXISTS sessionstatusenum')
+        return
+
+    op.execute(f"UPDATE course_module_sessions SET status = {_case(LEGACY, 'status')}")
+    with op.batch_alter_table('course_module_sessions') as batch:
+        batch.alter_column(
+            'status',
+            existing_type=sa.Enum(*OLD_STATUSES, name='sessionstatusenum'),
+            type_=sa.Enum(*STATUSES, name='session_status'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    reverse = {new: old for old, new in LEGACY.items()}
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        sa.Enum(*OLD_STATUSES, name='sessionstatusenum').create(bind, checkfirst=True)
+        op.execute(
+            'ALTER TABLE course_module_sessions ALTER COLUMN status TYPE sessionstatusenum '
+            f"USING ({_case(reverse, LEGACY_FALLBACK, 'status::text')})::sessionstatusenum"
+        )
+        op.execute('DROP TYPE IF EXISTS session_status')
+        return
+
+    op.execute(f"UPDATE course_module_sessions SET status = {_case(reverse, LEGACY_FALLBACK)}")
+    with op.batch_alter_table('course_module_sessions') as batch:
+        batch.alter_column(
+            'status',
+            existing_type=sa.Enum(*STATUSES, name='session_status'),
+            type_=sa.Enum(*OLD_STATUSES, name='sessionstatusenum'),
+        )
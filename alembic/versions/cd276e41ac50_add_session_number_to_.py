@@ -18,13 +18,19 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# 6df59101a620 ya añade la columna, pero una base creada con create_all y marcada en
+# 6df59101a620 puede no tenerla: aquí solo se añade si falta.
+
+
 def upgrade() -> None:
-    op.add_column(
-        'course_module_sessions',
-        sa.Column('session_number', sa.Integer(), nullable=True)
-    )
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('course_module_sessions')}
+    if 'session_number' not in columns:
+        op.add_column(
+            'course_module_sessions',
+            sa.Column('session_number', sa.Integer(), nullable=True)
+        )
 
 
 def downgrade() -> None:
-    op.drop_column('course_module_sessions', 'session_number')
-
+    # La columna la quita el downgrade de 6df59101a620
+    pass
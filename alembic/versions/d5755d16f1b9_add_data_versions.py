@@ -0,0 +1,35 @@
+"""Add data_versions table with per-table version counters
+
+Revision ID: d5755d16f1b9
+Revises: 9a437c09579b
+Create Date: 2026-10-19 12:02:48.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5755d16f1b9'
+down_revision: Union[str, None] = '9a437c09579b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = ('courses', 'modules', 'professors', 'professor_courses', 'course_module_sessions')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    data_versions = op.create_table(
+        'data_versions',
+        sa.Column('table_name', sa.String(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.bulk_insert(data_versions, [{'table_name': name, 'version': 0} for name in TRACKED_TABLES])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('data_versions')
@@ -0,0 +1,264 @@
+"""Compresión de respuestas (gzip, y brotli/zstd si están instalados).
+
+`CompressionMiddleware` comprime las respuestas de los tipos de `COMPRESSIBLE_TYPES`
+a partir de `MIN_BYTES`, con la mejor codificación que acepte el cliente en
+`Accept-Encoding`. Las respuestas con ETag (sus bytes dependen solo de la ruta y de
+las versiones de datos) se comprimen una sola vez por codificación y por versión: el
+resultado queda en una LRU con clave ruta + query + ETag, así que junto con
+response_cache cada representación se calcula y se comprime una vez. Esas se comprimen
+con un nivel más alto, ya que el coste se paga una sola vez; las demás con uno rápido.
+
+Las respuestas en streaming se comprimen a medida que salen: cada trozo se vacía del
+compresor (sync flush) antes de enviarlo, así el cliente lo puede descomprimir y
+procesar sin esperar al resto de la exportación.
+"""
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # opcional: ver requirements.txt
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # opcional
+    zstandard = None
+
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/x-ndjson",
+    "application/problem+json",
+    "text/",
+)
+
+# Preferencia a igual calidad en Accept-Encoding
+CODINGS = [coding for coding, available in (("br", brotli), ("zstd", zstandard), ("gzip", zlib)) if available]
+
+# (nivel rápido, nivel para respuestas cacheadas)
+LEVELS = {"br": (4, 9), "zstd": (3, 12), "gzip": (5, 9)}
+
+
+def compress(body, coding, cached=False):
+    level = LEVELS[coding][cached]
+    if coding == "br":
+        return brotli.compress(body, quality=level)
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress(body) + compressor.flush()
+
+
+class _StreamCompressor:
+    """Incremental compressor with a common chunk/last interface for every coding"""
+
+    def __init__(self, coding):
+        level = LEVELS[coding][0]
+        if coding == "br":
+            compressor = brotli.Compressor(quality=level)
+            self._compress, self._sync, self._finish = compressor.process, compressor.flush, compressor.finish
+        elif coding == "zstd":
+            compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            self._compress, self._finish = compressor.compress, compressor.flush
+            self._sync = lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+            self._compress, self._finish = compressor.compress, compressor.flush
+            self._sync = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def chunk(self, data):
+        """Compressed bytes for `data`, flushed so the client can decode them right away"""
+        if not data:
+            return b""
+        return self._compress(data) + self._sync()
+
+    def last(self, data):
+        """Compressed bytes for the final `data` plus the end of the stream"""
+        return self._compress(data) + self._finish()
+
+
+def negotiate(accept_encoding):
+    """Best available coding for an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    best, best_quality = None, 0.0
+    for coding in CODINGS:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+# ---------- CACHÉ DE CUERPOS COMPRIMIDOS ----------
+
+_lock = threading.Lock()
+_entries: OrderedDict = OrderedDict()
+_size = 0
+_stats = {"compressed": 0, "hits": 0, "streamed": 0, "bytes_in": 0, "bytes_out": 0, "evictions": 0}
+
+
+def _cached(key):
+    with _lock:
+        body = _entries.get(key)
+        if body is not None:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+        return body
+
+
+def _store(key, body):
+    global _size
+    if len(body) > CACHE_MAX_BYTES // 4:
+        return
+    with _lock:
+        previous = _entries.pop(key, None)
+        if previous is not None:
+            _size -= len(previous)
+        _entries[key] = body
+        _size += len(body)
+        while _size > CACHE_MAX_BYTES:
+            _, evicted = _entries.popitem(last=False)
+            _size -= len(evicted)
+            _stats["evictions"] += 1
+
+
+def _count(body, compressed):
+    with _lock:
+        _stats["compressed"] += 1
+        _stats["bytes_in"] += len(body)
+        _stats["bytes_out"] += len(compressed)
+
+
+def stats():
+    with _lock:
+        ratio = _stats["bytes_in"] / _stats["bytes_out"] if _stats["bytes_out"] else None
+        return {**_stats, "ratio": ratio, "entries": len(_entries), "bytes": _size, "codings": CODINGS}
+
+
+# ---------- MIDDLEWARE ----------
+
+def _compressible(headers):
+    if b"content-encoding" in headers:
+        return False
+    content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+    # Los eventos SSE tienen que salir en cuanto se emiten: el compresor los retendría
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+
+
+def _with_encoding(raw_headers, coding, length=None):
+    headers = []
+    vary = None
+    for name, value in raw_headers:
+        lowered = name.lower()
+        if lowered == b"content-length":
+            continue
+        if lowered == b"vary":
+            vary = value
+            continue
+        if lowered == b"etag" and not value.startswith(b"W/"):
+            # Los bytes ya no son los de la ETag fuerte; versions acepta la forma débil en If-None-Match
+            value = b"W/" + value
+        headers.append((name, value))
+    headers.append((b"content-encoding", coding.encode()))
+    headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    if length is not None:
+        headers.append((b"content-length", str(length).encode()))
+    return headers
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses, once per ETag for cacheable ones"""
+
+    def __init__(self, app, min_bytes=MIN_BYTES):
+        self.app = app
+        self.min_bytes = min_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == b"accept-encoding"), None
+        )
+        coding = negotiate(accept_encoding)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        stream = None
+
+        async def compressing_send(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if stream is not None:
+                body = message.get("body", b"")
+                body = stream.chunk(body) if message.get("more_body", False) else stream.last(body)
+                await send({**message, "body": body})
+                return
+
+            if start is None:
+                await send(message)
+                return
+            response_start, start = start, None
+            headers = dict((name.lower(), value) for name, value in response_start["headers"])
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if response_start["status"] < 200 or response_start["status"] in (204, 304) or not _compressible(headers):
+                await send(response_start)
+                await send(message)
+                return
+
+            if more_body:
+                # Streaming: se comprime cada trozo según llega
+                stream = _StreamCompressor(coding)
+                with _lock:
+                    _stats["streamed"] += 1
+                await send({**response_start, "headers": _with_encoding(response_start["headers"], coding)})
+                await send({**message, "body": stream.chunk(body)})
+                return
+
+            if len(body) < self.min_bytes:
+                await send(response_start)
+                await send(message)
+                return
+
+            etag = headers.get(b"etag")
+            key = (scope["path"], scope["query_string"], etag, coding) if etag and response_start["status"] == 200 else None
+            compressed = _cached(key) if key is not None else None
+            if compressed is None:
+                compressed = compress(body, coding, cached=key is not None)
+                _count(body, compressed)
+                if key is not None:
+                    _store(key, compressed)
+            await send({
+                **response_start,
+                "headers": _with_encoding(response_start["headers"], coding, len(compressed)),
+            })
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
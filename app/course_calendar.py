@@ -0,0 +1,113 @@
+"""Expansión del horario de un curso a fechas concretas de clase, saltando feriados de Perú.
+
+`holidays` y `dateutil` se importan recién al expandir un horario: cargan decenas de
+módulos y cada worker los pagaría al arrancar aunque la caché en caliente ya tenga
+las fechas.
+"""
+import datetime
+import functools
+import re
+import unicodedata
+from importlib.metadata import version
+
+from app import warm_cache
+
+# Cambia si se actualiza la librería de feriados: invalida todas las fechas cacheadas
+HOLIDAY_CALENDAR_VERSION = f"PE-{version('holidays')}"
+
+
+@functools.cache
+def peru_holidays():
+    import holidays
+    return holidays.country_holidays("PE")
+
+# Mapa de bits de feriados (un bit por día desde el 1 de enero de FIRST_YEAR); fuera
+# del rango se consulta la librería
+FIRST_YEAR, LAST_YEAR = 2015, 2040
+_BITMAP_START = datetime.date(FIRST_YEAR, 1, 1).toordinal()
+_bitmap = None
+
+# Fechas ya expandidas: (inicio, meses, horario) -> tupla de fechas
+_expanded = {}
+MAX_EXPANDED = 10000
+
+# Lógica para convertir string tipo "Lunes y Miércoles" a días numéricos
+days_map = {
+    "lunes": 0,
+    "martes": 1,
+    "miércoles": 2,
+    "miercoles": 2,
+    "jueves": 3,
+    "viernes": 4,
+    "sábado": 5,
+    "sabado": 5,
+    "domingo": 6
+}
+
+def parse_days(schedule_str: str):
+    if not schedule_str:
+        return []
+    normalized = unicodedata.normalize("NFKD", schedule_str.lower()).encode("ASCII", "ignore").decode("utf-8")
+    words = re.findall(r'\b[a-z]+', normalized)  # extrae solo palabras como "lunes", "sabado", etc.
+    return [days_map[day] for day in days_map if day in words]
+
+def holiday_bitmap():
+    global _bitmap
+    if _bitmap is None:
+        import holidays
+        bitmap = bytearray((datetime.date(LAST_YEAR + 1, 1, 1).toordinal() - _BITMAP_START + 7) // 8)
+        for day in holidays.country_holidays("PE", years=range(FIRST_YEAR, LAST_YEAR + 1)):
+            position = day.toordinal() - _BITMAP_START
+            bitmap[position >> 3] |= 1 << (position & 7)
+        _bitmap = bytes(bitmap)
+        warm_cache.touch()
+    return _bitmap
+
+
+def is_holiday(day):
+    position = day.toordinal() - _BITMAP_START
+    bitmap = holiday_bitmap()
+    if 0 <= position < len(bitmap) * 8:
+        return bool(bitmap[position >> 3] >> (position & 7) & 1)
+    return day in peru_holidays()
+
+
+def class_days(start_date, duration_months, schedule):
+    """Dates of every class day between start_date and the end of the course, skipping holidays"""
+    key = (start_date, duration_months, schedule)
+    days = _expanded.get(key)
+    if days is None:
+        from dateutil.relativedelta import relativedelta
+        from dateutil.rrule import rrule, WEEKLY
+        end = start_date + relativedelta(months=duration_months)
+        weekdays = parse_days(schedule)
+        days = tuple(
+            dt.date()
+            for dt in rrule(WEEKLY, byweekday=weekdays, dtstart=start_date, until=end)
+            if not is_holiday(dt.date())
+        )
+        if len(_expanded) >= MAX_EXPANDED:
+            _expanded.clear()
+        _expanded[key] = days
+        warm_cache.touch()
+    return list(days)
+
+def expand_sessions(start_date, duration_months, schedule):
+    """ISO dates of every class day between start_date and the end of the course, skipping holidays"""
+    return [day.isoformat() for day in class_days(start_date, duration_months, schedule)]
+
+
+def _restore(data):
+    global _bitmap
+    # Las fechas dependen solo de los argumentos y del calendario de feriados
+    if data["calendar"] != HOLIDAY_CALENDAR_VERSION:
+        return
+    _bitmap = data["bitmap"]
+    _expanded.update(data["expanded"])
+
+
+warm_cache.register(
+    "calendar",
+    lambda: {"calendar": HOLIDAY_CALENDAR_VERSION, "bitmap": _bitmap, "expanded": dict(_expanded)},
+    _restore,
+)
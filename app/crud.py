@@ -1,14 +1,14 @@
 from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
-from dateutil.relativedelta import relativedelta
-from app import models, schemas
-import holidays
-import pytz
+from app import course_calendar, models, schemas
 
-peru_tz = pytz.timezone("America/Lima")
-peru_holidays = holidays.country_holidays("PE")
+# pytz, holidays y dateutil se importan dentro de las funciones que los usan (arranque rápido)
 
 def expand_course_schedule(course):
+    import pytz
+    from dateutil.relativedelta import relativedelta
+    peru_tz = pytz.timezone("America/Lima")
     events = []
     start = peru_tz.localize(datetime.combine(course.start_date, datetime.min.time()))
     end = start + relativedelta(months=course.duration_months)
@@ -17,14 +17,14 @@ def expand_course_schedule(course):
     current = start
     while current <= end:
         current_date = current.date()
-        if current.weekday() in days and current_date not in peru_holidays:
+        if current.weekday() in days and not course_calendar.is_holiday(current_date):
             events.append({
     "title": course.name,
     "date": current.date().strftime("%Y-%m-%d"),  # 👈🏼 evita todo el drama de timezone
     "category": course.category,
     "id": course.id
 })
-        elif current.weekday() in days and current_date in peru_holidays:
+        elif current.weekday() in days and course_calendar.is_holiday(current_date):
             end += timedelta(days=1)
         current += timedelta(days=1)
 
@@ -60,6 +60,94 @@ def create_course(db: Session, course: schemas.CourseCreate):
     return db_course
 
 
+# ---------- CARGA MASIVA ----------
+# Cada función procesa un lote ya validado, con una consulta IN por lote, y deja el commit al llamador.
+
+def _parse_bulk_date(value):
+    try:
+        if value and value.lower() != "próximamente":
+            return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        pass
+    return None
+
+
+def bulk_create_courses(db: Session, entries: list[schemas.CourseBulkCreate]):
+    names = {entry.name for entry in entries}
+    existing = set(db.execute(select(models.Course.name).where(models.Course.name.in_(names))).scalars())
+
+    created = []
+    for entry in entries:
+        if entry.name in existing:
+            continue
+        db.add(models.Course(
+            name=entry.name,
+            duration_months=entry.duration_months,
+            start_date=_parse_bulk_date(entry.start_date),
+            schedule=entry.schedule,
+            category=entry.category,
+        ))
+        existing.add(entry.name)
+        created.append(entry.name)
+    return created
+
+
+def bulk_create_modules(db: Session, entries: list[schemas.BulkModuleEntry]):
+    course_names = {entry.course_name for entry in entries}
+    courses = {
+        course.name: course
+        for course in db.query(models.Course).filter(models.Course.name.in_(course_names))
+    }
+    existing = set(db.execute(
+        select(models.Module.course_id, models.Module.name)
+        .where(models.Module.course_id.in_([course.id for course in courses.values()]))
+    ).tuples())
+
+    created = []
+    for entry in entries:
+        course = courses.get(entry.course_name)
+        if not course:
+            continue
+        for mod_data in entry.modules:
+            if (course.id, mod_data.name) in existing:
+                continue
+            db.add(models.Module(name=mod_data.name, order=mod_data.order, course_id=course.id))
+            existing.add((course.id, mod_data.name))
+            created.append(f"{course.name} - {mod_data.name}")
+    return created
+
+
+def bulk_create_professors(db: Session, entries: list[schemas.ProfessorCreate]):
+    names = {entry.name for entry in entries}
+    existing = set(db.execute(select(models.Professor.name).where(models.Professor.name.in_(names))).scalars())
+    course_names = {course_name for entry in entries for course_name in entry.course_names}
+    courses = {
+        course.name: course
+        for course in db.query(models.Course).filter(models.Course.name.in_(course_names))
+    } if course_names else {}
+
+    created = []
+    for entry in entries:
+        if entry.name in existing:
+            continue
+        new_prof = models.Professor(name=entry.name)
+        new_prof.courses = [courses[name] for name in dict.fromkeys(entry.course_names) if name in courses]
+        db.add(new_prof)
+        existing.add(entry.name)
+        created.append(entry.name)
+    return created
+
+
+def bulk_create_sessions(db: Session, entries: list[schemas.CourseModuleSessionCreate]):
+    module_ids = {entry.module_id for entry in entries}
+    known = set(db.execute(select(models.Module.id).where(models.Module.id.in_(module_ids))).scalars())
+
+    rows = [entry.dict() for entry in entries if entry.module_id in known]
+    if rows:
+        db.execute(insert(models.CourseModuleSession), rows)
+    return [f"{row['module_id']} - {row['session_number']}" for row in rows]
+
+
 def get_courses(db: Session, skip: int = 0, limit: int = 100):
     courses = db.query(models.Course).offset(skip).limit(limit).all()
     print("Cargando cursos desde DB:", courses)
@@ -70,9 +158,52 @@ def get_courses(db: Session, skip: int = 0, limit: int = 100):
 def get_course(db: Session, course_id: int):
     return db.query(models.Course).filter(models.Course.id == course_id).first()
 
+# ---------- PROFESORES ↔ CURSOS ----------
+
+def _sync_links(db: Session, owner_column, owner_id: int, target_column, target_ids):
+    """Make the professor_courses rows of one owner match target_ids, touching only the difference"""
+    links = models.professor_courses
+    current = set(db.execute(select(target_column).where(owner_column == owner_id)).scalars())
+    desired = set(target_ids)
+
+    to_remove = current - desired
+    to_add = desired - current
+    if to_remove:
+        db.execute(delete(links).where(owner_column == owner_id, target_column.in_(to_remove)))
+    if to_add:
+        db.execute(
+            insert(links),
+            [{owner_column.name: owner_id, target_column.name: target_id} for target_id in to_add],
+        )
+    return to_add, to_remove
+
+
+def sync_course_professors(db: Session, course: models.Course, professor_ids: list[int]):
+    """Link a course to exactly the given professors (unknown IDs are ignored)"""
+    existing_ids = db.execute(
+        select(models.Professor.id).where(models.Professor.id.in_(professor_ids))
+    ).scalars() if professor_ids else []
+    links = models.professor_courses
+    result = _sync_links(db, links.c.course_id, course.id, links.c.professor_id, existing_ids)
+    db.expire(course, ["professors"])
+    return result
+
+
+def sync_professor_courses(db: Session, professor: models.Professor, course_names: list[str]):
+    """Link a professor to exactly the named courses (unknown names are ignored)"""
+    course_ids = db.execute(
+        select(models.Course.id).where(models.Course.name.in_(course_names))
+    ).scalars() if course_names else []
+    links = models.professor_courses
+    result = _sync_links(db, links.c.professor_id, professor.id, links.c.course_id, course_ids)
+    db.expire(professor, ["courses"])
+    return result
+
+
 def generar_sesiones_para_curso(db: Session, course: models.Course):
     if not course.start_date or not course.schedule:
         return
+    from dateutil.relativedelta import relativedelta
 
     dias_semana = {
         "Lunes": 0,
@@ -92,7 +223,7 @@ def generar_sesiones_para_curso(db: Session, course: models.Course):
     for module in course.modules:
         fecha_actual = course.start_date  # Reiniciamos para cada módulo
         while fecha_actual <= fecha_fin:
-            if fecha_actual.weekday() in dias and fecha_actual not in peru_holidays:
+            if fecha_actual.weekday() in dias and not course_calendar.is_holiday(fecha_actual):
                 session = models.CourseModuleSession(
                     session_number=session_number,
                     date=fecha_actual,
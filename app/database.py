@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+import contextlib
+import contextvars
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -13,9 +15,45 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Sesión compartida por las subpeticiones de POST /batch; fuera de un batch no hay ninguna
+_shared_session = contextvars.ContextVar("shared_session", default=None)
+
 def get_db():
+    shared = _shared_session.get()
+    if shared is not None:
+        # La sesión es del batch: él decide cuándo confirmar y cerrarla
+        yield shared
+        return
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Escrituras ya enviadas a la base pero sin confirmar: se pueden deshacer todavía
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_flushed(session, flush_context):
+    session.info["flushed"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(SessionLocal, "after_rollback")
+def _clear_flushed(session):
+    session.info.pop("flushed", None)
+
+def sees_uncommitted(db=None):
+    """True if `db` (by default the batch session of this request) may read writes that can still be rolled back
+
+    The caches skip both reads and writes then: nothing they keep may outlive a rollback.
+    """
+    if db is None:
+        db = _shared_session.get()
+    return db is not None and (db.info.get("atomic", False) or db.info.get("flushed", False))
+
+@contextlib.contextmanager
+def shared_session(db):
+    """Make get_db hand out `db` to every request dispatched inside this block"""
+    token = _shared_session.set(db)
+    try:
+        yield db
+    finally:
+        _shared_session.reset(token)
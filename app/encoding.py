@@ -0,0 +1,385 @@
+"""Codificación JSON rápida de respuestas, sin volver a validar datos de confianza.
+
+`serializer(modelo)` compila, una vez por esquema, una función que toma los campos
+del esquema de dicts u objetos (ORM, registros del catálogo) y produce los bytes con
+orjson, sin pasar por la validación de Pydantic. `FastJSONRoute` la aplica a todas
+las rutas de un router con `APIRouter(..., route_class=encoding.FastJSONRoute)`:
+la respuesta sale con la forma del `response_model`, pero los tipos no se comprueban,
+así que solo conviene en routers cuyos handlers ya devuelven datos correctos.
+
+Sin orjson instalado se usa `json` de la librería estándar (más lento, mismo formato).
+
+`NegotiatedRoute` añade MessagePack: responde en `application/msgpack` si el cliente
+lo pide en `Accept` (con `; dates=int` las fechas van como días desde 1970-01-01 y
+los datetime como segundos Unix) y acepta cuerpos MessagePack en vez de JSON. El
+formato elegido queda en `current_format()` para que las cachés lo usen como clave.
+Todas sus respuestas, JSON incluido, llevan `Vary: Accept`.
+"""
+import asyncio
+import calendar
+import contextlib
+import contextvars
+import datetime
+import enum
+import functools
+import inspect
+import json
+import types
+import typing
+
+from fastapi import HTTPException, Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+try:
+    import orjson
+except ImportError:  # opcional: ver requirements.txt
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # opcional: sin msgpack se responde siempre JSON
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+MSGPACK_INT_DATES = "msgpack;dates=int"
+MSGPACK_TYPES = {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+MEDIA_TYPES = {JSON: "application/json", MSGPACK: "application/msgpack", MSGPACK_INT_DATES: "application/msgpack"}
+
+_format = contextvars.ContextVar("response_format", default=JSON)
+
+
+def _default(value):
+    if isinstance(value, memoryview):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if orjson is None:
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, enum.Enum):
+            return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(value) -> bytes:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(value) -> bytes:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+
+def _msgpack_default(value, int_dates=False):
+    if isinstance(value, datetime.datetime):
+        if int_dates:
+            return calendar.timegm(value.utctimetuple())
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return value.toordinal() - _EPOCH if int_dates else value.isoformat()
+    if isinstance(value, datetime.time):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def _msgpack_int_dates(value):
+    return _msgpack_default(value, int_dates=True)
+
+
+def encode(value, response_format=None) -> bytes:
+    """Encode plain data in `response_format` (the negotiated one by default)"""
+    response_format = response_format or _format.get()
+    if response_format == JSON:
+        return dumps(value)
+    default = _msgpack_int_dates if response_format == MSGPACK_INT_DATES else _msgpack_default
+    # Las vistas de memoria (IDs del catálogo) irían como binario: se pasan a lista
+    if isinstance(value, memoryview):
+        value = value.tolist()
+    return msgpack.packb(value, default=default, use_bin_type=True)
+
+
+def media_type(response_format=None):
+    return MEDIA_TYPES[response_format or _format.get()]
+
+
+def current_format():
+    return _format.get()
+
+
+@contextlib.contextmanager
+def use_format(response_format):
+    token = _format.set(response_format)
+    try:
+        yield
+    finally:
+        _format.reset(token)
+
+
+def negotiate(accept):
+    """Response format preferred by an Accept header: MessagePack only if asked for and available"""
+    if not accept or msgpack is None:
+        return JSON
+    best, best_quality = JSON, 0.0
+    for position, item in enumerate(accept.split(",")):
+        media, *params = [part.strip() for part in item.split(";")]
+        options = dict(param.partition("=")[::2] for param in params)
+        try:
+            quality = float(options.get("q", 1))
+        except ValueError:
+            quality = 0.0
+        if media.lower() in MSGPACK_TYPES:
+            candidate = MSGPACK_INT_DATES if options.get("dates") == "int" else MSGPACK
+        elif media.lower() in ("application/json", "application/*", "*/*"):
+            candidate = JSON
+        else:
+            continue
+        # A igual calidad gana el primero de la lista
+        if quality > best_quality:
+            best, best_quality = candidate, quality
+    return best
+
+
+def tag_variant(tag, response_format=None):
+    """ETag of the representation in `response_format`: JSON keeps the plain tag"""
+    response_format = response_format or _format.get()
+    if response_format == JSON:
+        return tag
+    return tag[:-1] + "-" + response_format.replace(";dates=", "-") + '"'
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson (stdlib json as a fallback)"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+# ---------- SERIALIZADORES POR ESQUEMA ----------
+
+def _identity(value):
+    return value
+
+
+def _compile_model(model):
+    fields = []
+    for name, field in model.model_fields.items():
+        if field.default_factory is not None:
+            default = field.default_factory
+            call_default = True
+        else:
+            default = None if field.default is PydanticUndefined else field.default
+            call_default = False
+        fields.append((name, field.serialization_alias or field.alias or name, _compile(field.annotation), default, call_default))
+
+    missing = object()
+
+    def encode(value):
+        if value is None:
+            return None
+        if isinstance(value, dict):
+            get = value.get
+        else:
+            def get(name, fallback):
+                return getattr(value, name, fallback)
+        result = {}
+        for name, key, encode_field, default, call_default in fields:
+            item = get(name, missing)
+            if item is missing:
+                item = default() if call_default else default
+            result[key] = encode_field(item) if encode_field is not _identity else item
+        return result
+
+    return encode
+
+
+def _compile_list(item_type):
+    encode_item = _compile(item_type)
+    if encode_item is _identity:
+        return _identity
+
+    def encode(value):
+        return None if value is None else [encode_item(item) for item in value]
+
+    return encode
+
+
+def _compile(annotation):
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _compile_model(annotation)
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin in (list, set, frozenset, tuple, typing.Sequence) and args:
+        return _compile_list(args[0])
+    if origin in (typing.Union, types.UnionType):
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1:
+            return _compile(options[0])
+    # Escalares, dicts y uniones mixtas se pasan tal cual a orjson
+    return _identity
+
+
+class Plain:
+    """Data already shaped for the response: encoded as is, without the response_model's fields and defaults"""
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+
+@functools.cache
+def _encoder(response_model):
+    # Rutas con varias formas (Union): sin Plain el handler devuelve la primera; las demás van en Plain
+    if typing.get_origin(response_model) in (typing.Union, types.UnionType):
+        response_model = typing.get_args(response_model)[0]
+    return _compile(response_model)
+
+
+def serializer(response_model):
+    """Precompiled `data -> bytes` for `response_model` that trusts the data instead of validating it
+
+    The bytes are in the negotiated format (see `current_format`), JSON by default.
+    """
+    to_plain = _encoder(response_model)
+    return lambda data: encode(data.data if isinstance(data, Plain) else to_plain(data))
+
+
+def _vary_on_accept(headers):
+    """Add Accept to the Vary header: JSON and MessagePack share the URL, so caches must key on it"""
+    current = headers.get("vary")
+    if current is None:
+        headers["Vary"] = "Accept"
+    elif "accept" not in {item.strip().lower() for item in current.split(",")}:
+        headers["Vary"] = current + ", Accept"
+
+
+def render(body, status_code=200):
+    """Response for bytes produced by `encode`/`serializer` in the negotiated format"""
+    # También en JSON: una caché compartida no debe servir esta variante a quien pide MessagePack
+    if _format.get() == JSON:
+        return FastJSONResponse(body, status_code=status_code, headers={"Vary": "Accept"})
+    return Response(body, status_code=status_code, media_type=media_type(), headers={"Vary": "Accept"})
+
+
+class FastJSONRoute(APIRoute):
+    """Route class that encodes the endpoint result with `serializer(response_model)`"""
+
+    def __init__(self, path, endpoint, **kwargs):
+        response_model = kwargs.get("response_model")
+        # Sin response_model explícito la ruta sigue con la codificación de FastAPI
+        explicit = response_model is not None and not isinstance(response_model, DefaultPlaceholder)
+        # include_router vuelve a crear la ruta con el endpoint ya envuelto
+        if explicit and not getattr(endpoint, "fast_json", False) and not (isinstance(response_model, type) and issubclass(response_model, Response)):
+            endpoint = self._wrap(endpoint, response_model, kwargs.get("status_code") or 200)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _wrap(endpoint, response_model, status_code):
+        encode_result = serializer(response_model)
+
+        def respond(result, sub_response):
+            # Los handlers que ya devuelven una Response (caché, streaming) pasan sin cambios
+            if isinstance(result, Response):
+                return result
+            response = render(encode_result(result), status_code=sub_response.status_code or status_code)
+            # Cabeceras puestas por las dependencias (ETag...), como hace FastAPI con su respuesta
+            response.headers.raw.extend(sub_response.headers.raw)
+            return response
+
+        # FastAPI inyecta la respuesta temporal donde escriben las dependencias en el único
+        # parámetro anotado como Response: se reutiliza el del endpoint si ya lo tiene
+        signature = inspect.signature(endpoint)
+        own = next((name for name, param in signature.parameters.items() if param.annotation is Response), None)
+        name = own or "_sub_response"
+
+        def split(kwargs):
+            return kwargs if own else {key: value for key, value in kwargs.items() if key != name}
+
+        if asyncio.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapper(*args, **kwargs):
+                return respond(await endpoint(*args, **split(kwargs)), kwargs[name])
+        else:
+            @functools.wraps(endpoint)
+            def wrapper(*args, **kwargs):
+                return respond(endpoint(*args, **split(kwargs)), kwargs[name])
+
+        if not own:
+            wrapper.__signature__ = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+            ])
+        wrapper.fast_json = True
+        return wrapper
+
+
+# ---------- NEGOCIACIÓN MESSAGEPACK ----------
+
+class _MsgPackRequest(Request):
+    """Request whose MessagePack body FastAPI reads as if it were JSON"""
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            try:
+                self._json = msgpack.unpackb(await self.body(), raw=False)
+            except (ValueError, msgpack.UnpackException):
+                raise HTTPException(status_code=400, detail="Invalid MessagePack body")
+        return self._json
+
+
+def _as_json_request(request):
+    headers = [
+        (name, b"application/json") if name == b"content-type" else (name, value)
+        for name, value in request.scope["headers"]
+    ]
+    return _MsgPackRequest({**request.scope, "headers": headers}, request.receive)
+
+
+class NegotiatedRoute(FastJSONRoute):
+    """FastJSONRoute that also speaks MessagePack, chosen by the Accept / Content-Type headers"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request):
+            content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type in MSGPACK_TYPES:
+                if msgpack is None:
+                    raise HTTPException(status_code=415, detail="MessagePack is not available on this server")
+                request = _as_json_request(request)
+
+            with use_format(negotiate(request.headers.get("accept"))):
+                try:
+                    response = await handler(request)
+                except HTTPException as exc:
+                    # 304 de la ETag y errores: la respuesta también depende de Accept
+                    exc.headers = {"Vary": "Accept", **(exc.headers or {})}
+                    raise
+                # Rutas sin response_model: FastAPI ya codificó en JSON, se convierte el cuerpo
+                if current_format() != JSON and response.media_type == "application/json" and getattr(response, "body", None):
+                    response = _reencode(response)
+            _vary_on_accept(response.headers)
+            return response
+
+        return negotiated_handler
+
+
+def _reencode(response):
+    data = orjson.loads(response.body) if orjson is not None else json.loads(response.body)
+    converted = Response(encode(data), status_code=response.status_code, media_type=media_type())
+    for name, value in response.raw_headers:
+        if name not in (b"content-type", b"content-length"):
+            converted.raw_headers.append((name, value))
+    return converted
@@ -0,0 +1,177 @@
+"""Caché read-through de entidades sueltas (curso, módulo, profesor) por ID y por nombre.
+
+Guarda instantáneas de solo lectura con los valores de columna, con TTL y límite LRU.
+Se invalida sola tras cada commit que toca la tabla (ver versions.add_listener), así
+que los handlers pueden usarla para búsquedas puntuales; para modificar una fila
+sigue haciendo falta cargarla con el ORM. Una sesión que puede ver escrituras sin
+confirmar (batch atómico, flush pendiente) lee de la base sin pasar por la caché.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app import models, versions
+from app.database import sees_uncommitted
+
+TTL_SECONDS = float(os.getenv("ENTITY_CACHE_TTL_SECONDS", "300"))
+# Con app.notify escuchando, los cambios de otros workers también invalidan: el TTL puede ser largo
+LIVE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_LIVE_TTL_SECONDS", "3600"))
+MAX_ENTRIES = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "10000"))
+
+_MODELS = {
+    "courses": models.Course,
+    "modules": models.Module,
+    "professors": models.Professor,
+}
+
+_lock = threading.Lock()
+_by_id: OrderedDict = OrderedDict()  # (tabla, id) -> (expira, instantánea)
+_by_name: dict = {}  # (tabla, nombre) -> id
+_stats = {table: {"hits": 0, "misses": 0} for table in _MODELS}
+# Sube con cada invalidación: una carga que empezó antes no debe guardar datos viejos
+_generation = dict.fromkeys(_MODELS, 0)
+
+
+def _snapshot(obj):
+    return MappingProxyType({attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs})
+
+
+def _get(table, entity_id):
+    with _lock:
+        cached = _by_id.get((table, entity_id))
+        if cached is not None and cached[0] > time.monotonic():
+            _by_id.move_to_end((table, entity_id))
+            _stats[table]["hits"] += 1
+            return cached[1]
+        _stats[table]["misses"] += 1
+        return None
+
+
+def _put(table, snapshot, generation):
+    with _lock:
+        if _generation[table] != generation:
+            return
+        ttl = LIVE_TTL_SECONDS if versions.is_live() else TTL_SECONDS
+        _by_id[(table, snapshot["id"])] = (time.monotonic() + ttl, snapshot)
+        _by_id.move_to_end((table, snapshot["id"]))
+        if "name" in snapshot:
+            _by_name[(table, snapshot["name"])] = snapshot["id"]
+        while len(_by_id) > MAX_ENTRIES:
+            (evicted_table, _), evicted = _by_id.popitem(last=False)
+            _by_name.pop((evicted_table, evicted[1].get("name")), None)
+
+
+def get(db: Session, table: str, entity_id):
+    """Snapshot of one row by ID, or None if it does not exist"""
+    if entity_id is None:
+        return None
+    bypass = sees_uncommitted(db)
+    snapshot = None if bypass else _get(table, entity_id)
+    if snapshot is None:
+        generation = _generation[table]
+        model = _MODELS[table]
+        obj = db.query(model).filter(model.id == entity_id).first()
+        if obj is None:
+            return None
+        snapshot = _snapshot(obj)
+        # Un objeto con cambios sin confirmar en esta sesión no se cachea
+        if not bypass and not db.is_modified(obj):
+            _put(table, snapshot, generation)
+    return snapshot
+
+
+def get_by_name(db: Session, table: str, name: str):
+    """Snapshot of one row by its name, or None if it does not exist"""
+    bypass = sees_uncommitted(db)
+    with _lock:
+        entity_id = None if bypass else _by_name.get((table, name))
+    if entity_id is not None:
+        snapshot = _get(table, entity_id)
+        # Si se renombró, la entrada por nombre ya no vale
+        if snapshot is not None and snapshot["name"] == name:
+            return snapshot
+    else:
+        with _lock:
+            _stats[table]["misses"] += 1
+
+    generation = _generation[table]
+    model = _MODELS[table]
+    obj = db.query(model).filter(model.name == name).first()
+    if obj is None:
+        return None
+    snapshot = _snapshot(obj)
+    if not bypass and not db.is_modified(obj):
+        _put(table, snapshot, generation)
+    return snapshot
+
+
+def course(db: Session, course_id):
+    return get(db, "courses", course_id)
+
+
+def module(db: Session, module_id):
+    return get(db, "modules", module_id)
+
+
+def professor(db: Session, professor_id):
+    return get(db, "professors", professor_id)
+
+
+def course_by_name(db: Session, name: str):
+    return get_by_name(db, "courses", name)
+
+
+def professor_by_name(db: Session, name: str):
+    return get_by_name(db, "professors", name)
+
+
+def invalidate(table: str, ids=None):
+    """Drop cached rows of `table` (all of them when `ids` is None)"""
+    if table not in _MODELS:
+        return
+    with _lock:
+        _generation[table] += 1
+        if ids is None:
+            keys = [key for key in _by_id if key[0] == table]
+        else:
+            keys = [(table, entity_id) for entity_id in ids]
+        for key in keys:
+            cached = _by_id.pop(key, None)
+            if cached is not None:
+                _by_name.pop((table, cached[1].get("name")), None)
+        if ids is None:
+            for key in [key for key in _by_name if key[0] == table]:
+                del _by_name[key]
+
+
+def clear():
+    with _lock:
+        for table in _generation:
+            _generation[table] += 1
+        _by_id.clear()
+        _by_name.clear()
+
+
+def stats():
+    with _lock:
+        result = {}
+        for table, counters in _stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            result[table] = {**counters, "hit_rate": counters["hits"] / lookups if lookups else None}
+        result["entries"] = len(_by_id)
+        result["max_entries"] = MAX_ENTRIES
+        result["ttl_seconds"] = LIVE_TTL_SECONDS if versions.is_live() else TTL_SECONDS
+        return result
+
+
+def _invalidate_committed(changes):
+    for table, change in changes.items():
+        invalidate(table, change["ids"])
+
+
+versions.add_listener(_invalidate_committed)
@@ -0,0 +1,294 @@
+"""Eventos de cambio para GET /events/stream (server-sent events).
+
+Se alimenta del registro de cambios de versions (commits de este worker y, con
+app.notify, los de los demás): cada tabla que cambió se publica como un evento
+compacto `{"type", "ids", "version"}`. Un único hilo calcula a qué cursos, profesores
+y categorías afecta cada evento (con el catálogo en memoria; las sesiones con una
+consulta) y lo reparte a las colas de los clientes cuyo filtro coincide. Si no se
+conocen los IDs, o ya no llevan a ninguna fila, el evento llega a todos.
+
+Tras el commit el catálogo ya no sabe dónde estaba una fila borrada o un profesor
+desasignado, así que el alcance anterior al cambio se toma antes: en cada flush (el
+módulo de las sesiones tocadas) y en el hook de commit de versions, con el catálogo
+todavía sin reconstruir. Llega a los listeners como `scope` junto a cada cambio de
+este worker y se une al alcance posterior.
+
+Un cliente demasiado lento pierde eventos: recibe `reset` y debe recargar sus datos.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import queue
+import threading
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event as sa_event, inspect, select
+
+from app import catalogue, models, versions
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+MAX_CLIENTS = int(os.getenv("EVENTS_MAX_CLIENTS", "500"))
+CLIENT_QUEUE_SIZE = int(os.getenv("EVENTS_CLIENT_QUEUE_SIZE", "1000"))
+PING_SECONDS = float(os.getenv("EVENTS_PING_SECONDS", "15"))
+
+EVENT_TYPES = {
+    "courses": "course",
+    "modules": "module",
+    "course_module_sessions": "session",
+    "professor_courses": "assignment",
+    "professors": "professor",
+}
+
+RESET = "reset"
+
+
+class Event(NamedTuple):
+    id: int
+    type: str
+    ids: Optional[list]
+    version: int
+    courses: Optional[frozenset]  # cursos, profesores y categorías afectados; None si no se sabe
+    professors: Optional[frozenset]
+    categories: Optional[frozenset]
+
+    def payload(self):
+        return {"type": self.type, "ids": self.ids, "version": self.version}
+
+
+class Filter(NamedTuple):
+    professors: frozenset
+    courses: frozenset
+    categories: frozenset
+
+    def matches(self, event):
+        for wanted, affected in (
+            (self.professors, event.professors),
+            (self.courses, event.courses),
+            (self.categories, event.categories),
+        ):
+            if wanted and affected is not None and not wanted & affected:
+                return False
+        return True
+
+
+class Subscriber:
+    """Queue of one SSE client, fed from the resolver thread through its event loop"""
+
+    def __init__(self, event_filter):
+        self.filter = event_filter
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, event):
+        # Corre en el loop del cliente
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            _stats["dropped"] += 1
+
+    async def next(self):
+        """Next event for this client, None on timeout (time to ping) or RESET after losing events"""
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return RESET
+        try:
+            return await asyncio.wait_for(self.queue.get(), PING_SECONDS)
+        except asyncio.TimeoutError:
+            return None
+
+
+_lock = threading.Lock()
+_subscribers: set = set()
+_pending = queue.Queue()
+_ids = itertools.count(1)
+_thread = None
+_stats = {"published": 0, "delivered": 0, "dropped": 0}
+
+
+def subscribe(event_filter):
+    """Register a client; None when MAX_CLIENTS are already connected"""
+    global _thread
+    with _lock:
+        if len(_subscribers) >= MAX_CLIENTS:
+            return None
+        subscriber = Subscriber(event_filter)
+        _subscribers.add(subscriber)
+        if _thread is None:
+            _thread = threading.Thread(target=_resolve_forever, name="events", daemon=True)
+            _thread.start()
+    return subscriber
+
+
+def unsubscribe(subscriber):
+    with _lock:
+        _subscribers.discard(subscriber)
+
+
+def stats():
+    with _lock:
+        return {**_stats, "clients": len(_subscribers)}
+
+
+# ---------- ALCANCE DE CADA EVENTO ----------
+
+def _session_modules(session_ids):
+    db = SessionLocal()
+    try:
+        session = models.CourseModuleSession
+        return set(db.execute(select(session.module_id).where(session.id.in_(session_ids))).scalars())
+    finally:
+        db.close()
+
+
+def _scope(table, ids, session_modules=None, partial=False):
+    """(courses, professors) affected by a change to `ids` of `table`, or None if unknown
+
+    A row of `ids` that does not exist (or a session without module) makes the scope
+    unknown, unless `partial`: then it is skipped because the other side (before or after
+    the commit) covers it. Sessions are mapped to their modules with `session_modules`
+    (session ID -> module IDs) or a query.
+    """
+    if ids is None:
+        return None
+    snapshot = catalogue.get()
+    courses, professors = set(), set()
+    if table == "course_module_sessions":
+        if session_modules is None:
+            module_ids = _session_modules(ids)
+        else:
+            module_ids = {module_id for session_id in ids for module_id in session_modules.get(session_id, ())}
+        if not module_ids and not partial:
+            # Sesiones borradas: sin módulo no hay a quién filtrar, va a todos
+            return None
+        table, ids = "modules", module_ids
+    for row_id in ids:
+        if table in ("courses", "professor_courses"):
+            course = snapshot.course(row_id)
+            if course is None:
+                if partial:
+                    continue
+                return None
+            courses.add(row_id)
+            professors.update(course.professor_ids)
+        elif table == "modules":
+            module = snapshot.module(row_id)
+            if module is None:
+                if partial:
+                    continue
+                return None
+            course = snapshot.course(module.course_id)
+            courses.add(module.course_id)
+            if module.professor_id is not None:
+                professors.add(module.professor_id)
+            if course is not None:
+                professors.update(course.professor_ids)
+        elif table == "professors":
+            professor = snapshot.professor(row_id)
+            if professor is None:
+                if partial:
+                    continue
+                return None
+            professors.add(row_id)
+            courses.update(professor.course_ids)
+    return courses, professors
+
+
+def _event(table, change):
+    before = change.get("scope")
+    if before is None:
+        scope = _scope(table, change["ids"])
+    else:
+        # Las filas que ya no existen las cubre el alcance anterior al commit
+        after = _scope(table, change["ids"], partial=True)
+        scope = (before[0] | after[0], before[1] | after[1])
+    if scope is None:
+        courses = professors = categories = None
+    else:
+        courses, professors = scope
+        snapshot = catalogue.get()
+        categories = frozenset(
+            course.category for course in map(snapshot.course, courses) if course is not None and course.category
+        )
+        courses, professors = frozenset(courses), frozenset(professors)
+    return Event(next(_ids), EVENT_TYPES[table], change["ids"], change["version"], courses, professors, categories)
+
+
+def _publish(event):
+    with _lock:
+        subscribers = [subscriber for subscriber in _subscribers if subscriber.filter.matches(event)]
+        _stats["published"] += 1
+        _stats["delivered"] += len(subscribers)
+    for subscriber in subscribers:
+        try:
+            subscriber.loop.call_soon_threadsafe(subscriber.push, event)
+        except RuntimeError:
+            # El loop ya se cerró: el cliente se fue sin pasar por unsubscribe
+            unsubscribe(subscriber)
+
+
+def _resolve_forever():
+    while True:
+        changes = _pending.get()
+        for table, change in changes.items():
+            if table in EVENT_TYPES:
+                try:
+                    event = _event(table, change)
+                except Exception:
+                    logger.exception("Could not resolve the scope of a %s change", table)
+                    # Sin alcance el evento va a todos; mejor de más que perderlo
+                    event = Event(next(_ids), EVENT_TYPES[table], change["ids"], change["version"], None, None, None)
+                _publish(event)
+
+
+def _on_change(changes):
+    # Se llama en el hilo del commit: solo se encola
+    if _subscribers:
+        _pending.put(changes)
+
+
+# ---------- ALCANCE ANTERIOR AL CAMBIO ----------
+# session.info["event_session_modules"]: sesión -> módulos en los que estaba antes del flush
+
+@sa_event.listens_for(SessionLocal, "after_flush")
+def _remember_session_modules(session, flush_context):
+    if not _subscribers:
+        return
+    remembered = session.info.setdefault("event_session_modules", {})
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, models.CourseModuleSession):
+            # Tras el flush todavía está el historial: valor anterior y actual
+            history = inspect(obj).attrs.module_id.history
+            module_ids = {value for value in (*history.deleted, *history.unchanged, *history.added) if value is not None}
+            remembered.setdefault(obj.id, set()).update(module_ids)
+
+
+def _capture_scope(session):
+    """Commit hook: attach to each committed change the scope its rows had before it"""
+    committed = session.info.get("committed")
+    session_modules = session.info.pop("event_session_modules", {})
+    if not committed or not _subscribers:
+        return
+    for table, change in committed.items():
+        if table not in EVENT_TYPES or change["ids"] is None:
+            continue
+        try:
+            # El catálogo todavía es el de antes del commit
+            change["scope"] = _scope(table, change["ids"], session_modules, partial=True)
+        except Exception:
+            logger.exception("Could not capture the scope of a %s change", table)
+
+
+@sa_event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget_session_modules(session, previous_transaction):
+    session.info.pop("event_session_modules", None)
+
+
+versions.add_listener(_on_change)
+versions.add_commit_hook(_capture_scope)
@@ -0,0 +1,74 @@
+"""Selección de campos en colecciones: `?fields=id,name` y `?include=modules,professors`.
+
+- Sin parámetros la respuesta es la completa de siempre.
+- `fields` limita las columnas y deja fuera las relaciones que no se pidan (en
+  `fields` o en `include`). `id` va siempre, aunque solo se pidan relaciones.
+- `include` solo añade relaciones a las columnas (todas, si no hay `fields`).
+
+Los handlers usan la selección para consultar solo esas columnas (`columns`) y
+cargar solo esas relaciones (`wants`), y devuelven `shape(...)`: filas ya recortadas
+que el encoder emite tal cual, sin completarlas con los defaults del response_model.
+"""
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy.orm import load_only, noload
+
+from app import encoding
+
+
+class Selection(NamedTuple):
+    fields: tuple
+    relations: tuple
+    sparse: bool
+
+    def wants(self, name):
+        return name in self.fields or name in self.relations
+
+    def columns(self, model):
+        """Mapped columns to SELECT"""
+        return [getattr(model, name) for name in self.fields]
+
+    def loader_options(self, model, relation_options=None):
+        """load_only for the selected columns (the ORM adds the primary key) plus selectinload/noload per relation"""
+        columns = self.columns(model)
+        options = [load_only(*columns)] if columns else []
+        for relation, loader in (relation_options or {}).items():
+            options.append(loader if relation in self.relations else noload(getattr(model, relation)))
+        return options
+
+    def shape(self, rows):
+        """Mark already-trimmed rows so the encoder does not pad them back to the full schema"""
+        return encoding.Plain(rows) if self.sparse else rows
+
+
+def _names(value):
+    return tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip())) if value else ()
+
+
+def selection(scalars, relations=(), default_relations=None):
+    """Route dependency parsing `fields`/`include` against the allowed `scalars` and `relations`"""
+    default_relations = tuple(relations if default_relations is None else default_relations)
+    allowed = ", ".join((*scalars, *relations))
+
+    def select_fields(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {allowed}"),
+        include: Optional[str] = Query(None, description=f"Relations to embed: {', '.join(relations) or 'none'}"),
+    ) -> Selection:
+        requested, included = _names(fields), _names(include)
+        unknown = [name for name in (*requested, *included) if name not in scalars and name not in relations]
+        unknown += [name for name in included if name in scalars]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {allowed}")
+        if not requested and not included:
+            return Selection(tuple(scalars), default_relations, False)
+        if requested:
+            # Cada fila conserva su identidad: `?fields=modules` devuelve id + modules
+            identity = ("id",) if "id" in scalars else ()
+            chosen = tuple(dict.fromkeys((*identity, *(name for name in requested if name in scalars))))
+        else:
+            chosen = tuple(scalars)
+        embedded = tuple(dict.fromkeys((*(name for name in requested if name in relations), *included)))
+        return Selection(chosen, embedded, True)
+
+    return select_fields
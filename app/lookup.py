@@ -0,0 +1,102 @@
+"""Búsqueda por lotes en las colecciones: `?ids=3,1,7` o `?names=Óleo,Acuarela`.
+
+Los valores pueden ir separados por comas o repitiendo el parámetro. La respuesta
+conserva el orden pedido (sin duplicados) y lista aparte lo que no se encontró. Los
+nombres de profesor no son únicos: un nombre repetido no elige a ninguno, se devuelve
+en `ambiguous` con sus IDs para volver a pedirlos con `?ids=`.
+"""
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException, Query
+
+
+class Keys(NamedTuple):
+    ids: tuple
+    names: tuple
+
+
+def _split(values):
+    return tuple(dict.fromkeys(
+        item.strip() for value in values or () for item in value.split(",") if item.strip()
+    ))
+
+
+def _parse_ids(values):
+    try:
+        return tuple(int(value) for value in _split(values))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers")
+
+
+def batch_keys(
+    ids: Optional[List[str]] = Query(None, description="Entity IDs, comma-separated or repeated"),
+    names: Optional[List[str]] = Query(None, description="Exact names, comma-separated or repeated"),
+) -> Optional[Keys]:
+    """Route dependency: the requested keys, or None for the regular listing"""
+    if not ids and not names:
+        return None
+    return Keys(_parse_ids(ids), _split(names))
+
+
+def batch_ids(
+    ids: Optional[List[str]] = Query(None, description="Entity IDs, comma-separated or repeated"),
+) -> Optional[Keys]:
+    """Like batch_keys, for collections whose names are not unique"""
+    if not ids:
+        return None
+    return Keys(_parse_ids(ids), ())
+
+
+class NameIndex:
+    """Lookups by name shared by catalogue.Catalogue and snapshot.MappedCatalogue
+
+    The catalogue provides `courses`, `professors`, `course(id)`, `professor(id)` and a `_names` dict.
+    """
+    __slots__ = ()
+
+    def _ids_named(self, kind, records, name):
+        # Nombre -> IDs en orden, construido la primera vez que se busca por nombre
+        index = self._names.get(kind)
+        if index is None:
+            index = {}
+            for record in records:
+                index.setdefault(record.name, []).append(record.id)
+            self._names[kind] = index
+        return index.get(name, ())
+
+    def courses_named(self, name):
+        """Courses called `name`: at most one, names are unique"""
+        return [self.course(course_id) for course_id in self._ids_named("courses", self.courses, name)]
+
+    def professors_named(self, name):
+        """Every professor called `name`, by ID"""
+        return [self.professor(professor_id) for professor_id in self._ids_named("professors", self.professors, name)]
+
+
+def resolve(keys: Keys, by_id, by_name=None):
+    """Records for `keys` in request order (IDs first, then names), the keys that matched nothing
+    and the names that matched several records ({name: [ids]})"""
+    found, seen = [], set()
+    not_found = {"ids": [], "names": []}
+    ambiguous = {}
+
+    def add(record):
+        if record.id not in seen:
+            seen.add(record.id)
+            found.append(record)
+
+    for entity_id in keys.ids:
+        record = by_id(entity_id)
+        if record is None:
+            not_found["ids"].append(entity_id)
+        else:
+            add(record)
+    for name in keys.names if by_name is not None else ():
+        records = by_name(name)
+        if not records:
+            not_found["names"].append(name)
+        elif len(records) > 1:
+            ambiguous[name] = [record.id for record in records]
+        else:
+            add(records[0])
+    return found, not_found, ambiguous
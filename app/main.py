@@ -1,25 +1,52 @@
+from app import startup  # primero: mide el import del resto de la app
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import Base, engine
+from app import catalogue, compression, notify, purge, versions, warm_cache  # versions registra el seguimiento de escrituras
 from app.routers import course
 from app.routers import coursemodules
 from app.routers import session
 from app.routers import professor
 from app.routers import schedule
 from app.routers import modules
+from app.routers import metrics
+from app.routers import views
+from app.routers import batch
+from app.routers import sync
+from app.routers import events
 
 
+# El esquema lo gestiona Alembic (`alembic upgrade head`); la app no toca la base al importarse
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup.phase("resume_purges"):
+        # Retoma purgas que quedaron a medias si el proceso anterior se detuvo
+        purge.resume()
+    with startup.phase("warm_cache"):
+        # Fechas expandidas, previews y horarios calculados antes del reinicio
+        warm_cache.restore()
+        warm_cache.start()
+    with startup.phase("catalogue"):
+        catalogue.load()
+    with startup.phase("change_listener"):
+        # Invalida las cachés de este worker con los commits de los demás (solo PostgreSQL)
+        notify.start()
+    startup.ready()
+    yield
+    warm_cache.save()
 
 
-app = FastAPI(title="MALI Scheduler API")
+app = FastAPI(title="MALI Scheduler API", lifespan=lifespan)
 app.include_router(session.router)
 app.include_router(professor.router)
 app.include_router(coursemodules.router)
 app.include_router(schedule.router)
 app.include_router(modules.router)
-
-
-Base.metadata.create_all(bind=engine)
+app.include_router(metrics.router)
+app.include_router(views.router)
+app.include_router(batch.router)
+app.include_router(sync.router)
+app.include_router(events.router)
 
 # Conectar routers
 app.add_middleware(
@@ -28,10 +55,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Batch-Committed"],
 )
+# Comprime JSON/MessagePack grandes; las respuestas con ETag, una vez por versión
+app.add_middleware(compression.CompressionMiddleware)
 
 app.include_router(course.router)
 
 @app.get("/")
 def read_root():
     return {"message": "¡MALI Scheduler activo y listo!"}
+
+startup.imported()
@@ -1,17 +1,11 @@
-from sqlalchemy import Table, Column, Integer, String, Boolean, Date, ForeignKey, Enum
-from sqlalchemy.orm import relationship
-from app.database import Base
+from sqlalchemy import Table, Column, BigInteger, Integer, String, Boolean, Date, DateTime, ForeignKey, Enum, Index, event, or_, select, text
+from sqlalchemy.orm import relationship, with_loader_criteria
+from app.database import Base, SessionLocal
 from typing import Optional
-from enum import Enum as PyEnum
 from app.schemas import SessionStatusEnum
 from datetime import datetime
 
 
-class SessionStatusEnum(PyEnum):
-    ACTIVE = "active"
-    INACTIVE = "inactive"
-    COMPLETED = "completed"
-
 # Tabla intermedia
 professor_courses = Table(
     "professor_courses",
@@ -27,15 +21,27 @@ class Professor(Base):
     name = Column(String, nullable=False)  # Keep for backward compatibility
     first_name = Column(String, nullable=True)  # New field
     last_name = Column(String, nullable=True)   # New field
-    email = Column(String, unique=True, nullable=True)
+    email = Column(String, nullable=True)
     phone = Column(String, nullable=True)
     bio = Column(String, nullable=True)  # Short biography
     specialties = Column(String, nullable=True)  # Comma-separated specialties
     created_at = Column(Date, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
+    deleted_at = Column(DateTime, nullable=True, index=True)  # Tombstone, purgado en background
+    updated_at = Column(DateTime, nullable=True)  # Último commit que tocó la fila (ver app/sync.py)
+    sync_seq = Column(BigInteger, nullable=True, index=True)  # Posición de ese commit en la secuencia de cambios
 
     courses = relationship("Course", secondary=professor_courses, back_populates="professors")
 
+    __table_args__ = (
+        # El email solo es único entre profesores no eliminados
+        Index(
+            "uq_professors_email_live", "email", unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
+
     @property
     def full_name(self):
         """Returns the full name if first_name and last_name exist, otherwise returns name"""
@@ -47,16 +53,29 @@ class Course(Base):
     __tablename__ = "courses"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, index=True, nullable=False)
+    name = Column(String, index=True, nullable=False)
     duration_months = Column(Integer, nullable=False)
     start_date = Column(Date, nullable=True)
     schedule = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     category = Column(String, nullable=True)
+    deleted_at = Column(DateTime, nullable=True, index=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))  # Sube en cada UPDATE
+    updated_at = Column(DateTime, nullable=True)  # Último commit que tocó la fila (ver app/sync.py)
+    sync_seq = Column(BigInteger, nullable=True, index=True)  # Posición de ese commit en la secuencia de cambios
     professors = relationship("Professor", secondary=professor_courses, back_populates="courses")
 
     modules = relationship("Module", back_populates="course", cascade="all, delete")
 
+    __table_args__ = (
+        # Permite recrear un curso con el mismo nombre mientras el anterior espera su purga
+        Index(
+            "uq_courses_name_live", "name", unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
+
 
 class Module(Base):
     __tablename__ = "modules"
@@ -64,11 +83,14 @@ class Module(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     order = Column(Integer, nullable=True)
-    course_id = Column(Integer, ForeignKey("courses.id"))
+    course_id = Column(Integer, ForeignKey("courses.id"), index=True)
     syllabus_status = Column(String, nullable=True)
     observations = Column(String, nullable=True)
-    professor_id = Column(Integer, ForeignKey("professors.id"), nullable=True)
+    professor_id = Column(Integer, ForeignKey("professors.id"), nullable=True, index=True)
     hours = Column(Integer, default=2)
+    deleted_at = Column(DateTime, nullable=True, index=True)
+    updated_at = Column(DateTime, nullable=True)  # Último commit que tocó la fila (ver app/sync.py)
+    sync_seq = Column(BigInteger, nullable=True, index=True)  # Posición de ese commit en la secuencia de cambios
     course = relationship("Course", back_populates="modules")
     sessions = relationship("CourseModuleSession", back_populates="module")
 
@@ -77,11 +99,45 @@ class CourseModuleSession(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     session_number = Column(Integer)
-    date = Column(Date)
-    status = Column(Enum(SessionStatusEnum), default=SessionStatusEnum.ACTIVE)
+    date = Column(Date, index=True)
+    # En la base se guarda el valor ("Confirmada"), no el nombre del miembro; tipo session_status en PostgreSQL
+    status = Column(
+        Enum(SessionStatusEnum, name="session_status", values_callable=lambda enum: [member.value for member in enum]),
+        default=SessionStatusEnum.PROGRAMADA,
+    )
     extra_note = Column(String, nullable=True)
-    module_id = Column(Integer, ForeignKey("modules.id"))
+    module_id = Column(Integer, ForeignKey("modules.id"), index=True)
     hours = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, nullable=True)  # Último commit que tocó la fila (ver app/sync.py)
+    sync_seq = Column(BigInteger, nullable=True, index=True)  # Posición de ese commit en la secuencia de cambios
     module = relationship("Module", back_populates="sessions")
 
 
+# Modelos con borrado lógico: las filas con deleted_at quedan ocultas hasta que el purgador las elimina
+TOMBSTONED_MODELS = (Course, Module, Professor)
+
+# Las sesiones no tienen deleted_at: se ocultan las de módulos marcados (el delete-all de
+# cursos marca también sus módulos). Subconsulta sobre la tabla, fuera del filtro del ORM.
+_modules = Module.__table__
+_LIVE_SESSIONS = or_(
+    CourseModuleSession.module_id.is_(None),
+    CourseModuleSession.module_id.in_(select(_modules.c.id).where(_modules.c.deleted_at.is_(None))),
+)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _hide_tombstoned_rows(execute_state):
+    """Filter tombstoned rows out of every ORM read unless include_deleted is set"""
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.execution_options.get("include_deleted", False)
+    ):
+        return
+    execute_state.statement = execute_state.statement.options(*[
+        *(
+            with_loader_criteria(model, model.deleted_at.is_(None), include_aliases=True)
+            for model in TOMBSTONED_MODELS
+        ),
+        with_loader_criteria(CourseModuleSession, _LIVE_SESSIONS, include_aliases=True),
+    ])
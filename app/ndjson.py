@@ -0,0 +1,141 @@
+"""Carga masiva en streaming a partir de NDJSON (opcionalmente gzip).
+
+El cuerpo se lee línea a línea mientras llega, cada línea se valida por separado y
+las filas se insertan por lotes con un commit por lote. La respuesta es a su vez
+NDJSON: un evento por línea con error, uno por lote guardado y un resumen final.
+"""
+import json
+import os
+import zlib
+
+from fastapi import Query, Request
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from app.database import SessionLocal
+
+DEFAULT_CHUNK_SIZE = int(os.getenv("NDJSON_CHUNK_SIZE", "500"))
+MAX_LINE_BYTES = int(os.getenv("NDJSON_MAX_LINE_BYTES", str(1024 * 1024)))
+
+CHUNK_SIZE_QUERY = Query(DEFAULT_CHUNK_SIZE, ge=1, le=10000, description="Rows inserted per commit")
+
+GZIP_CONTENT_TYPES = {"application/gzip", "application/x-gzip", "application/x-ndjson+gzip"}
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+class NDJSONResponse(StreamingResponse):
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        # El generador sigue leyendo el cuerpo de la petición mientras respondemos,
+        # así que no se puede escuchar `receive` para detectar desconexiones.
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+def _is_gzip(request: Request):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    return request.headers.get("content-encoding", "").lower() == "gzip" or content_type in GZIP_CONTENT_TYPES
+
+
+async def iter_lines(request: Request):
+    """Yield (line_number, raw_line) for every non-blank line of the body as it arrives"""
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16) if _is_gzip(request) else None
+    buffer = b""
+    number = 0
+
+    def split(data):
+        nonlocal buffer, number
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise LineTooLong(f"Line {number + len(lines) + 1} exceeds {MAX_LINE_BYTES} bytes")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+
+    async for chunk in request.stream():
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        for item in split(chunk):
+            yield item
+
+    if decompressor is not None:
+        for item in split(decompressor.flush()):
+            yield item
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+def _event(payload):
+    return json.dumps(payload, ensure_ascii=False, default=str).encode() + b"\n"
+
+
+def _load_chunk(db, load_chunk, entries):
+    try:
+        created = load_chunk(db, entries)
+        db.commit()
+        return created
+    except Exception:
+        db.rollback()
+        raise
+
+
+async def _import(request, schema, load_chunk, chunk_size):
+    db = SessionLocal()
+    batch = []
+    first_line = None
+    totals = {"lines": 0, "invalid": 0, "created": 0, "chunks": 0, "failed_chunks": 0}
+
+    async def flush(last_line):
+        nonlocal batch, first_line
+        entries, lines = batch, [first_line, last_line]
+        batch, first_line = [], None
+        try:
+            created = await run_in_threadpool(_load_chunk, db, load_chunk, entries)
+        except Exception as exc:
+            totals["failed_chunks"] += 1
+            return _event({"chunk": totals["chunks"] + totals["failed_chunks"], "lines": lines, "error": str(exc)})
+        totals["chunks"] += 1
+        totals["created"] += len(created)
+        return _event({
+            "chunk": totals["chunks"] + totals["failed_chunks"],
+            "lines": lines,
+            "received": len(entries),
+            "created": len(created),
+        })
+
+    try:
+        async for last_line, raw in iter_lines(request):
+            totals["lines"] += 1
+            try:
+                entry = schema.model_validate_json(raw)
+            except ValidationError as exc:
+                totals["invalid"] += 1
+                yield _event({"line": last_line, "error": exc.errors(include_url=False, include_context=False)})
+                continue
+            if first_line is None:
+                first_line = last_line
+            batch.append(entry)
+            if len(batch) >= chunk_size:
+                yield await flush(last_line)
+        if batch:
+            yield await flush(last_line)
+        yield _event({"done": True, **totals})
+    except (LineTooLong, zlib.error) as exc:
+        yield _event({"done": False, "error": str(exc), **totals})
+    finally:
+        db.close()
+
+
+def import_response(request: Request, schema, load_chunk, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Build the streaming response that imports the request body with `load_chunk`"""
+    return NDJSONResponse(_import(request, schema, load_chunk, chunk_size))
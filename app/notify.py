@@ -0,0 +1,124 @@
+"""Invalidación entre workers con LISTEN/NOTIFY de PostgreSQL.
+
+Cada commit que sube versiones envía, dentro de la misma transacción, un `pg_notify`
+con las tablas, los IDs tocados y las versiones nuevas; PostgreSQL solo lo entrega si
+el commit se confirma. Cada worker mantiene un hilo escuchando el canal y pasa los
+cambios de los demás procesos a los mismos listeners que los commits locales (ver
+versions.add_listener), así que las cachés invalidan exactamente las entradas
+afectadas. Mientras la escucha está activa, versions.current no consulta la base.
+
+En otros motores (SQLite en desarrollo) no hace nada.
+"""
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+
+from sqlalchemy import event, func
+from sqlalchemy import select as sql_select
+
+from app import versions
+from app.database import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = os.getenv("NOTIFY_CHANNEL", "mali_changes")
+# PostgreSQL rechaza payloads de 8000 bytes o más
+MAX_PAYLOAD_BYTES = 7900
+RECONNECT_SECONDS = float(os.getenv("NOTIFY_RECONNECT_SECONDS", "5"))
+
+ENABLED = engine.dialect.name == "postgresql" and os.getenv("NOTIFY_ENABLED", "1") != "0"
+
+_stats = {"sent": 0, "received": 0, "reconnects": 0}
+_thread = None
+
+
+def _origin():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _payload(changes):
+    message = {"origin": _origin(), "changes": changes}
+    payload = json.dumps(message, separators=(",", ":"))
+    if len(payload.encode()) >= MAX_PAYLOAD_BYTES:
+        # Demasiados IDs: los receptores invalidan la tabla completa
+        message["changes"] = {
+            table: {"ids": None, "version": change["version"]} for table, change in changes.items()
+        }
+        payload = json.dumps(message, separators=(",", ":"))
+    return payload
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _send(session):
+    # Se registra después de versions._bump_versions, que deja los cambios en session.info
+    changes = session.info.get("committed")
+    if not ENABLED or not changes:
+        return
+    session.connection().execute(sql_select(func.pg_notify(CHANNEL, _payload(changes))))
+    _stats["sent"] += 1
+
+
+def _receive(raw_payload):
+    message = json.loads(raw_payload)
+    if message.get("origin") == _origin():
+        return  # los commits propios ya se publicaron en after_commit
+    _stats["received"] += 1
+    versions.dispatch(message["changes"])
+
+
+def _listen_once():
+    connection = engine.raw_connection()
+    # Conexión propia fuera del pool: queda ocupada escuchando mientras viva el hilo
+    connection.detach()
+    dbapi_connection = connection.dbapi_connection
+    try:
+        dbapi_connection.autocommit = True
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{CHANNEL}"')
+        # Desde aquí las notificaciones quedan en cola: ya se puede confiar en la memoria
+        versions.set_live(True)
+        # Los commits de otros workers durante la desconexión no llegaron: todo se invalida
+        versions.dispatch({
+            table: {"ids": None, "version": version}
+            for table, version in versions.current(versions.TRACKED_TABLES).items()
+        })
+        while True:
+            if select.select([dbapi_connection], [], [], 60) == ([], [], []):
+                continue
+            dbapi_connection.poll()
+            while dbapi_connection.notifies:
+                notification = dbapi_connection.notifies.pop(0)
+                try:
+                    _receive(notification.payload)
+                except Exception:
+                    logger.exception("Invalid change notification: %r", notification.payload)
+    finally:
+        versions.set_live(False)
+        connection.close()
+
+
+def _listen_forever():
+    while True:
+        try:
+            _listen_once()
+        except Exception:
+            logger.exception("Change listener disconnected, retrying in %ss", RECONNECT_SECONDS)
+        _stats["reconnects"] += 1
+        time.sleep(RECONNECT_SECONDS)
+
+
+def start():
+    """Start this worker's listener thread (once; no-op outside PostgreSQL)"""
+    global _thread
+    if not ENABLED or _thread is not None:
+        return
+    _thread = threading.Thread(target=_listen_forever, name="change-listener", daemon=True)
+    _thread.start()
+
+
+def stats():
+    return {**_stats, "enabled": ENABLED, "listening": versions.is_live(), "channel": CHANNEL}
@@ -0,0 +1,170 @@
+"""Purga en background de filas marcadas con deleted_at.
+
+Los endpoints delete-all solo marcan las filas (tombstones) y devuelven al instante;
+aquí se eliminan por lotes acotados, con una pausa entre lotes para no bloquear a
+los lectores concurrentes.
+
+Cada tipo de purga toma un candado de archivo en el directorio de estado (ver app.state):
+con varios workers, solo uno purga a la vez. `resume()` al arrancar no espera: si otro
+proceso ya tiene el candado, es que está purgando y no hace falta otra pasada.
+"""
+import contextlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+
+from app import models, state
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PURGE_CHUNK_SIZE = int(os.getenv("PURGE_CHUNK_SIZE", "500"))
+PURGE_PAUSE_SECONDS = float(os.getenv("PURGE_PAUSE_SECONDS", "0.1"))
+
+_lock = threading.Lock()
+_workers: dict[str, threading.Thread] = {}
+_progress: dict[str, dict] = {}
+
+# Los lotes no tocan objetos cargados en la sesión, no hace falta sincronizarla
+_BULK = {"synchronize_session": False}
+
+
+def _tombstoned_ids(db, model, limit):
+    stmt = select(model.id).where(model.deleted_at.is_not(None)).order_by(model.id).limit(limit)
+    return list(db.execute(stmt, execution_options={"include_deleted": True}).scalars())
+
+
+def _purge_course_chunk(db, course_ids):
+    ModuleSession = models.CourseModuleSession
+    module_ids = select(models.Module.id).where(models.Module.course_id.in_(course_ids))
+    links = models.professor_courses
+    db.execute(delete(ModuleSession).where(ModuleSession.module_id.in_(module_ids)), execution_options=_BULK)
+    db.execute(delete(links).where(links.c.course_id.in_(course_ids)), execution_options=_BULK)
+    db.execute(delete(models.Module).where(models.Module.course_id.in_(course_ids)), execution_options=_BULK)
+    db.execute(delete(models.Course).where(models.Course.id.in_(course_ids)), execution_options=_BULK)
+
+
+def _purge_module_chunk(db, module_ids):
+    ModuleSession = models.CourseModuleSession
+    db.execute(delete(ModuleSession).where(ModuleSession.module_id.in_(module_ids)), execution_options=_BULK)
+    db.execute(delete(models.Module).where(models.Module.id.in_(module_ids)), execution_options=_BULK)
+
+
+def _purge_professor_chunk(db, professor_ids):
+    links = models.professor_courses
+    db.execute(
+        update(models.Module).where(models.Module.professor_id.in_(professor_ids)).values(professor_id=None),
+        execution_options=_BULK,
+    )
+    db.execute(delete(links).where(links.c.professor_id.in_(professor_ids)), execution_options=_BULK)
+    db.execute(delete(models.Professor).where(models.Professor.id.in_(professor_ids)), execution_options=_BULK)
+
+
+# Cada tipo de purga recorre sus modelos en orden (primero los dependientes)
+PURGE_PLANS = {
+    "courses": [(models.Course, _purge_course_chunk), (models.Module, _purge_module_chunk)],
+    "professors": [(models.Professor, _purge_professor_chunk)],
+}
+
+
+def _purge_all(db, kind, progress):
+    for model, purge_chunk in PURGE_PLANS[kind]:
+        while True:
+            ids = _tombstoned_ids(db, model, PURGE_CHUNK_SIZE)
+            if not ids:
+                break
+            purge_chunk(db, ids)
+            db.commit()
+            with _lock:
+                progress["purged"] += len(ids)
+                progress["chunks"] += 1
+                progress["updated_at"] = datetime.utcnow()
+            time.sleep(PURGE_PAUSE_SECONDS)
+
+
+def _exclusive(kind, wait):
+    """Cross-process lock for the purge of `kind`; without a usable state directory, no lock"""
+    try:
+        state.directory()
+    except OSError:
+        logger.warning("No state directory for the purge lock, purging %s without it", kind, exc_info=True)
+        return contextlib.nullcontext(True)
+    return state.lock(state.path(f"purge-{kind}") + ".lock", blocking=wait)
+
+
+def _run(kind, wait):
+    progress = _progress[kind]
+    db = SessionLocal()
+    try:
+        with _exclusive(kind, wait) as acquired:
+            if not acquired:
+                with _lock:
+                    # Otro proceso está purgando: sus pasadas ya cubren estas filas
+                    progress["status"] = "skipped"
+                return
+            _purge_until_idle(db, kind, progress)
+    except Exception as exc:
+        db.rollback()
+        with _lock:
+            progress["status"] = "failed"
+            progress["error"] = str(exc)
+    finally:
+        db.close()
+        with _lock:
+            progress["finished_at"] = datetime.utcnow()
+            _workers.pop(kind, None)
+
+
+def _purge_until_idle(db, kind, progress):
+    while True:
+        _purge_all(db, kind, progress)
+        with _lock:
+            # Un delete-all llegó mientras terminábamos: otra pasada
+            if not progress["rerun"]:
+                progress["status"] = "done"
+                return
+            progress["rerun"] = False
+
+
+def schedule(kind: str, marked: int = 0, wait: bool = True):
+    """Start the background purge for `kind` unless one is already running
+
+    With `wait=False` the purge is skipped if another process holds the lock.
+    """
+    with _lock:
+        if kind in _workers:
+            _progress[kind]["marked"] += marked
+            _progress[kind]["rerun"] = True
+            return dict(_progress[kind])
+
+        _progress[kind] = {
+            "status": "running",
+            "marked": marked,
+            "purged": 0,
+            "chunks": 0,
+            "rerun": False,
+            "started_at": datetime.utcnow(),
+            "updated_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        worker = threading.Thread(target=_run, args=(kind, wait), name=f"purge-{kind}", daemon=True)
+        _workers[kind] = worker
+        worker.start()
+        return dict(_progress[kind])
+
+
+def status(kind: str):
+    """Return the progress of the last purge of `kind`"""
+    with _lock:
+        return dict(_progress.get(kind) or {"status": "idle"})
+
+
+def resume():
+    """Restart purges left unfinished by a previous process, unless another worker is on it"""
+    for kind in PURGE_PLANS:
+        schedule(kind, wait=False)
@@ -0,0 +1,153 @@
+"""Caché de respuestas ya serializadas, con stale-while-revalidate.
+
+Se activa por ruta con `@cached_response(...)` debajo del decorador del router. La
+clave es la función más sus parámetros (ruta y query); cada entrada guarda los bytes
+finales junto con las versiones de datos con las que se generó. Si las versiones
+cambiaron y la entrada se validó hace poco, se sirven los bytes viejos mientras un
+único hilo en background los recalcula. Con escrituras sin confirmar a la vista (ver
+database.sees_uncommitted) la respuesta se calcula sin leer ni guardar la caché.
+"""
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Response
+
+from app import encoding, versions
+from app.database import SessionLocal, sees_uncommitted
+
+MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+STALE_SECONDS = float(os.getenv("RESPONSE_CACHE_STALE_SECONDS", "10"))
+
+
+class _Entry:
+    __slots__ = ("body", "versions", "validated_at", "response_format")
+
+    def __init__(self, body, versions, validated_at, response_format):
+        self.body = body
+        self.versions = versions
+        self.validated_at = validated_at
+        self.response_format = response_format
+
+
+_lock = threading.Lock()
+_entries: OrderedDict = OrderedDict()
+_refreshing = set()
+_size = 0
+_stats = {"hits": 0, "misses": 0, "stale": 0, "refreshes": 0, "evictions": 0, "bypasses": 0}
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def stats():
+    with _lock:
+        return {**_stats, "entries": len(_entries), "bytes": _size, "max_bytes": MAX_BYTES}
+
+
+def _store(key, entry):
+    global _size
+    with _lock:
+        previous = _entries.pop(key, None)
+        if previous is not None:
+            _size -= len(previous.body)
+        if len(entry.body) > MAX_BYTES:
+            return
+        _entries[key] = entry
+        _size += len(entry.body)
+        while _size > MAX_BYTES:
+            _, evicted = _entries.popitem(last=False)
+            _size -= len(evicted.body)
+            _stats["evictions"] += 1
+
+
+def _lookup(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+        return entry
+
+
+def _response(entry, state):
+    return Response(
+        content=entry.body,
+        media_type=encoding.media_type(entry.response_format),
+        headers={
+            "ETag": encoding.tag_variant(versions.etag_for(entry.versions), entry.response_format),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept",
+            "X-Cache": state,
+        },
+    )
+
+
+def cached_response(*tables, response_model, stale_seconds: float = STALE_SECONDS):
+    """Cache the encoded body of a GET route, keyed by its parameters and the versions of `tables`"""
+    encode = encoding.serializer(response_model)
+
+    def decorator(func):
+        def build(kwargs):
+            data_versions = versions.current(tables)
+            body = encode(func(**kwargs))
+            entry = _Entry(body, data_versions, time.monotonic(), encoding.current_format())
+            _store(key_for(kwargs), entry)
+            return entry
+
+        def refresh(kwargs, response_format):
+            db = SessionLocal()
+            try:
+                # El hilo no hereda el contexto de la petición: se le pasa el formato negociado
+                with encoding.use_format(response_format):
+                    build({**kwargs, "db": db})
+                    _count("refreshes")
+            finally:
+                db.close()
+                with _lock:
+                    _refreshing.discard(key_for(kwargs, response_format))
+
+        def key_for(kwargs, response_format=None):
+            return (func.__module__, func.__qualname__, response_format or encoding.current_format(), tuple(sorted(
+                (name, value) for name, value in kwargs.items() if name != "db"
+            )))
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            if sees_uncommitted(kwargs.get("db")):
+                _count("bypasses")
+                return encoding.render(encode(func(**kwargs)))
+
+            key = key_for(kwargs)
+            entry = _lookup(key)
+            if entry is not None:
+                now = time.monotonic()
+                if entry.versions == versions.current(tables):
+                    entry.validated_at = now
+                    _count("hits")
+                    return _response(entry, "HIT")
+
+                with _lock:
+                    serve_stale = key in _refreshing or now - entry.validated_at <= stale_seconds
+                    start_refresh = serve_stale and key not in _refreshing
+                    if start_refresh:
+                        _refreshing.add(key)
+                if start_refresh:
+                    # La sesión de la petición se cierra al responder: el hilo abre la suya
+                    background_kwargs = {name: value for name, value in kwargs.items() if name != "db"}
+                    threading.Thread(
+                        target=refresh, args=(background_kwargs, encoding.current_format()), daemon=True
+                    ).start()
+                if serve_stale:
+                    _count("stale")
+                    return _response(entry, "STALE")
+
+            _count("misses")
+            return _response(build(kwargs), "MISS")
+
+        return wrapper
+
+    return decorator
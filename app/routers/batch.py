@@ -0,0 +1,171 @@
+"""POST /batch: varias operaciones de la API en una sola petición HTTP.
+
+Las subpeticiones se ejecutan en orden y dentro del proceso contra los mismos routers
+(sin middleware ni red) y comparten una sesión de base de datos. Con `atomic` todo va
+en una transacción: los commits de cada endpoint quedan en savepoints y la primera
+subpetición con error deshace el batch completo; las que faltaban no se ejecutan.
+
+Los GET dentro de un batch se sirven como cualquier otro (catálogo incluido). En un
+batch atómico las cachés se saltan (ver database.sees_uncommitted): lo que se lea con
+escrituras sin confirmar no se guarda, porque un rollback lo dejaría inválido.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from app import encoding, schemas, versions
+from app.database import SessionLocal, engine, shared_session
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Batch"], route_class=encoding.NegotiatedRoute)
+
+MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "100"))
+METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+
+NOT_EXECUTED = {"status": 424, "headers": {}, "body": {"detail": "Not executed: the batch was rolled back"}}
+
+
+def _open(atomic):
+    if not atomic:
+        return SessionLocal(), None
+    connection = engine.connect()
+    connection.begin()
+    if engine.dialect.name == "sqlite":
+        # pysqlite no emite BEGIN hasta el primer DML: sin él, el RELEASE del primer savepoint confirmaría
+        connection.exec_driver_sql("BEGIN")
+    # Los db.commit() de los endpoints solo liberan un savepoint de esta transacción
+    db = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    db.info["atomic"] = True
+    versions.defer_changes(db)
+    return db, connection
+
+
+def _finish(db, connection, committed):
+    try:
+        if connection is not None:
+            if committed:
+                connection.commit()
+            else:
+                connection.rollback()
+            versions.publish_deferred(db, committed)
+    finally:
+        db.close()
+        if connection is not None:
+            connection.close()
+
+
+def _decode(content_type, body):
+    if not body:
+        return None
+    if content_type.startswith("application/json"):
+        return json.loads(body)
+    return body.decode(errors="replace")
+
+
+async def _dispatch(request, operation):
+    """Run one sub-request through the app's router and collect its response"""
+    method = operation.method.upper()
+    path, _, query = operation.path.partition("?")
+    if method not in METHODS or not path.startswith("/") or path.rstrip("/") == "/batch":
+        return {"status": 400, "headers": {}, "body": {"detail": f"Unsupported operation: {method} {path}"}}
+
+    body = b"" if operation.body is None else encoding.dumps(operation.body)
+    headers = {"accept": "application/json", **{name.lower(): value for name, value in operation.headers.items()}}
+    if body:
+        headers.setdefault("content-type", "application/json")
+    headers["content-length"] = str(len(body))
+
+    parent = request.scope
+    scope = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": method,
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+        "app": parent["app"],
+        "state": dict(parent.get("state", {})),
+        "starlette.exception_handlers": parent["starlette.exception_handlers"],
+    }
+
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    finished = asyncio.Event()
+    response = {"status": 500, "headers": [], "chunks": []}
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # Las respuestas en streaming esperan un disconnect: solo llega cuando terminan
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["chunks"].append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await request.app.router(scope, receive, send)
+    except StarletteHTTPException as exc:
+        # 404/405 del enrutado: los endpoints ya convierten sus propias HTTPException
+        return {"status": exc.status_code, "headers": {}, "body": {"detail": exc.detail}}
+    except Exception:
+        logger.exception("Batch operation %s %s failed", method, operation.path)
+        return {"status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+
+    response_headers = {
+        name.decode(): value.decode()
+        for name, value in response["headers"]
+        if name not in (b"content-length", b"content-type")
+    }
+    content_type = next((value.decode() for name, value in response["headers"] if name == b"content-type"), "")
+    return {"status": response["status"], "headers": response_headers, "body": _decode(content_type, b"".join(response["chunks"]))}
+
+
+@router.post("/batch", response_model=List[schemas.BatchResult])
+async def run_batch(batch: schemas.BatchRequest, request: Request, response: Response):
+    """Execute the operations in order on one shared DB session; X-Batch-Committed tells whether the writes stayed"""
+    if len(batch.operations) > MAX_OPERATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_OPERATIONS} operations per batch")
+
+    db, connection = await run_in_threadpool(_open, batch.atomic)
+    results = []
+    committed = True
+    try:
+        with shared_session(db):
+            for position, operation in enumerate(batch.operations):
+                result = await _dispatch(request, operation)
+                results.append(result)
+                if result["status"] < 400:
+                    continue
+                if batch.atomic:
+                    committed = False
+                    results += [NOT_EXECUTED] * (len(batch.operations) - position - 1)
+                    break
+                # Lo que dejó a medias una subpetición fallida no debe entrar en el commit de la siguiente
+                await run_in_threadpool(db.rollback)
+    except BaseException:
+        committed = False
+        raise
+    finally:
+        await run_in_threadpool(_finish, db, connection, committed)
+
+    response.headers["X-Batch-Committed"] = "true" if committed else "false"
+    return results
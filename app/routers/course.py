@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import operator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 from datetime import datetime, date
-from app.database import SessionLocal, get_db
-from app import crud, schemas, models
-from sqlalchemy import text
+from app.database import get_db
+from app import catalogue, crud, encoding, entity_cache, fields, lookup, schemas, models, ndjson, purge, response_cache, singleflight, versions
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 
 class CourseUpdateWithProfessors(BaseModel):
@@ -17,63 +17,126 @@ class CourseUpdateWithProfessors(BaseModel):
     category: Optional[str] = None
     professor_ids: Optional[List[int]] = []
 
-router = APIRouter(prefix="/courses", tags=["Courses"])
+router = APIRouter(prefix="/courses", tags=["Courses"], route_class=encoding.NegotiatedRoute)
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Tablas que componen la respuesta de un curso (para la ETag)
+COURSE_TABLES = ("courses", "modules", "professors", "professor_courses")
 
-@router.post("/", response_model=schemas.Course)
-def create_course(course: schemas.CourseCreate, db: Session = Depends(get_db)):
-    return crud.create_course(db=db, course=course)
-
-@router.get("/", response_model=List[schemas.Course])
-def read_courses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    courses = crud.get_courses(db=db, skip=skip, limit=limit)
-
-    # Transforma manualmente sin usar Pydantic como modelo base
-    result = []
-    for course in courses:
-        result.append({
-            "id": course.id,
-            "name": course.name,
-            "duration_months": course.duration_months,
-            "start_date": course.start_date,
-            "schedule": course.schedule,
-            "is_active": course.is_active,
-            "category": course.category,
-            "modules": [{"id": m.id, "name": m.name, "order": m.order, "course_id": m.course_id} for m in course.modules],
-            "professors": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "courses": [c.name for c in p.courses]
-                }
-                for p in course.professors
-            ],
-        })
-    return result
+COURSE_FIELDS = fields.selection(
+    ("id", "name", "duration_months", "start_date", "schedule", "is_active", "category"),
+    ("modules", "professors"),
+)
+# Listado completo, ?ids=/?names= o ?fields=/?include=
+COURSE_LISTING = Union[List[schemas.Course], schemas.BatchLookup, schemas.SparseRows]
 
+def _course_response(db_course):
+    # Misma forma y orden (por ID) que el listado: de cada profesor, su ID, nombre y cursos
+    # por nombre, no objetos del ORM
+    by_id = operator.attrgetter("id")
+    return {
+        "id": db_course.id,
+        "name": db_course.name,
+        "duration_months": db_course.duration_months,
+        "start_date": db_course.start_date,
+        "schedule": db_course.schedule,
+        "is_active": db_course.is_active,
+        "category": db_course.category,
+        "modules": [
+            {"id": m.id, "name": m.name, "order": m.order, "course_id": m.course_id}
+            for m in sorted(db_course.modules, key=by_id)
+        ],
+        "professors": [
+            {
+                "id": p.id,
+                "name": p.name,
+                "courses": [c.name for c in sorted(p.courses, key=by_id)]
+            }
+            for p in sorted(db_course.professors, key=by_id)
+        ],
+    }
 
-@router.get("/{course_id}", response_model=schemas.Course)
-def read_course(course_id: int, db: Session = Depends(get_db)):
-    db_course = crud.get_course(db, course_id=course_id)
+@router.post("/", response_model=schemas.Course)
+def create_course(course: schemas.CourseCreate, db: Session = Depends(get_db)):
+    return _course_response(crud.create_course(db=db, course=course))
+
+@router.get("/", response_model=COURSE_LISTING, dependencies=[versions.etag(*COURSE_TABLES)])
+@singleflight.coalesce
+@response_cache.cached_response(*COURSE_TABLES, response_model=COURSE_LISTING)
+def read_courses(
+    skip: int = 0,
+    limit: int = 100,
+    selected: fields.Selection = Depends(COURSE_FIELDS),
+    keys: Optional[lookup.Keys] = Depends(lookup.batch_keys),
+    db: Session = Depends(get_db),
+):
+    # Se sirve desde la instantánea en memoria del catálogo, sin ORM
+    snapshot = catalogue.get()
+
+    # ?ids= / ?names=: {"items": [...], "not_found": {...}, "ambiguous": {}} en el orden pedido, sin paginar
+    if keys is not None:
+        found, not_found, ambiguous = lookup.resolve(keys, snapshot.course, snapshot.courses_named)
+        items = [_course_row(snapshot, course, selected) for course in found]
+        return encoding.Plain({"items": items, "not_found": not_found, "ambiguous": ambiguous})
+
+    result = [_course_row(snapshot, course, selected) for course in snapshot.courses[skip:skip + limit]]
+    return selected.shape(result)
+
+
+def _course_row(snapshot, course, selected):
+    # Transforma manualmente sin usar Pydantic como modelo base; solo los campos pedidos
+    row = {name: getattr(course, name) for name in selected.fields}
+    if "modules" in selected.relations:
+        modules = [snapshot.module(module_id) for module_id in course.module_ids]
+        row["modules"] = [{"id": m.id, "name": m.name, "order": m.order, "course_id": m.course_id} for m in modules]
+    if "professors" in selected.relations:
+        professors = [snapshot.professor(professor_id) for professor_id in course.professor_ids]
+        row["professors"] = [
+            {
+                "id": p.id,
+                "name": p.name,
+                "courses": [snapshot.course(course_id).name for course_id in p.course_ids]
+            }
+            for p in professors
+        ]
+    return row
+
+
+@router.get("/{course_id}", response_model=Union[schemas.Course, Dict[str, Any]], dependencies=[versions.etag(*COURSE_TABLES)])
+def read_course(course_id: int, selected: fields.Selection = Depends(COURSE_FIELDS), db: Session = Depends(get_db)):
+    if not selected.sparse:
+        db_course = crud.get_course(db, course_id=course_id)
+        if db_course is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return _course_response(db_course)
+
+    # Solo las columnas pedidas; las relaciones no incluidas ni se cargan
+    db_course = db.query(models.Course).options(*selected.loader_options(models.Course, {
+        "modules": selectinload(models.Course.modules),
+        "professors": selectinload(models.Course.professors).selectinload(models.Professor.courses),
+    })).filter(models.Course.id == course_id).first()
     if db_course is None:
         raise HTTPException(status_code=404, detail="Course not found")
-    return db_course
+    row = {name: getattr(db_course, name) for name in selected.fields}
+    if "modules" in selected.relations:
+        row["modules"] = [
+            {"id": m.id, "name": m.name, "order": m.order, "course_id": m.course_id} for m in db_course.modules
+        ]
+    if "professors" in selected.relations:
+        row["professors"] = [
+            {"id": p.id, "name": p.name, "courses": [course.name for course in p.courses]} for p in db_course.professors
+        ]
+    return selected.shape(row)
 
 @router.delete("/{course_id}", response_model=schemas.Course)
 def delete_course(course_id: int, db: Session = Depends(get_db)):
     db_course = db.query(models.Course).filter(models.Course.id == course_id).first()
     if db_course is None:
         raise HTTPException(status_code=404, detail="Course not found")
+    # Se arma antes del commit: después el objeto borrado ya no carga sus relaciones
+    deleted = _course_response(db_course)
     db.delete(db_course)
     db.commit()
-    return db_course
+    return deleted
 
 @router.put("/{course_id}", response_model=schemas.Course)
 def update_course(
@@ -88,75 +151,33 @@ def update_course(
 
     # Get the data as dict and remove professor_ids for separate processing
     updated_data = updated_course.dict(exclude_unset=True)
-    professor_ids = updated_data.pop("professor_ids", [])
+    professor_ids = updated_data.pop("professor_ids", None)
 
     # Update basic course fields
     for key, value in updated_data.items():
-        if key != "professor_ids":  # Skip professor_ids as we handle it separately
-            setattr(db_course, key, value)
+        setattr(db_course, key, value)
 
     # Handle professor assignments if provided
-    if "professor_ids" in updated_course.dict(exclude_unset=False):
-        # Clear existing professor assignments
-        db_course.professors.clear()
-        
-        # Add new professor assignments
-        for prof_id in professor_ids:
-            professor = db.query(models.Professor).filter(models.Professor.id == prof_id).first()
-            if professor:
-                db_course.professors.append(professor)
+    if professor_ids is not None:
+        crud.sync_course_professors(db, db_course, professor_ids)
 
     db.commit()
     db.refresh(db_course)
     
-    # Return the course with properly formatted response
-    return {
-        "id": db_course.id,
-        "name": db_course.name,
-        "duration_months": db_course.duration_months,
-        "start_date": db_course.start_date,
-        "schedule": db_course.schedule,
-        "is_active": db_course.is_active,
-        "category": db_course.category,
-        "modules": [{"id": m.id, "name": m.name, "order": m.order, "course_id": m.course_id} for m in db_course.modules],
-        "professors": [
-            {
-                "id": p.id,
-                "name": p.name,
-                "courses": [c.name for c in p.courses]
-            }
-            for p in db_course.professors
-        ],
-    }
+    return _course_response(db_course)
 
 
 @router.post("/bulk-load/")
 def bulk_create_courses(data: list[schemas.CourseBulkCreate], db: Session = Depends(get_db)):
-    created = []
-    for entry in data:
-        if db.query(models.Course).filter_by(name=entry.name).first():
-            continue
-        try:
-            start_date = (
-                datetime.strptime(entry.start_date, "%Y-%m-%d").date()
-                if entry.start_date and entry.start_date.lower() != "próximamente"
-                else None
-            )
-        except ValueError:
-            start_date = None
-
-        new_course = models.Course(
-            name=entry.name,
-            duration_months=entry.duration_months,
-            start_date=start_date,
-            schedule=entry.schedule,
-            category=entry.category,
-        )
-        db.add(new_course)
-        created.append(entry.name)
+    created = crud.bulk_create_courses(db, data)
     db.commit()
     return {"created_courses": created}
 
+@router.post("/bulk-load/ndjson")
+async def bulk_create_courses_ndjson(request: Request, chunk_size: int = ndjson.CHUNK_SIZE_QUERY):
+    """Stream NDJSON (optionally gzip) course rows into the database chunk by chunk"""
+    return ndjson.import_response(request, schemas.CourseBulkCreate, crud.bulk_create_courses, chunk_size)
+
 @router.delete("/bulk-delete/")
 def bulk_delete_courses(
     course_ids: List[int] = Query(...),
@@ -177,17 +198,28 @@ def bulk_delete_courses(
 
 @router.delete("/delete-all/")
 def delete_all_courses(db: Session = Depends(get_db)):
-    # 1. Eliminar relaciones de profesores con cursos
-    db.execute(text("DELETE FROM professor_courses"))
-
-    # 2. Eliminar módulos
-    db.query(models.Module).delete()
+    """Tombstone every course and module; the rows are purged in the background"""
+    now = datetime.utcnow()
 
-    # 3. Eliminar cursos
-    num_deleted = db.query(models.Course).delete()
+    # Marcar módulos y cursos como eliminados; las lecturas ya no los ven
+    db.query(models.Module).filter(models.Module.deleted_at.is_(None)).update(
+        {"deleted_at": now}, synchronize_session=False
+    )
+    num_deleted = db.query(models.Course).filter(models.Course.deleted_at.is_(None)).update(
+        {"deleted_at": now}, synchronize_session=False
+    )
 
     db.commit()
-    return {"message": f"{num_deleted} courses, all modules, and professor relations deleted"}
+    progress = purge.schedule("courses", marked=num_deleted)
+    return {
+        "message": f"{num_deleted} courses, all modules, and professor relations deleted",
+        "purge": progress,
+    }
+
+@router.get("/delete-all/status")
+def delete_all_courses_status():
+    """Progress of the background purge started by delete-all"""
+    return purge.status("courses")
 
 @router.post("/{course_id}/generate-sessions")
 def generate_sessions(course_id: int, db: Session = Depends(get_db)):
@@ -211,17 +243,9 @@ def update_course_professors(
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    # Clear existing professor assignments
-    course.professors.clear()
-    
-    # Add new professor assignments
-    for prof_id in professor_ids:
-        professor = db.query(models.Professor).filter(models.Professor.id == prof_id).first()
-        if professor:
-            course.professors.append(professor)
-    
+    crud.sync_course_professors(db, course, professor_ids)
+
     db.commit()
-    db.refresh(course)
     return {"message": "Professors updated successfully"}
 
 @router.get("/{course_id}/sessions", response_model=List[schemas.CourseModuleSessionRead])
@@ -254,7 +278,7 @@ def debug_course(course_id: int, db: Session = Depends(get_db)):
         "professors_count": len(course.professors)
     }
 
-@router.get("/{course_id}/modules-with-professors")
+@router.get("/{course_id}/modules-with-professors", dependencies=[versions.etag("courses", "modules", "professors")])
 def get_course_modules_with_professors(course_id: int, db: Session = Depends(get_db)):
     """Get all modules for a course with their professor assignments"""
     course = db.query(models.Course).filter(models.Course.id == course_id).first()
@@ -264,10 +288,9 @@ def get_course_modules_with_professors(course_id: int, db: Session = Depends(get
     modules_data = []
     for module in course.modules:
         professor_info = None
-        if module.professor_id:
-            professor = db.query(models.Professor).filter(models.Professor.id == module.professor_id).first()
-            if professor:
-                professor_info = {"id": professor.id, "name": professor.name}
+        professor = entity_cache.professor(db, module.professor_id)
+        if professor:
+            professor_info = {"id": professor["id"], "name": professor["name"]}
         
         modules_data.append({
             "id": module.id,
@@ -1,22 +1,34 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app import models, schemas
+from app import models, response_cache, schemas, versions
 
 router = APIRouter(prefix="/coursemodules", tags=["CourseModuleSessions"])
 
-@router.get("/academic-view", response_model=list[schemas.AcademicModuleView])
+ACADEMIC_VIEW_TABLES = ("course_module_sessions", "modules", "courses", "professors")
+
+@router.get(
+    "/academic-view",
+    response_model=list[schemas.AcademicModuleView],
+    dependencies=[versions.etag(*ACADEMIC_VIEW_TABLES)],
+)
+@response_cache.cached_response(*ACADEMIC_VIEW_TABLES, response_model=list[schemas.AcademicModuleView])
 def get_academic_view(db: Session = Depends(get_db)):
-    sessions = db.query(models.CourseModuleSession).all()
-    result = []
-    for s in sessions:
-        result.append(schemas.AcademicModuleView(
-            id=s.id,
-            course_name=s.module.course.name,
-            module_name=s.module.name,
-            professor_name=s.professor.name if s.professor else None,
-            syllabus_status=s.syllabus_status,
-            observations=s.observations,
-            hours=s.hours
-        ))
-    return result
+    # El programa, las observaciones y el profesor son del módulo de cada sesión
+    rows = db.execute(
+        select(
+            models.CourseModuleSession.id,
+            models.Course.name.label("course_name"),
+            models.Module.name.label("module_name"),
+            models.Professor.name.label("professor_name"),
+            models.Module.syllabus_status,
+            models.Module.observations,
+            models.CourseModuleSession.hours,
+        )
+        .join(models.Module, models.Module.id == models.CourseModuleSession.module_id)
+        .join(models.Course, models.Course.id == models.Module.course_id)
+        .outerjoin(models.Professor, models.Professor.id == models.Module.professor_id)
+        .order_by(models.CourseModuleSession.id)
+    )
+    return [schemas.AcademicModuleView(**row._mapping) for row in rows]
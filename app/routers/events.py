@@ -0,0 +1,50 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+from app import encoding, events, versions
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+def _frame(event_type, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\n".encode() + b"data: " + encoding.dumps(data) + b"\n\n"
+
+
+async def _stream(subscriber):
+    try:
+        # Versiones actuales: el cliente compara con las de los datos que ya tiene
+        current = await run_in_threadpool(versions.current, versions.TRACKED_TABLES)
+        yield b"retry: 3000\n" + _frame("hello", {"versions": current})
+        while True:
+            event = await subscriber.next()
+            if event is None:
+                yield b": ping\n\n"
+            elif event is events.RESET:
+                yield _frame(events.RESET, {"detail": "Events were dropped; reload the data"})
+            else:
+                yield _frame(event.type, event.payload(), event.id)
+    finally:
+        events.unsubscribe(subscriber)
+
+
+@router.get("/stream")
+async def stream_events(
+    professor_id: Optional[List[int]] = Query(None, description="Only changes affecting these professors"),
+    course_id: Optional[List[int]] = Query(None, description="Only changes affecting these courses"),
+    category: Optional[List[str]] = Query(None, description="Only changes affecting courses of these categories"),
+):
+    """Server-sent events with every course, module, session, assignment or professor change"""
+    subscriber = events.subscribe(events.Filter(
+        frozenset(professor_id or ()), frozenset(course_id or ()), frozenset(category or ()),
+    ))
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many event stream clients")
+    return StreamingResponse(
+        _stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
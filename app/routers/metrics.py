@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from app import compression, entity_cache, events, notify, response_cache, singleflight, startup, warm_cache
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/cache")
+def get_cache_metrics():
+    """Hit rates and sizes of the in-process caches"""
+    return {
+        "entities": entity_cache.stats(),
+        "responses": response_cache.stats(),
+        "notifications": notify.stats(),
+        "coalescing": singleflight.stats(),
+        "warm_cache": warm_cache.stats(),
+        "compression": compression.stats(),
+        "event_stream": events.stats(),
+    }
+
+
+@router.get("/startup")
+def get_startup_metrics():
+    """Import time and duration of each startup step of this worker"""
+    return startup.report()
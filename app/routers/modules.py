@@ -1,38 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app import models, schemas
-from typing import Dict, Any
+from app import catalogue, crud, encoding, entity_cache, fields, lookup, models, ndjson, schemas, streaming, versions
+from typing import Any, Dict, Optional, Union
 
 
-router = APIRouter(prefix="/modules", tags=["Modules"])
+router = APIRouter(prefix="/modules", tags=["Modules"], route_class=encoding.NegotiatedRoute)
+
+MODULE_FIELDS = fields.selection(("id", "name", "order", "course_id"))
+MODULE_LISTING = Union[list[schemas.Module], schemas.BatchLookup, schemas.SparseRows]
 
 @router.post("/bulk-load/")
 def bulk_load_modules(data: list[schemas.BulkModuleEntry], db: Session = Depends(get_db)):
-    created = []
-    for entry in data:
-        course = db.query(models.Course).filter_by(name=entry.course_name).first()
-        if not course:
-            continue
-
-        for mod_data in entry.modules:
-            existing = db.query(models.Module).filter_by(name=mod_data.name, course_id=course.id).first()
-            if not existing:
-                new_mod = models.Module(name=mod_data.name, order=mod_data.order, course_id=course.id)
-                db.add(new_mod)
-                created.append(f"{course.name} - {mod_data.name}")
+    created = crud.bulk_create_modules(db, data)
     db.commit()
     return {"created_modules": created}
 
-@router.get("/", response_model=list[schemas.Module])
-def read_modules(db: Session = Depends(get_db)):
-    return db.query(models.Module).all()
+@router.post("/bulk-load/ndjson")
+async def bulk_load_modules_ndjson(request: Request, chunk_size: int = ndjson.CHUNK_SIZE_QUERY):
+    """Stream NDJSON (optionally gzip) module entries into the database chunk by chunk"""
+    return ndjson.import_response(request, schemas.BulkModuleEntry, crud.bulk_create_modules, chunk_size)
 
-@router.get("/by-course/{course_id}", response_model=list[schemas.Module])
-def get_modules_by_course(course_id: int, db: Session = Depends(get_db)):
+@router.get("/", response_model=MODULE_LISTING, dependencies=[versions.etag("modules")])
+def read_modules(
+    selected: fields.Selection = Depends(MODULE_FIELDS),
+    keys: Optional[lookup.Keys] = Depends(lookup.batch_ids),
+    stream: Optional[str] = streaming.STREAM_QUERY,
+):
+    snapshot = catalogue.get()
+    if stream:
+        # Las filas ya están en el catálogo: solo se evita armar el JSON completo
+        return streaming.rows_response(
+            ({name: getattr(module, name) for name in selected.fields} for module in snapshot.modules), stream
+        )
+    if keys is not None:
+        found, not_found, _ = lookup.resolve(keys, snapshot.module)
+        items = [{name: getattr(module, name) for name in selected.fields} for module in found]
+        return encoding.Plain({"items": items, "not_found": {"ids": not_found["ids"]}})
+    modules = snapshot.modules
+    if not selected.sparse:
+        return list(modules)
+    return selected.shape([{name: getattr(module, name) for name in selected.fields} for module in modules])
+
+@router.get("/by-course/{course_id}", response_model=Union[list[schemas.Module], schemas.SparseRows], dependencies=[versions.etag("modules")])
+def get_modules_by_course(
+    course_id: int, selected: fields.Selection = Depends(MODULE_FIELDS), db: Session = Depends(get_db)
+):
     """Get all modules for a specific course with professor assignments"""
-    modules = db.query(models.Module).filter(models.Module.course_id == course_id).order_by(models.Module.order).all()
-    return modules
+    # Proyección SQL: solo se leen las columnas pedidas
+    rows = db.execute(
+        select(*selected.columns(models.Module))
+        .where(models.Module.course_id == course_id)
+        .order_by(models.Module.order)
+    )
+    return selected.shape([dict(row._mapping) for row in rows])
 
 @router.put("/{module_id}/assign-professor")
 def assign_professor_to_module(
@@ -46,7 +68,7 @@ def assign_professor_to_module(
         raise HTTPException(status_code=404, detail="Module not found")
     
     if professor_id:
-        professor = db.query(models.Professor).filter(models.Professor.id == professor_id).first()
+        professor = entity_cache.professor(db, professor_id)
         if not professor:
             raise HTTPException(status_code=404, detail="Professor not found")
         module.professor_id = professor_id
@@ -61,7 +83,7 @@ def assign_professor_to_module(
         "module_id": module.id,
         "module_name": module.name,
         "professor_id": module.professor_id,
-        "professor_name": professor.name if professor_id else None
+        "professor_name": professor["name"] if professor_id else None
     }
 
 @router.post("/bulk-assign")
@@ -123,9 +145,9 @@ def unassign_professor_from_module(module_id: int, db: Session = Depends(get_db)
     
     professor_name = "No one" if not module.professor_id else "Unknown"
     if module.professor_id:
-        professor = db.query(models.Professor).filter(models.Professor.id == module.professor_id).first()
+        professor = entity_cache.professor(db, module.professor_id)
         if professor:
-            professor_name = professor.name
+            professor_name = professor["name"]
     
     module.professor_id = None
     db.commit()
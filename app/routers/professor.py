@@ -1,13 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app import models, schemas
-from app.database import get_db
-from typing import List, Optional
-from sqlalchemy import text
-from dateutil.relativedelta import relativedelta
+from app import catalogue, crud, encoding, entity_cache, fields, lookup, models, ndjson, schemas, purge, response_cache, streaming, versions, warm_cache
+from app.database import get_db, sees_uncommitted
+from typing import List, Optional, Union
+from datetime import datetime
 
 
-router = APIRouter(prefix="/professors", tags=["professors"])
+router = APIRouter(prefix="/professors", tags=["professors"], route_class=encoding.NegotiatedRoute)
+
+SCHEDULE_TABLES = ("professors", "professor_courses", "courses", "modules", "course_module_sessions")
+# Horario ya armado por profesor: professor_id -> (versiones, horario)
+schedule_cache: dict[int, tuple] = {}
+warm_cache.register("professor_schedules", lambda: dict(schedule_cache), schedule_cache.update, SCHEDULE_TABLES)
+
+PROFESSOR_FIELDS = fields.selection(
+    ("id", "name", "first_name", "last_name", "email", "phone", "bio", "specialties", "is_active"),
+    ("courses",),
+)
+PROFESSOR_LISTING = Union[list[schemas.ProfessorRead], schemas.BatchLookup, schemas.SparseRows]
 
 
 @router.post("/bulk-load/")
@@ -15,26 +26,36 @@ def bulk_load_professors(
     data: List[schemas.ProfessorCreate] = Body(...),
     db: Session = Depends(get_db)
 ):
-    for entry in data:
-        existing_prof = db.query(models.Professor).filter_by(name=entry.name).first()
-        if existing_prof:
-            continue
-        new_prof = models.Professor(name=entry.name)
-        for course_name in entry.course_names:
-            course = db.query(models.Course).filter_by(name=course_name).first()
-            if course:
-                new_prof.courses.append(course)
-        db.add(new_prof)
+    crud.bulk_create_professors(db, data)
     db.commit()
     return {"message": "Profes cargados"}
 
-@router.get("/", response_model=list[schemas.ProfessorRead])
-def read_professors(db: Session = Depends(get_db)):
-    profs = db.query(models.Professor).all()
-    return [
-        schemas.ProfessorRead(id=prof.id, name=prof.name, courses=[c.name for c in prof.courses])
-        for prof in profs
-    ]
+@router.post("/bulk-load/ndjson")
+async def bulk_load_professors_ndjson(request: Request, chunk_size: int = ndjson.CHUNK_SIZE_QUERY):
+    """Stream NDJSON (optionally gzip) professor rows into the database chunk by chunk"""
+    return ndjson.import_response(request, schemas.ProfessorCreate, crud.bulk_create_professors, chunk_size)
+
+@router.get("/", response_model=PROFESSOR_LISTING, dependencies=[versions.etag("professors", "professor_courses", "courses")])
+@response_cache.cached_response("professors", "professor_courses", "courses", response_model=PROFESSOR_LISTING)
+def read_professors(
+    selected: fields.Selection = Depends(PROFESSOR_FIELDS),
+    keys: Optional[lookup.Keys] = Depends(lookup.batch_keys),
+    db: Session = Depends(get_db),
+):
+    snapshot = catalogue.get()
+    if keys is not None:
+        # Nombres repetidos: en `ambiguous` con sus IDs, no se elige ninguno
+        found, not_found, ambiguous = lookup.resolve(keys, snapshot.professor, snapshot.professors_named)
+        items = [_professor_row(snapshot, prof, selected) for prof in found]
+        return encoding.Plain({"items": items, "not_found": not_found, "ambiguous": ambiguous})
+    return selected.shape([_professor_row(snapshot, prof, selected) for prof in snapshot.professors])
+
+
+def _professor_row(snapshot, prof, selected):
+    row = {name: getattr(prof, name) for name in selected.fields}
+    if "courses" in selected.relations:
+        row["courses"] = [snapshot.course(course_id).name for course_id in prof.course_ids]
+    return row
 
 
 @router.get("/{professor_id}/sessions", response_model=list[schemas.CourseModuleSessionRead])
@@ -63,14 +84,36 @@ def delete_professor(professor_id: int, db: Session = Depends(get_db)):
 
 @router.delete("/delete-all/")
 def delete_all_professors(db: Session = Depends(get_db)):
-    db.execute(text("DELETE FROM professor_courses"))  # Rompe relaciones M2M
-    num_deleted = db.query(models.Professor).delete()
+    """Tombstone every professor; links and assignments are purged in the background"""
+    num_deleted = db.query(models.Professor).filter(models.Professor.deleted_at.is_(None)).update(
+        {"deleted_at": datetime.utcnow()}, synchronize_session=False
+    )
     db.commit()
-    return {"message": f"{num_deleted} profesores eliminados"}
+    progress = purge.schedule("professors", marked=num_deleted)
+    return {"message": f"{num_deleted} profesores eliminados", "purge": progress}
+
+@router.get("/delete-all/status")
+def delete_all_professors_status():
+    """Progress of the background purge started by delete-all"""
+    return purge.status("professors")
 
 @router.get("/{professor_id}/schedule")
-def get_professor_schedule(professor_id: int, db: Session = Depends(get_db)):
+def get_professor_schedule(
+    professor_id: int, stream: Optional[str] = streaming.STREAM_QUERY, db: Session = Depends(get_db)
+):
     """Get a professor's complete schedule with course information"""
+    if stream:
+        if not entity_cache.professor(db, professor_id):
+            raise HTTPException(status_code=404, detail="Professor not found")
+        return streaming.query_response(_schedule_query(professor_id), stream)
+
+    data_versions = versions.current(SCHEDULE_TABLES)
+    # Con escrituras sin confirmar las versiones no cambian todavía: ni se lee ni se guarda
+    uncommitted = sees_uncommitted(db)
+    cached = None if uncommitted else schedule_cache.get(professor_id)
+    if cached is not None and cached[0] == data_versions:
+        return cached[1]
+
     professor = db.query(models.Professor).filter(models.Professor.id == professor_id).first()
     if not professor:
         raise HTTPException(status_code=404, detail="Professor not found")
@@ -92,10 +135,37 @@ def get_professor_schedule(professor_id: int, db: Session = Depends(get_db)):
                     "module_id": module.id
                 })
     
-    # Sort by date
-    schedule.sort(key=lambda x: x["date"])
+    # Por fecha; dentro del día, el mismo orden que la versión en streaming (_schedule_query)
+    schedule.sort(key=lambda x: (x["date"], x["course_id"], x["module_id"], x["session_id"]))
+    if not uncommitted:
+        schedule_cache[professor_id] = (data_versions, schedule)
+        warm_cache.touch()
     return schedule
 
+def _schedule_query(professor_id):
+    # Misma forma y orden que el horario armado en memoria, en una sola consulta
+    links = models.professor_courses
+    session, module, course = models.CourseModuleSession, models.Module, models.Course
+    return (
+        select(
+            session.id.label("session_id"),
+            session.session_number,
+            session.date,
+            session.status,
+            session.extra_note,
+            session.hours,
+            course.name.label("course_name"),
+            module.name.label("module_name"),
+            course.id.label("course_id"),
+            module.id.label("module_id"),
+        )
+        .join(module, module.id == session.module_id)
+        .join(course, course.id == module.course_id)
+        .join(links, links.c.course_id == course.id)
+        .where(links.c.professor_id == professor_id)
+        .order_by(session.date, course.id, module.id, session.id)
+    )
+
 @router.put("/{professor_id}/assign-to-module/{module_id}")
 def assign_professor_to_module(
     professor_id: int, 
@@ -103,7 +173,7 @@ def assign_professor_to_module(
     db: Session = Depends(get_db)
 ):
     """Assign a professor to a specific module"""
-    professor = db.query(models.Professor).filter(models.Professor.id == professor_id).first()
+    professor = entity_cache.professor(db, professor_id)
     module = db.query(models.Module).filter(models.Module.id == module_id).first()
     
     if not professor:
@@ -113,9 +183,9 @@ def assign_professor_to_module(
     
     module.professor_id = professor_id
     db.commit()
-    return {"message": f"Professor {professor.name} assigned to module {module.name}"}
+    return {"message": f"Professor {professor['name']} assigned to module {module.name}"}
 
-@router.get("/{professor_id}/modules")
+@router.get("/{professor_id}/modules", dependencies=[versions.etag("professors", "modules", "courses")])
 def get_professor_modules(professor_id: int, db: Session = Depends(get_db)):
     """Get all modules assigned to a specific professor"""
     professor = db.query(models.Professor).filter(models.Professor.id == professor_id).first()
@@ -126,13 +196,13 @@ def get_professor_modules(professor_id: int, db: Session = Depends(get_db)):
     
     modules_data = []
     for module in modules:
-        course = db.query(models.Course).filter(models.Course.id == module.course_id).first()
+        course = entity_cache.course(db, module.course_id)
         modules_data.append({
             "module_id": module.id,
             "module_name": module.name,
             "module_order": module.order,
-            "course_id": course.id,
-            "course_name": course.name,
+            "course_id": course["id"],
+            "course_name": course["name"],
             "hours": module.hours,
             "syllabus_status": module.syllabus_status
         })
@@ -241,7 +311,7 @@ def bulk_delete_professors(professor_ids: List[int], db: Session = Depends(get_d
 def create_professor(professor: schemas.ProfessorCreate, db: Session = Depends(get_db)):
     """Create a new professor"""
     # Check if professor already exists
-    existing_professor = db.query(models.Professor).filter(models.Professor.name == professor.name).first()
+    existing_professor = entity_cache.professor_by_name(db, professor.name)
     if existing_professor:
         raise HTTPException(status_code=400, detail="Professor with this name already exists")
     
@@ -252,10 +322,7 @@ def create_professor(professor: schemas.ProfessorCreate, db: Session = Depends(g
     db.refresh(db_professor)
     
     # Assign to courses if provided
-    for course_name in professor.course_names:
-        course = db.query(models.Course).filter(models.Course.name == course_name).first()
-        if course:
-            db_professor.courses.append(course)
+    crud.sync_professor_courses(db, db_professor, professor.course_names)
     
     db.commit()
     db.refresh(db_professor)
@@ -266,11 +333,10 @@ def create_professor(professor: schemas.ProfessorCreate, db: Session = Depends(g
         courses=[course.name for course in db_professor.courses]
     )
 
-@router.get("/available-courses")
-def get_available_courses(db: Session = Depends(get_db)):
+@router.get("/available-courses", dependencies=[versions.etag("courses")])
+def get_available_courses():
     """Get all available courses for assignment"""
-    courses = db.query(models.Course).all()
-    return [{"id": course.id, "name": course.name} for course in courses]
+    return [{"id": course.id, "name": course.name} for course in catalogue.get().courses]
 
 @router.get("/{professor_id}/details", response_model=schemas.ProfessorDetailRead)
 def get_professor_details(professor_id: int, db: Session = Depends(get_db)):
@@ -279,6 +345,8 @@ def get_professor_details(professor_id: int, db: Session = Depends(get_db)):
     if not professor:
         raise HTTPException(status_code=404, detail="Professor not found")
     
+    from dateutil.relativedelta import relativedelta
+
     # Get courses with dates
     courses_data = []
     for course in professor.courses:
@@ -299,7 +367,7 @@ def get_professor_details(professor_id: int, db: Session = Depends(get_db)):
     syllabus_stats = {"hay_documento": 0, "no_hay_documento": 0, "pendiente": 0}
     
     for module in modules:
-        course = db.query(models.Course).filter(models.Course.id == module.course_id).first()
+        course = entity_cache.course(db, module.course_id)
         module_hours = module.hours or 2
         total_hours += module_hours
         
@@ -315,7 +383,7 @@ def get_professor_details(professor_id: int, db: Session = Depends(get_db)):
             "id": module.id,
             "name": module.name,
             "order": module.order,
-            "course_name": course.name if course else "Unknown",
+            "course_name": course["name"] if course else "Unknown",
             "course_id": module.course_id,
             "hours": module_hours,
             "syllabus_status": module.syllabus_status,
@@ -369,11 +437,7 @@ def update_professor_details(
     
     # Update course assignments if provided
     if course_names is not None:
-        professor.courses.clear()
-        for course_name in course_names:
-            course = db.query(models.Course).filter(models.Course.name == course_name).first()
-            if course:
-                professor.courses.append(course)
+        crud.sync_professor_courses(db, professor, course_names)
     
     db.commit()
     db.refresh(professor)
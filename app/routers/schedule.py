@@ -1,67 +1,84 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app import models, schemas
-from datetime import timedelta
-from dateutil.relativedelta import relativedelta
-from dateutil import parser as date_parser
-from holidays import CountryHoliday
-from dateutil.rrule import rrule, WEEKLY
-from datetime import datetime
-import unicodedata
-import re
+from app.database import get_db, sees_uncommitted
+from app import catalogue, encoding, models, response_cache, schemas, singleflight, versions, warm_cache
+from app.course_calendar import HOLIDAY_CALENDAR_VERSION, expand_sessions
 
-router = APIRouter(prefix="/courses", tags=["CourseSchedulePreview"])
-hd = CountryHoliday("PE")
+router = APIRouter(prefix="/courses", tags=["CourseSchedulePreview"], route_class=encoding.NegotiatedRoute)
 
-# Lógica para convertir string tipo "Lunes y Miércoles" a días numéricos
-days_map = {
-    "lunes": 0,
-    "martes": 1,
-    "miércoles": 2,
-    "miercoles": 2,
-    "jueves": 3,
-    "viernes": 4,
-    "sábado": 5,
-    "sabado": 5,
-    "domingo": 6
-}
+# Entradas del preview por curso: course_id -> (clave, entrada). La clave incluye la
+# versión de la fila, los profesores vinculados y el calendario de feriados.
+preview_cache: dict[int, tuple] = {}
 
-def parse_days(schedule_str: str):
-    if not schedule_str:
-        return []
-    normalized = unicodedata.normalize("NFKD", schedule_str.lower()).encode("ASCII", "ignore").decode("utf-8")
-    words = re.findall(r'\b[a-z]+', normalized)  # extrae solo palabras como "lunes", "sabado", etc.
-    return [days_map[day] for day in days_map if day in words]
+PREVIEW_TABLES = ("courses", "professors", "professor_courses")
 
-@router.get("/schedule-preview", response_model=list[schemas.CourseSchedulePreview])
+# Cada entrada lleva su propia clave de validez, así que se restaura sin comprobar versiones
+warm_cache.register("schedule_preview", lambda: dict(preview_cache), preview_cache.update)
+
+@router.get(
+    "/schedule-preview",
+    response_model=list[schemas.CourseSchedulePreview],
+    dependencies=[versions.etag(*PREVIEW_TABLES)],
+)
+@singleflight.coalesce
+@response_cache.cached_response(*PREVIEW_TABLES, response_model=list[schemas.CourseSchedulePreview])
 def get_schedule_preview(db: Session = Depends(get_db)):
-    courses = db.query(models.Course).all()
-    previews = []
+    courses = db.execute(
+        select(
+            models.Course.id,
+            models.Course.name,
+            models.Course.start_date,
+            models.Course.schedule,
+            models.Course.duration_months,
+            models.Course.version,
+        ).order_by(models.Course.id)
+    ).all()
 
+    professors_by_course = {}
+    links = models.professor_courses
+    for course_id, professor_name in db.execute(
+        select(links.c.course_id, models.Professor.name)
+        .join(models.Professor, models.Professor.id == links.c.professor_id)
+        .order_by(models.Professor.id)
+    ):
+        professors_by_course.setdefault(course_id, []).append(professor_name)
+
+    mapped = catalogue.get()
+    # Con escrituras sin confirmar, la versión del curso puede no llegar a existir nunca
+    uncommitted = sees_uncommitted(db)
+    previews = []
     for course in courses:
-        print(f"Curso: {course.name} | Fecha inicio: {course.start_date} | Horario: {course.schedule} | Duración: {course.duration_months}")
         if not course.start_date or not course.schedule:
             continue
 
-        start = course.start_date
-        end = start + relativedelta(months=course.duration_months)
-        weekdays = parse_days(course.schedule)
-        sessions = []
+        professors = professors_by_course.get(course.id, [])
+        key = (course.version, tuple(professors), HOLIDAY_CALENDAR_VERSION)
+        cached = None if uncommitted else preview_cache.get(course.id)
+        if cached is not None and cached[0] == key:
+            previews.append(cached[1])
+            continue
 
-        for dt in rrule(WEEKLY, byweekday=weekdays, dtstart=start, until=end):
-            if dt.date() not in hd:
-                sessions.append(dt.date().isoformat())
+        # Las fechas ya expandidas de la instantánea compartida valen si es la misma versión del curso
+        sessions = mapped.session_dates(course.id, course.version, HOLIDAY_CALENDAR_VERSION)
+        if sessions is None:
+            sessions = expand_sessions(course.start_date, course.duration_months, course.schedule)
+        entry = {
+            "course_name": course.name,
+            "start_date": course.start_date,
+            "schedule": course.schedule,
+            "professors": professors,
+            "sessions": sessions,
+        }
+        if not uncommitted:
+            preview_cache[course.id] = (key, entry)
+            warm_cache.touch()
+        previews.append(entry)
 
-        previews.append(schemas.CourseSchedulePreview(
-            course_name=course.name,
-            start_date=course.start_date,
-            schedule=course.schedule,
-            professors=[p.name for p in course.professors],
-            sessions=sessions
-        ))
+    # Olvidar cursos eliminados o que ya no tienen horario
+    previewed_ids = {course.id for course in courses if course.start_date and course.schedule}
+    for course_id in list(preview_cache):
+        if course_id not in previewed_ids:
+            preview_cache.pop(course_id, None)
 
     return previews
-
-
-    print(course.name, course.start_date, course.schedule, course.duration_months)
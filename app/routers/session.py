@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.orm import Session
-from app import models, schemas
+from typing import Optional, Union
+from app import crud, encoding, fields, models, ndjson, schemas, streaming, versions
 from app.database import get_db
 
-router = APIRouter(prefix="/sessions", tags=["sessions"])
+router = APIRouter(prefix="/sessions", tags=["sessions"], route_class=encoding.NegotiatedRoute)
+
+SESSION_FIELDS = fields.selection(("id", "session_number", "date", "status", "extra_note", "module_id"))
 
 @router.post("/", response_model=schemas.CourseModuleSessionRead)
 def create_session(session: schemas.CourseModuleSessionCreate, db: Session = Depends(get_db)):
@@ -13,6 +17,11 @@ def create_session(session: schemas.CourseModuleSessionCreate, db: Session = Dep
     db.refresh(db_session)
     return db_session
 
+@router.post("/bulk-load/ndjson")
+async def bulk_load_sessions_ndjson(request: Request, chunk_size: int = ndjson.CHUNK_SIZE_QUERY):
+    """Stream NDJSON (optionally gzip) session rows into the database chunk by chunk"""
+    return ndjson.import_response(request, schemas.CourseModuleSessionCreate, crud.bulk_create_sessions, chunk_size)
+
 @router.get("/by-module/{module_id}", response_model=list[schemas.CourseModuleSessionRead])
 def get_sessions_by_module(module_id: int, db: Session = Depends(get_db)):
     return db.query(models.CourseModuleSession).filter_by(course_module_id=module_id).all()
@@ -30,6 +39,93 @@ def update_session(session_id: int, updates: schemas.CourseModuleSessionUpdate,
     db.refresh(db_session)
     return db_session
 
+@router.patch("/", response_model=list[schemas.CourseModuleSessionPatchResult])
+def patch_sessions(patches: list[schemas.CourseModuleSessionPatch], db: Session = Depends(get_db)):
+    """Apply many partial session updates in a single transaction"""
+    requested_ids = {patch.id for patch in patches}
+    existing_ids = set(db.execute(
+        select(models.CourseModuleSession.id).where(models.CourseModuleSession.id.in_(requested_ids))
+    ).scalars()) if requested_ids else set()
+
+    results = []
+    rows = []
+    seen = set()
+    for patch in patches:
+        values = patch.dict(exclude_unset=True)
+        if patch.id not in existing_ids:
+            results.append({"id": patch.id, "updated": False, "error": "Session not found"})
+        elif patch.id in seen:
+            results.append({"id": patch.id, "updated": False, "error": "Duplicate session id in batch"})
+        elif len(values) == 1:
+            results.append({"id": patch.id, "updated": False, "error": "No fields to update"})
+        else:
+            rows.append(values)
+            results.append({"id": patch.id, "updated": True})
+        seen.add(patch.id)
+
+    # UPDATE ... WHERE id = :id por lotes (executemany), agrupado por columnas tocadas
+    if rows:
+        db.execute(update(models.CourseModuleSession), rows)
+        db.commit()
+    return results
+
+@router.post("/transition", response_model=schemas.SessionTransitionResult)
+def transition_sessions(transition: schemas.SessionTransitionRequest, db: Session = Depends(get_db)):
+    """Move every session matching the filter to target_status in one statement"""
+    ModuleSession = models.CourseModuleSession
+    conditions = []
+    if transition.date is not None:
+        conditions.append(ModuleSession.date == transition.date)
+    if transition.date_from is not None:
+        conditions.append(ModuleSession.date >= transition.date_from)
+    if transition.date_to is not None:
+        conditions.append(ModuleSession.date <= transition.date_to)
+    if transition.current_status is not None:
+        conditions.append(ModuleSession.status == transition.current_status)
+
+    # Filtros de curso, categoría y profesor se resuelven vía los módulos
+    module_conditions = []
+    if transition.course_id is not None:
+        module_conditions.append(models.Module.course_id == transition.course_id)
+    if transition.category is not None:
+        module_conditions.append(models.Course.category == transition.category)
+    if transition.professor_id is not None:
+        module_conditions.append(models.Module.professor_id == transition.professor_id)
+    if not conditions and not module_conditions:
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+
+    # El UPDATE no pasa por el filtro de lectura del ORM: los módulos marcados se excluyen
+    # siempre aquí, así el dry-run y el cambio real cuentan las mismas sesiones
+    live_module_ids = (
+        select(models.Module.id)
+        .outerjoin(models.Course, models.Course.id == models.Module.course_id)
+        .where(models.Module.deleted_at.is_(None), models.Course.deleted_at.is_(None), *module_conditions)
+    )
+    if module_conditions:
+        conditions.append(ModuleSession.module_id.in_(live_module_ids))
+    else:
+        conditions.append(or_(ModuleSession.module_id.is_(None), ModuleSession.module_id.in_(live_module_ids)))
+
+    if transition.dry_run:
+        matched = db.execute(select(func.count()).select_from(ModuleSession).where(*conditions)).scalar()
+        return {"dry_run": True, "target_status": transition.target_status, "matched": matched}
+
+    rows = db.execute(
+        update(ModuleSession)
+        .where(*conditions)
+        .values(status=transition.target_status)
+        .returning(ModuleSession.id, ModuleSession.session_number, ModuleSession.date, ModuleSession.module_id),
+        execution_options={"synchronize_session": False},
+    ).all()
+    db.commit()
+
+    return {
+        "dry_run": False,
+        "target_status": transition.target_status,
+        "matched": len(rows),
+        "sessions": [row._asdict() for row in rows],
+    }
+
 @router.delete("/{session_id}")
 def delete_session(session_id: int, db: Session = Depends(get_db)):
     db_session = db.query(models.CourseModuleSession).filter(models.CourseModuleSession.id == session_id).first()
@@ -40,9 +136,21 @@ def delete_session(session_id: int, db: Session = Depends(get_db)):
     db.commit()
     return {"message": "Session deleted successfully"}
 
-@router.get("/", response_model=list[schemas.CourseModuleSessionRead])
-def get_all_sessions(db: Session = Depends(get_db)):
-    return db.query(models.CourseModuleSession).all()
+@router.get("/", response_model=Union[list[schemas.CourseModuleSessionRead], schemas.SparseRows], dependencies=[versions.etag("course_module_sessions", "modules")])
+def get_all_sessions(
+    selected: fields.Selection = Depends(SESSION_FIELDS),
+    stream: Optional[str] = streaming.STREAM_QUERY,
+    db: Session = Depends(get_db),
+):
+    if stream:
+        return streaming.query_response(
+            select(*selected.columns(models.CourseModuleSession)).order_by(models.CourseModuleSession.id), stream
+        )
+    if not selected.sparse:
+        return db.query(models.CourseModuleSession).all()
+    # Proyección SQL: solo se leen las columnas pedidas
+    rows = db.execute(select(*selected.columns(models.CourseModuleSession)).order_by(models.CourseModuleSession.id))
+    return selected.shape([dict(row._mapping) for row in rows])
 
 @router.delete("/{session_id}")
 def delete_session(session_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import encoding, schemas, sync
+from app.database import get_db
+
+router = APIRouter(tags=["Sync"], route_class=encoding.NegotiatedRoute)
+
+
+@router.get("/sync", response_model=schemas.SyncDelta)
+def get_changes(
+    since: Optional[str] = Query(None, description="Token from the previous call; omit it for a full snapshot"),
+    page: Optional[str] = Query(None, description="`next_page` of the previous page of a full snapshot"),
+    limit: int = Query(sync.PAGE_SIZE, ge=1, le=sync.MAX_PAGE_SIZE, description="Rows per page of a full snapshot"),
+    db: Session = Depends(get_db),
+):
+    """Rows created, updated or deleted since `since`, plus the token for the next call
+
+    Without `since` the full state comes in pages: follow `next_page` until it is null.
+    A `since` older than the tombstone retention answers 410; start again with a full snapshot.
+    """
+    try:
+        if since is not None:
+            return sync.delta(db, int(since))
+        return sync.snapshot_page(db, page, limit)
+    except sync.TokenExpired as exc:
+        raise HTTPException(status_code=410, detail=str(exc))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid sync token: {since if page is None else page}")
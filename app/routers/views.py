@@ -0,0 +1,118 @@
+"""Vistas compuestas: todo lo que una pantalla necesita al cargar, en una sola respuesta.
+
+`/views/course-schedule` reemplaza la cascada de CourseScheduleTable.jsx (/courses/,
+/professors/ y luego /courses/{id}/modules-with-professors y /professors/{id}/modules
+por cada tarjeta) con un bundle normalizado: entidades por ID más los mapas de
+asignación. Son cuatro consultas fijas sobre una misma foto de la base: en PostgreSQL
+van en una transacción REPEATABLE READ, así un commit entre ellas no deja módulos ni
+asignaciones de cursos que no están en `courses`. Dentro de un /batch atómico van sobre
+la sesión del lote, que ve sus propias escrituras sin confirmar.
+"""
+import contextlib
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import database, encoding, models, response_cache, schemas, singleflight, versions
+from app.database import SessionLocal, engine, get_db
+
+router = APIRouter(prefix="/views", tags=["Views"], route_class=encoding.NegotiatedRoute)
+
+COURSE_SCHEDULE_TABLES = ("courses", "modules", "professors", "professor_courses")
+
+@contextlib.contextmanager
+def _snapshot(db):
+    """Session whose reads all see the same state of the database"""
+    if database.sees_uncommitted(db):
+        yield db
+        return
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execution_options(isolation_level="REPEATABLE READ")
+        snapshot = SessionLocal(bind=connection)
+        try:
+            yield snapshot
+        finally:
+            snapshot.close()
+
+
+def _courses(db):
+    return db.execute(select(
+        models.Course.id,
+        models.Course.name,
+        models.Course.duration_months,
+        models.Course.start_date,
+        models.Course.schedule,
+        models.Course.is_active,
+        models.Course.category,
+    ).order_by(models.Course.id)).all()
+
+
+def _modules(db):
+    return db.execute(select(
+        models.Module.id,
+        models.Module.name,
+        models.Module.order,
+        models.Module.course_id,
+        models.Module.professor_id,
+        models.Module.hours,
+        models.Module.syllabus_status,
+        models.Module.observations,
+    ).order_by(models.Module.course_id, models.Module.order, models.Module.id)).all()
+
+
+def _professors(db):
+    return db.execute(select(
+        models.Professor.id,
+        models.Professor.name,
+        models.Professor.email,
+        models.Professor.specialties,
+        models.Professor.is_active,
+    ).order_by(models.Professor.id)).all()
+
+
+def _links(db):
+    # El join con Professor deja fuera a los profesores borrados (filtro de tombstones del ORM)
+    links = models.professor_courses
+    return db.execute(
+        select(links.c.course_id, links.c.professor_id)
+        .join(models.Professor, models.Professor.id == links.c.professor_id)
+        .order_by(links.c.course_id, links.c.professor_id)
+    ).all()
+
+
+@router.get(
+    "/course-schedule",
+    response_model=schemas.CourseScheduleView,
+    dependencies=[versions.etag(*COURSE_SCHEDULE_TABLES)],
+)
+@singleflight.coalesce
+@response_cache.cached_response(*COURSE_SCHEDULE_TABLES, response_model=schemas.CourseScheduleView)
+def get_course_schedule_view(db: Session = Depends(get_db)):
+    """Courses, modules, professors and their assignments for the course-schedule screen"""
+    with _snapshot(db) as snapshot:
+        courses, modules, professors, links = (
+            query(snapshot) for query in (_courses, _modules, _professors, _links)
+        )
+
+    course_modules = {course.id: [] for course in courses}
+    course_professors = {course.id: [] for course in courses}
+    professor_modules = {professor.id: [] for professor in professors}
+    for module in modules:
+        if module.course_id in course_modules:
+            course_modules[module.course_id].append(module.id)
+        if module.professor_id in professor_modules:
+            professor_modules[module.professor_id].append(module.id)
+    for course_id, professor_id in links:
+        if course_id in course_professors:
+            course_professors[course_id].append(professor_id)
+
+    return {
+        "courses": {course.id: dict(course._mapping) for course in courses},
+        "modules": {module.id: dict(module._mapping) for module in modules},
+        "professors": {professor.id: dict(professor._mapping) for professor in professors},
+        "course_modules": course_modules,
+        "course_professors": course_professors,
+        "professor_modules": professor_modules,
+    }
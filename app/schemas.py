@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List, Any, Dict
+import datetime
 from datetime import date
 from app import models, schemas
 from enum import Enum
@@ -177,6 +178,42 @@ class CourseModuleSessionRead(CourseModuleSessionBase):
     class Config:
         from_attributes = True
 
+class CourseModuleSessionPatch(BaseModel):
+    id: int
+    status: Optional[SessionStatusEnum] = None
+    date: Optional[datetime.date] = None
+    extra_note: Optional[str] = None
+    hours: Optional[int] = None
+
+class CourseModuleSessionPatchResult(BaseModel):
+    id: int
+    updated: bool
+    error: Optional[str] = None
+
+class SessionTransitionRequest(BaseModel):
+    # Filtros: todos los indicados deben cumplirse
+    date: Optional[datetime.date] = None
+    date_from: Optional[datetime.date] = None
+    date_to: Optional[datetime.date] = None
+    course_id: Optional[int] = None
+    category: Optional[str] = None
+    professor_id: Optional[int] = None
+    current_status: Optional[SessionStatusEnum] = None
+    target_status: SessionStatusEnum
+    dry_run: bool = False
+
+class SessionTransitionItem(BaseModel):
+    id: int
+    session_number: Optional[int]
+    date: Optional[datetime.date]
+    module_id: Optional[int]
+
+class SessionTransitionResult(BaseModel):
+    dry_run: bool
+    target_status: SessionStatusEnum
+    matched: int
+    sessions: List[SessionTransitionItem] = []
+
 # ---------- MODULE TABLE VIEW ----------
 
 class AcademicModuleView(BaseModel):
@@ -242,4 +279,90 @@ class ProfessorModulesResponse(BaseModel):
 
 class ModuleAssignment(BaseModel):
     module_id: int
-    professor_id: Optional[int]  # None to unassign
\ No newline at end of file
+    professor_id: Optional[int]  # None to unassign
+# ---------- COURSE SCHEDULE SCREEN ----------
+
+class ScheduleViewCourse(BaseModel):
+    id: int
+    name: str
+    duration_months: int
+    start_date: Optional[date]
+    schedule: Optional[str]
+    is_active: Optional[bool]
+    category: Optional[str]
+
+class ScheduleViewModule(BaseModel):
+    id: int
+    name: str
+    order: Optional[int]
+    course_id: Optional[int]
+    professor_id: Optional[int]
+    hours: Optional[int]
+    syllabus_status: Optional[str]
+    observations: Optional[str]
+
+class ScheduleViewProfessor(BaseModel):
+    id: int
+    name: str
+    email: Optional[str]
+    specialties: Optional[str]
+    is_active: Optional[bool]
+
+class CourseScheduleView(BaseModel):
+    courses: Dict[int, ScheduleViewCourse]
+    modules: Dict[int, ScheduleViewModule]
+    professors: Dict[int, ScheduleViewProfessor]
+    course_modules: Dict[int, List[int]]  # módulos de cada curso, por orden
+    course_professors: Dict[int, List[int]]
+    professor_modules: Dict[int, List[int]]
+
+# ---------- SPARSE FIELDS / LOOKUP ----------
+
+SparseRows = List[Dict[str, Any]]  # ?fields= / ?include=: solo las columnas y relaciones pedidas
+
+class LookupMisses(BaseModel):
+    ids: List[int] = []
+    names: List[str] = []
+
+class BatchLookup(BaseModel):
+    # ?ids= / ?names=: filas en el orden pedido y las claves que no existen
+    items: SparseRows
+    not_found: LookupMisses
+    ambiguous: Dict[str, List[int]] = {}  # nombres repetidos -> sus IDs
+
+# ---------- BATCH REQUESTS ----------
+
+class BatchOperation(BaseModel):
+    method: str
+    path: str  # con query string, p. ej. "/courses/?ids=1,2"
+    body: Optional[Any] = None
+    headers: Dict[str, str] = {}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    atomic: bool = False  # todo o nada: una subpetición fallida deshace las anteriores
+
+class BatchResult(BaseModel):
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+# ---------- DELTA SYNC ----------
+
+class SyncTable(BaseModel):
+    reset: bool  # True: `updated` es la tabla completa y reemplaza la copia local
+    updated: List[Dict[str, Any]] = []
+    deleted: List[int] = []
+
+class SyncLinks(BaseModel):
+    reset: bool
+    updated: List[Dict[str, Any]] = []  # {"course_id", "professor_ids"} por curso con vínculos cambiados
+
+class SyncDelta(BaseModel):
+    token: str  # pasarlo como `since` en la próxima llamada
+    next_page: Optional[str] = None  # estado completo: pasarlo como `page` hasta que venga vacío
+    courses: SyncTable
+    modules: SyncTable
+    professors: SyncTable
+    course_module_sessions: SyncTable
+    professor_courses: SyncLinks
@@ -0,0 +1,86 @@
+"""Coalescencia de peticiones GET idénticas (single-flight).
+
+Con `@singleflight.coalesce` debajo del decorador del router, las peticiones
+concurrentes con los mismos parámetros esperan a una única ejecución en curso y
+comparten su resultado (o su error). Solo para rutas idempotentes: el resultado se
+calcula con la sesión de la primera petición. Una petición que ve escrituras sin
+confirmar (ver database.sees_uncommitted) corre sola: ni espera ni comparte.
+"""
+import asyncio
+import functools
+
+from fastapi import Response
+from starlette.concurrency import run_in_threadpool
+
+from app import encoding
+from app.database import sees_uncommitted
+
+_inflight = {}  # clave -> Future con el resultado compartido
+_stats = {}
+
+
+class _SharedResponse:
+    """Immutable copy of a Response; every waiter gets its own instance"""
+    __slots__ = ("body", "status_code", "raw_headers")
+
+    def __init__(self, response):
+        self.body = response.body
+        self.status_code = response.status_code
+        self.raw_headers = list(response.raw_headers)
+
+    def build(self):
+        # FastAPI añade a la respuesta las cabeceras de las dependencias: no se puede compartir el objeto
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = list(self.raw_headers)
+        return response
+
+
+def _share(result):
+    return result.build() if isinstance(result, _SharedResponse) else result
+
+
+def coalesce(func):
+    """Share one execution of `func` among concurrent calls with the same arguments"""
+    name = f"{func.__module__}.{func.__qualname__}"
+    counters = _stats.setdefault(name, {"executions": 0, "coalesced": 0})
+
+    @functools.wraps(func)
+    async def wrapper(**kwargs):
+        if sees_uncommitted(kwargs.get("db")):
+            return await run_in_threadpool(func, **kwargs)
+
+        key = (name, encoding.current_format(), tuple(sorted((arg, value) for arg, value in kwargs.items() if arg != "db")))
+        pending = _inflight.get(key)
+        if pending is not None:
+            counters["coalesced"] += 1
+            # shield: si esta petición se cancela, la ejecución compartida sigue para las demás
+            return _share(await asyncio.shield(pending))
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        counters["executions"] += 1
+        try:
+            result = await run_in_threadpool(func, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # evita el aviso de excepción no recuperada si nadie esperaba
+            raise
+        finally:
+            _inflight.pop(key, None)
+
+        if isinstance(result, Response):
+            result = _SharedResponse(result)
+        future.set_result(result)
+        return _share(result)
+
+    return wrapper
+
+
+def stats():
+    result = {name: dict(counters) for name, counters in _stats.items()}
+    calls = sum(counters["executions"] + counters["coalesced"] for counters in _stats.values())
+    coalesced = sum(counters["coalesced"] for counters in _stats.values())
+    return {"routes": result, "in_flight": len(_inflight), "coalesced_rate": coalesced / calls if calls else None}
@@ -0,0 +1,363 @@
+"""Archivo binario inmutable con el catálogo, compartido entre workers vía `mmap`.
+
+Un worker construye el catálogo, lo escribe en un archivo temporal y lo publica con
+`os.replace` (atómico): los demás ven la nueva versión en su siguiente lectura y la
+mapean en modo lectura sin volver a consultar la base. Las páginas del archivo las
+comparte el sistema operativo, así que la memoria no crece con el número de workers.
+
+Formato (little endian): cabecera fija, tablas de registros de tamaño fijo ordenadas
+por ID, arrays de IDs para la búsqueda binaria, un pool de enteros con las listas de
+vínculos, un pool int32 con las fechas de clase (días desde 1970-01-01) y la tabla de
+strings UTF-8. Los registros se decodifican al acceder; los strings, al leer el campo.
+"""
+import contextlib
+import datetime
+import mmap
+import os
+import struct
+from bisect import bisect_left
+
+from app import lookup, state
+
+MAGIC = b"MALICAT1"
+TABLES = ("courses", "modules", "professors", "professor_courses")
+
+NULL_INT = -(2 ** 31)
+NULL_ID = -1
+NULL_STR = 0xFFFFFFFF
+NULL_BOOL = 2
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+# magic, versiones de TABLES, versión del calendario (str), cantidades y offsets de sección
+HEADER = struct.Struct("<8s4q2I3I9Q")
+COURSE = struct.Struct("<q2Iii2IB2Iq2I2I2I")
+MODULE = struct.Struct("<q2Iiqq2I2Ii")
+PROFESSOR = struct.Struct("<q2I2I2I2I2I2I2IBi2I")
+
+
+def default_path():
+    # En el directorio privado de estado: el archivo lleva email y teléfono de los profesores
+    return state.path("catalogue") + ".snapshot"
+
+
+PATH = os.getenv("CATALOGUE_SNAPSHOT_PATH", default_path())
+
+
+# ---------- ESCRITURA ----------
+
+class _Writer:
+    def __init__(self):
+        self.strings = bytearray()
+        self.string_refs = {}
+        self.ints = []
+        self.dates = []
+
+    def string(self, value):
+        if value is None:
+            return NULL_STR, 0
+        ref = self.string_refs.get(value)
+        if ref is None:
+            encoded = str(value).encode()
+            ref = self.string_refs[value] = (len(self.strings), len(encoded))
+            self.strings += encoded
+        return ref
+
+    def int_list(self, values):
+        start = len(self.ints)
+        self.ints.extend(values)
+        return start, len(values)
+
+    def date_list(self, values):
+        start = len(self.dates)
+        self.dates.extend(day.toordinal() - EPOCH for day in values)
+        return start, len(values)
+
+
+def _int(value):
+    return NULL_INT if value is None else value
+
+
+def _id(value):
+    return NULL_ID if value is None else value
+
+
+def _bool(value):
+    return NULL_BOOL if value is None else int(value)
+
+
+def _day(value):
+    return NULL_INT if value is None else value.toordinal() - EPOCH
+
+
+def serialize(catalogue, class_days, calendar_version):
+    """Encode `catalogue` (see catalogue.Catalogue) and each course's class days into bytes"""
+    writer = _Writer()
+    courses = bytearray()
+    for course in catalogue.courses:
+        courses += COURSE.pack(
+            course.id, *writer.string(course.name), _int(course.duration_months), _day(course.start_date),
+            *writer.string(course.schedule), _bool(course.is_active), *writer.string(course.category),
+            course.version, *writer.int_list(course.module_ids), *writer.int_list(course.professor_ids),
+            *writer.date_list(class_days.get(course.id, ())),
+        )
+    modules = bytearray()
+    for module in catalogue.modules:
+        modules += MODULE.pack(
+            module.id, *writer.string(module.name), _int(module.order), _id(module.course_id),
+            _id(module.professor_id), *writer.string(module.syllabus_status),
+            *writer.string(module.observations), _int(module.hours),
+        )
+    professors = bytearray()
+    for professor in catalogue.professors:
+        professors += PROFESSOR.pack(
+            professor.id, *writer.string(professor.name), *writer.string(professor.first_name),
+            *writer.string(professor.last_name), *writer.string(professor.email),
+            *writer.string(professor.phone), *writer.string(professor.bio),
+            *writer.string(professor.specialties), _bool(professor.is_active), _day(professor.created_at),
+            *writer.int_list(professor.course_ids),
+        )
+    calendar_ref = writer.string(calendar_version)
+
+    sections = [
+        courses,
+        modules,
+        professors,
+        struct.pack(f"<{len(catalogue.courses)}q", *(course.id for course in catalogue.courses)),
+        struct.pack(f"<{len(catalogue.modules)}q", *(module.id for module in catalogue.modules)),
+        struct.pack(f"<{len(catalogue.professors)}q", *(professor.id for professor in catalogue.professors)),
+        struct.pack(f"<{len(writer.ints)}q", *writer.ints),
+        struct.pack(f"<{len(writer.dates)}i", *writer.dates),
+        bytes(writer.strings),
+    ]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        # Cada sección alineada a 8 bytes para poder verla como array de enteros
+        position += -position % 8
+        offsets.append(position)
+        position += len(section)
+
+    body = bytearray(HEADER.pack(
+        MAGIC, *(catalogue.versions[table] for table in TABLES), *calendar_ref,
+        len(catalogue.courses), len(catalogue.modules), len(catalogue.professors), *offsets,
+    ))
+    for offset, section in zip(offsets, sections):
+        body += bytes(offset - len(body))
+        body += section
+    return bytes(body)
+
+
+@contextlib.contextmanager
+def build_lock(path=PATH):
+    """Serialize snapshot builds across worker processes (no-op where fcntl is unavailable)"""
+    with state.lock(path + ".lock"):
+        yield
+
+
+def publish(data, path=PATH):
+    """Atomically replace the snapshot file with `data` (readable only by this user)"""
+    state.write(data, path)
+
+
+# ---------- LECTURA ----------
+
+def _str_field(index):
+    def getter(self):
+        offset, length = self._values[index], self._values[index + 1]
+        if offset == NULL_STR:
+            return None
+        return self._snapshot._string(offset, length)
+    return property(getter)
+
+
+def _int_field(index, null=NULL_INT):
+    def getter(self):
+        value = self._values[index]
+        return None if value == null else value
+    return property(getter)
+
+
+def _bool_field(index):
+    def getter(self):
+        value = self._values[index]
+        return None if value == NULL_BOOL else bool(value)
+    return property(getter)
+
+
+def _date_field(index):
+    def getter(self):
+        value = self._values[index]
+        return None if value == NULL_INT else datetime.date.fromordinal(value + EPOCH)
+    return property(getter)
+
+
+def _ids_field(index):
+    def getter(self):
+        start, count = self._values[index], self._values[index + 1]
+        return self._snapshot._ints[start:start + count]
+    return property(getter)
+
+
+class _View:
+    __slots__ = ("_snapshot", "_values")
+
+    def __init__(self, snapshot, values):
+        self._snapshot = snapshot
+        self._values = values
+
+
+class CourseView(_View):
+    __slots__ = ()
+    id = _int_field(0)
+    name = _str_field(1)
+    duration_months = _int_field(3)
+    start_date = _date_field(4)
+    schedule = _str_field(5)
+    is_active = _bool_field(7)
+    category = _str_field(8)
+    version = _int_field(10)
+    module_ids = _ids_field(11)
+    professor_ids = _ids_field(13)
+
+    @property
+    def class_days(self):
+        """Class days as int32 day numbers since 1970-01-01 (a zero-copy view of the file)"""
+        start, count = self._values[15], self._values[16]
+        return self._snapshot._dates[start:start + count]
+
+
+class ModuleView(_View):
+    __slots__ = ()
+    id = _int_field(0)
+    name = _str_field(1)
+    order = _int_field(3)
+    course_id = _int_field(4, NULL_ID)
+    professor_id = _int_field(5, NULL_ID)
+    syllabus_status = _str_field(6)
+    observations = _str_field(8)
+    hours = _int_field(10)
+
+
+class ProfessorView(_View):
+    __slots__ = ()
+    id = _int_field(0)
+    name = _str_field(1)
+    first_name = _str_field(3)
+    last_name = _str_field(5)
+    email = _str_field(7)
+    phone = _str_field(9)
+    bio = _str_field(11)
+    specialties = _str_field(13)
+    is_active = _bool_field(15)
+    created_at = _date_field(16)
+    course_ids = _ids_field(17)
+
+
+class _Records:
+    """Read-only sequence over a fixed-size record table"""
+    __slots__ = ("_snapshot", "_record", "_view", "_offset", "_count")
+
+    def __init__(self, snapshot, record, view, offset, count):
+        self._snapshot = snapshot
+        self._record = record
+        self._view = view
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        values = self._record.unpack_from(self._snapshot._buffer, self._offset + index * self._record.size)
+        return self._view(self._snapshot, values)
+
+    def __iter__(self):
+        for values in self._record.iter_unpack(
+            self._snapshot._buffer[self._offset:self._offset + self._count * self._record.size]
+        ):
+            yield self._view(self._snapshot, values)
+
+
+class MappedCatalogue(lookup.NameIndex):
+    """Catalogue read straight from a mapped snapshot file; same lookups as catalogue.Catalogue"""
+
+    def __init__(self, path=PATH):
+        # Solo archivos de este usuario que nadie más pueda reescribir: se mapean sin más validación
+        with state.open_private(path) as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(snapshot_file.fileno())
+        self.file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._buffer = memoryview(self._mmap)
+
+        (magic, *values) = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalogue snapshot")
+        self.versions = dict(zip(TABLES, values[:4]))
+        calendar_offset, calendar_length = values[4:6]
+        n_courses, n_modules, n_professors = values[6:9]
+        (courses_at, modules_at, professors_at, course_ids_at, module_ids_at, professor_ids_at,
+         ints_at, dates_at, strings_at) = values[9:]
+
+        self._strings = self._buffer[strings_at:]
+        self.calendar_version = self._string(calendar_offset, calendar_length)
+        self._ints = self._buffer[ints_at:dates_at].cast("q")
+        self._dates = self._buffer[dates_at:strings_at].cast("i")
+        self._course_ids = self._buffer[course_ids_at:course_ids_at + 8 * n_courses].cast("q")
+        self._module_ids = self._buffer[module_ids_at:module_ids_at + 8 * n_modules].cast("q")
+        self._professor_ids = self._buffer[professor_ids_at:professor_ids_at + 8 * n_professors].cast("q")
+        self.courses = _Records(self, COURSE, CourseView, courses_at, n_courses)
+        self.modules = _Records(self, MODULE, ModuleView, modules_at, n_modules)
+        self.professors = _Records(self, PROFESSOR, ProfessorView, professors_at, n_professors)
+        self._names = {}
+
+    def _string(self, offset, length):
+        return str(self._strings[offset:offset + length], "utf-8")
+
+    @staticmethod
+    def _find(ids, records, entity_id):
+        position = bisect_left(ids, entity_id)
+        if position < len(ids) and ids[position] == entity_id:
+            return records[position]
+        return None
+
+    def course(self, course_id):
+        return self._find(self._course_ids, self.courses, course_id)
+
+    def module(self, module_id):
+        return self._find(self._module_ids, self.modules, module_id)
+
+    def professor(self, professor_id):
+        return self._find(self._professor_ids, self.professors, professor_id)
+
+    def session_dates(self, course_id, version, calendar_version):
+        """ISO class days of a course, or None if the snapshot was built from another version of it"""
+        course = self.course(course_id)
+        if course is None or course.version != version or self.calendar_version != calendar_version:
+            return None
+        return [datetime.date.fromordinal(day + EPOCH).isoformat() for day in course.class_days]
+
+
+def file_id(path=PATH):
+    """Identity of the published file, to notice a swap without reading it"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def open_current(wanted_versions, path=PATH):
+    """Map the published snapshot if it was built from `wanted_versions`, else None"""
+    try:
+        mapped = MappedCatalogue(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if mapped.versions != {table: wanted_versions[table] for table in TABLES}:
+        return None
+    return mapped
@@ -0,0 +1,60 @@
+"""Tiempos de arranque: import de la app y cada paso del lifespan, contra un presupuesto.
+
+`app.main` importa este módulo primero; el informe queda en /metrics/startup y en el
+log. Para medir solo el import en un proceso limpio (por ejemplo en CI):
+
+    python -m app.startup
+
+que termina con código 1 si el import supera `IMPORT_BUDGET_SECONDS`.
+"""
+import contextlib
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "1.5"))
+
+_started = time.perf_counter()
+_report = {"import_seconds": None, "import_budget_seconds": IMPORT_BUDGET_SECONDS, "phases": {}, "ready_seconds": None}
+
+
+def imported():
+    """Record how long importing the app took"""
+    elapsed = time.perf_counter() - _started
+    _report["import_seconds"] = round(elapsed, 4)
+    if elapsed > IMPORT_BUDGET_SECONDS:
+        logger.warning("Importing the app took %.3fs (budget %.3fs)", elapsed, IMPORT_BUDGET_SECONDS)
+
+
+@contextlib.contextmanager
+def phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _report["phases"][name] = round(time.perf_counter() - started, 4)
+
+
+def ready():
+    _report["ready_seconds"] = round(time.perf_counter() - _started, 4)
+    logger.info(
+        "Startup: import %.3fs, %s, ready after %.3fs",
+        _report["import_seconds"] or 0,
+        ", ".join(f"{name} {seconds:.3f}s" for name, seconds in _report["phases"].items()),
+        _report["ready_seconds"],
+    )
+
+
+def report():
+    return {**_report, "phases": dict(_report["phases"])}
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    import app.main  # noqa: F401
+    elapsed = time.perf_counter() - started
+    print(f"import app.main: {elapsed:.3f}s (budget {IMPORT_BUDGET_SECONDS:.3f}s)")
+    sys.exit(1 if elapsed > IMPORT_BUDGET_SECONDS else 0)
@@ -0,0 +1,112 @@
+"""Directorio privado de estado local: snapshot del catálogo, caché en caliente y candados.
+
+`MALI_STATE_DIR`, o por defecto `$XDG_STATE_HOME/mali-scheduler` (~/.local/state/...).
+Los archivos contienen datos personales (email, teléfono de los profesores) y los demás
+workers los cargan sin más validación, así que el directorio se crea con permisos 0700 y
+los archivos con 0600, y solo se abren archivos del propio usuario que nadie más pueda
+modificar. Los nombres llevan un hash de DATABASE_URL para que dos entornos en la misma
+máquina no se pisen.
+"""
+import contextlib
+import hashlib
+import os
+import stat
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin candado entre procesos
+    fcntl = None
+
+from app.database import DATABASE_URL
+
+DIR = os.getenv("MALI_STATE_DIR") or os.path.join(
+    os.getenv("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"), "mali-scheduler"
+)
+
+# Windows no tiene uid ni bits de permisos POSIX: ahí solo se crea el directorio
+_POSIX = hasattr(os, "getuid")
+
+
+def _check(stat_result, path):
+    """Refuse files or directories owned by another user or writable by group/others"""
+    if not _POSIX:
+        return
+    if stat_result.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not owned by the current user")
+    if stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{path} is writable by other users")
+
+
+def directory(path=DIR):
+    """Create the state directory (0700) if needed and check nobody else controls it"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    _check(info, path)
+    if _POSIX and stat.S_IMODE(info.st_mode) != 0o700:
+        # Es nuestro: se cierra a los demás usuarios
+        os.chmod(path, 0o700)
+    return path
+
+
+def path(name):
+    """Per-database file called `name` inside the state directory"""
+    digest = hashlib.sha1((DATABASE_URL or "").encode()).hexdigest()[:10]
+    return os.path.join(DIR, f"{name}-{digest}")
+
+
+def write(data, target):
+    """Atomically replace `target` with `data`, as a file only this user can read"""
+    folder = os.path.dirname(target) or "."
+    if folder == DIR:
+        directory()
+    # mkstemp crea el archivo con 0600
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, target)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def open_private(target):
+    """Open `target` for reading, refusing symlinks and files another user owns or can write"""
+    fd = os.open(target, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0))
+    try:
+        # Se comprueba el archivo ya abierto: no se puede cambiar entre la comprobación y la lectura
+        _check(os.fstat(fd), target)
+        return os.fdopen(fd, "rb")
+    except BaseException:
+        os.close(fd)
+        raise
+
+
+@contextlib.contextmanager
+def lock(target, blocking=True):
+    """Exclusive lock on `target` across processes; yields False if not blocking and it is taken"""
+    if fcntl is None:
+        yield True
+        return
+    folder = os.path.dirname(target) or "."
+    if folder == DIR:
+        directory()
+    fd = os.open(target, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
@@ -0,0 +1,75 @@
+"""Exportaciones en streaming: `?stream=json` (un array JSON) o `?stream=ndjson` (una fila por línea).
+
+Las filas se leen con `yield_per` (cursor del lado del servidor en PostgreSQL) y se
+codifican y envían por bloques de `STREAM_CHUNK_ROWS`, así que la memoria no crece con
+la tabla y el cliente recibe los primeros bytes enseguida. La consulta usa su propia
+sesión: la de la petición se cierra antes de que empiece el cuerpo.
+
+El streaming siempre es JSON; MessagePack solo está en las respuestas completas.
+"""
+import os
+
+from fastapi import Query
+from starlette.responses import StreamingResponse
+
+from app import encoding
+from app.database import SessionLocal
+
+CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "500"))
+
+JSON = "json"
+NDJSON = "ndjson"
+
+STREAM_QUERY = Query(
+    None,
+    pattern="^(json|ndjson)$",
+    description="Stream the full result: `json` (one array) or `ndjson` (one row per line)",
+)
+
+MEDIA_TYPES = {JSON: "application/json", NDJSON: "application/x-ndjson"}
+
+
+def _encode(rows, mode):
+    """Bytes for an iterable of row dicts, one chunk every CHUNK_ROWS rows"""
+    if mode == NDJSON:
+        chunk = []
+        for row in rows:
+            chunk.append(encoding.dumps(row))
+            if len(chunk) >= CHUNK_ROWS:
+                yield b"\n".join(chunk) + b"\n"
+                chunk = []
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+        return
+
+    yield b"["
+    chunk = []
+    first = True
+    for row in rows:
+        chunk.append(encoding.dumps(row))
+        if len(chunk) >= CHUNK_ROWS:
+            yield (b"" if first else b",") + b",".join(chunk)
+            first, chunk = False, []
+    if chunk:
+        yield (b"" if first else b",") + b",".join(chunk)
+    yield b"]"
+
+
+def _query_rows(statement):
+    db = SessionLocal()
+    try:
+        # yield_per: el ORM pide las filas por lotes y activa stream_results (cursor con nombre en psycopg2)
+        for row in db.execute(statement, execution_options={"yield_per": CHUNK_ROWS}):
+            yield dict(row._mapping)
+    finally:
+        db.close()
+
+
+def rows_response(rows, mode: str):
+    """Stream an iterable of plain row dicts as a JSON array or NDJSON"""
+    return StreamingResponse(_encode(rows, mode), media_type=MEDIA_TYPES[mode])
+
+
+def query_response(statement, mode: str):
+    """Stream the rows of a column SELECT (labels become keys) on a session of its own"""
+    return rows_response(_query_rows(statement), mode)
@@ -0,0 +1,372 @@
+"""Sincronización incremental: qué filas cambiaron desde un token (ver GET /sync).
+
+Cada commit que escribe en courses, modules, professors o course_module_sessions toma
+el siguiente número de una secuencia global (la fila "sync" de data_versions) y lo
+deja en `sync_seq` / `updated_at` de las filas que tocó. Los borrados físicos quedan en
+`sync_tombstones`; los lógicos (deleted_at) se ven en la propia fila. Los vínculos
+profesor-curso no tienen ID: se registra en `sync_tombstones` el curso cuyos vínculos
+cambiaron y se envía su lista completa de profesores.
+
+La fila del contador queda bloqueada hasta el commit, así que los commits se confirman
+en el orden de su número y un token (el último número confirmado) no se salta ninguno.
+Si no se pudo saber qué filas borró un DELETE masivo, se registra la tabla entera
+(row_id NULL) y el cliente la recibe completa.
+
+Los tombstones se guardan `SYNC_TOMBSTONE_RETENTION_DAYS`; al podarlos sube el token
+mínimo (fila "sync_floor") y un `since` anterior ya no se puede servir (410: hay que
+volver a pedir el estado completo). El estado completo sale por páginas de `limit`
+filas, en orden de tabla e ID, todas con el token de la primera página.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Table, delete, event, func, insert, select, update
+
+from app import models, versions
+from app.database import Base, SessionLocal
+
+SYNC_KEY = "sync"  # fila de data_versions con el último número de la secuencia
+FLOOR_KEY = "sync_floor"  # y con el token más antiguo que todavía se puede servir
+MAX_TRACKED_IDS = int(os.getenv("SYNC_MAX_TRACKED_IDS", "10000"))
+RETENTION_DAYS = float(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+PRUNE_EVERY = int(os.getenv("SYNC_PRUNE_EVERY", "100"))  # poda cada tantos commits
+PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "1000"))
+MAX_PAGE_SIZE = int(os.getenv("SYNC_MAX_PAGE_SIZE", "10000"))
+_CHUNK = 1000
+
+
+class TokenExpired(Exception):
+    """The tombstones after this token were pruned: the client needs a full snapshot"""
+
+LINKS = "professor_courses"
+ENTITIES = {
+    "courses": models.Course,
+    "modules": models.Module,
+    "professors": models.Professor,
+    "course_module_sessions": models.CourseModuleSession,
+}
+
+# Columnas que recibe el cliente de cada tabla
+FIELDS = {
+    "courses": ("id", "name", "duration_months", "start_date", "schedule", "is_active", "category", "version", "updated_at"),
+    "modules": ("id", "name", "order", "course_id", "syllabus_status", "observations", "professor_id", "hours", "updated_at"),
+    "professors": (
+        "id", "name", "first_name", "last_name", "email", "phone", "bio", "specialties", "is_active", "updated_at",
+    ),
+    "course_module_sessions": ("id", "session_number", "date", "status", "extra_note", "module_id", "hours", "updated_at"),
+}
+
+sync_tombstones = Table(
+    "sync_tombstones",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("table_name", String, nullable=False),
+    Column("row_id", Integer, nullable=True),  # NULL: cambió la tabla entera
+    Column("sync_seq", BigInteger, nullable=False, index=True),
+    Column("deleted_at", DateTime, nullable=False),
+)
+
+
+# ---------- REGISTRO EN CADA COMMIT ----------
+# session.info["sync_removed"]: tabla -> IDs borrados (cursos, para los vínculos), o None si no se conocen
+
+def _record(session, table, ids):
+    removed = session.info.setdefault("sync_removed", {})
+    if ids is None or removed.get(table, set()) is None:
+        removed[table] = None
+    else:
+        removed.setdefault(table, set()).update(ids)
+
+
+def _affected(execute_state, column):
+    """IDs matched by the WHERE of a bulk UPDATE/DELETE, read before it runs (None above MAX_TRACKED_IDS)"""
+    statement = execute_state.statement
+    query = select(column).distinct().limit(MAX_TRACKED_IDS + 1)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    params = execute_state.parameters if isinstance(execute_state.parameters, dict) else None
+    ids = execute_state.session.connection().execute(query, params).scalars().all()
+    return None if len(ids) > MAX_TRACKED_IDS else set(ids)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_deletes(session, flush_context):
+    for obj in session.deleted:
+        if obj.__table__.name in ENTITIES:
+            _record(session, obj.__table__.name, {obj.id})
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_bulk(execute_state):
+    if not (execute_state.is_update or execute_state.is_delete):
+        return
+    table = execute_state.statement.table
+    if table.name == LINKS:
+        _record(execute_state.session, LINKS, _affected(execute_state, table.c.course_id))
+    elif table.name in ENTITIES:
+        if execute_state.is_delete:
+            _record(execute_state.session, table.name, _affected(execute_state, table.c.id))
+        elif not isinstance(execute_state.parameters, list):
+            # UPDATE masivo: las filas quedan sin número y el commit las sella (las de UPDATE por
+            # clave primaria ya vienen con sus IDs en versions)
+            execute_state.statement = execute_state.statement.values(sync_seq=None)
+
+
+def _next_seq(connection):
+    data_versions = versions.data_versions
+    seq = connection.execute(
+        update(data_versions)
+        .where(data_versions.c.table_name == SYNC_KEY)
+        .values(version=data_versions.c.version + 1)
+        .returning(data_versions.c.version)
+    ).scalar()
+    if seq is None:
+        connection.execute(insert(data_versions).values(table_name=SYNC_KEY, version=1))
+        seq = 1
+    return seq
+
+
+def prune(connection, now=None):
+    """Drop tombstones older than RETENTION_DAYS and raise the oldest servable token; the new floor"""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=RETENTION_DAYS)
+    floor = connection.execute(
+        select(func.max(sync_tombstones.c.sync_seq)).where(sync_tombstones.c.deleted_at < cutoff)
+    ).scalar()
+    if floor is None:
+        return None
+    connection.execute(delete(sync_tombstones).where(sync_tombstones.c.sync_seq <= floor))
+    data_versions = versions.data_versions
+    raised = connection.execute(
+        update(data_versions)
+        .where(data_versions.c.table_name == FLOOR_KEY, data_versions.c.version < floor)
+        .values(version=floor)
+    ).rowcount
+    if not raised and _floor(connection) == 0:
+        connection.execute(insert(data_versions).values(table_name=FLOOR_KEY, version=floor))
+    return floor
+
+
+def _floor(connection):
+    data_versions = versions.data_versions
+    return connection.execute(
+        select(data_versions.c.version).where(data_versions.c.table_name == FLOOR_KEY)
+    ).scalar() or 0
+
+
+def _chunks(ids):
+    ids = sorted(ids)
+    for start in range(0, len(ids), _CHUNK):
+        yield ids[start:start + _CHUNK]
+
+
+def _stamp(session):
+    # Hook de versions: corre después del flush y de subir las versiones, con "touched" ya completo
+    touched = session.info.get("touched") or {}
+    removed = session.info.get("sync_removed") or {}
+    tables = [name for name in ENTITIES if name in touched]
+    if not tables and not removed and LINKS not in touched:
+        return
+
+    connection = session.connection()
+    seq = _next_seq(connection)
+    now = datetime.utcnow()
+    for name in tables:
+        table = ENTITIES[name].__table__
+        # Las columnas con onupdate (courses.version) no deben subir por el sellado
+        values = {"sync_seq": seq, "updated_at": now}
+        values.update({
+            column.name: column for column in table.c if column.onupdate is not None and column.name not in values
+        })
+        # Filas nuevas y de UPDATE masivos (sin número) más las que el flush tocó por ID
+        connection.execute(update(table).where(table.c.sync_seq.is_(None)).values(values))
+        for chunk in _chunks(touched[name] or ()):
+            connection.execute(update(table).where(table.c.id.in_(chunk)).values(values))
+
+    if LINKS in touched or LINKS in removed:
+        # Cursos con vínculos cambiados: los del flush (versions) más los de UPDATE/DELETE masivos
+        flushed, bulk = touched.get(LINKS, set()), removed.get(LINKS, set())
+        if flushed is None and LINKS in removed:
+            flushed = set()  # versions no conoce los IDs de los masivos; aquí ya se resolvieron
+        removed = {**removed, LINKS: None if flushed is None or bulk is None else flushed | bulk}
+
+    markers = []
+    for name, ids in removed.items():
+        for row_id in ([None] if ids is None else sorted(ids)):
+            markers.append({"table_name": name, "row_id": row_id, "sync_seq": seq, "deleted_at": now})
+    if markers:
+        connection.execute(insert(sync_tombstones), markers)
+    if seq % PRUNE_EVERY == 0:
+        prune(connection, now)
+
+
+versions.add_commit_hook(_stamp)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _clear(session):
+    session.info.pop("sync_removed", None)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget(session, previous_transaction):
+    session.info.pop("sync_removed", None)
+
+
+# ---------- LECTURA DEL DELTA ----------
+
+def current_token(db):
+    data_versions = versions.data_versions
+    return db.execute(
+        select(data_versions.c.version).where(data_versions.c.table_name == SYNC_KEY)
+    ).scalar() or 0
+
+
+def _entity_query(name, model):
+    columns = [getattr(model, field) for field in FIELDS[name]]
+    # Las sesiones no tienen borrado lógico
+    soft_deleted = getattr(model, "deleted_at", None)
+    query = select(*columns, *([soft_deleted] if soft_deleted is not None else [])).order_by(model.id)
+    return query, soft_deleted
+
+
+def _split_deleted(db, query):
+    updated, deleted = [], set()
+    for row in db.execute(query, execution_options={"include_deleted": True}):
+        values = dict(row._mapping)
+        if values.pop("deleted_at", None) is not None:
+            deleted.add(values["id"])
+        else:
+            updated.append(values)
+    return updated, deleted
+
+
+def _professors_by_course(db, course_ids=None, after=None, limit=None):
+    """Professor IDs linked to each course, for `course_ids` or (paging) for the first `limit` courses after `after`"""
+    links = models.professor_courses
+    if after is not None:
+        course_ids = db.execute(
+            select(links.c.course_id).distinct()
+            .where(links.c.course_id > after).order_by(links.c.course_id).limit(limit)
+        ).scalars().all()
+    professors_by_course = {} if course_ids is None else {course_id: [] for course_id in course_ids}
+    if course_ids is not None and not course_ids:
+        return professors_by_course
+    query = select(links.c.course_id, links.c.professor_id).order_by(links.c.course_id, links.c.professor_id)
+    if course_ids is not None:
+        query = query.where(links.c.course_id.in_(sorted(course_ids)))
+    for course_id, professor_id in db.execute(query):
+        professors_by_course.setdefault(course_id, []).append(professor_id)
+    return professors_by_course
+
+
+def _links_entry(reset, professors_by_course):
+    return {
+        "reset": reset,
+        "updated": [
+            {"course_id": course_id, "professor_ids": professor_ids}
+            for course_id, professor_ids in sorted(professors_by_course.items())
+        ],
+    }
+
+
+def delta(db, since):
+    """Rows changed after token `since` and the token to use next time
+
+    Tables the client must replace whole come back with reset=True. Raises TokenExpired
+    if the tombstones after `since` were already pruned.
+    """
+    token = current_token(db)
+    if since > token:
+        raise ValueError(f"Unknown sync token: {since}")
+    if since < _floor(db.connection()):
+        raise TokenExpired(f"Sync token {since} expired: fetch a full snapshot without since")
+
+    markers = {}
+    for table_name, row_id in db.execute(
+        select(sync_tombstones.c.table_name, sync_tombstones.c.row_id)
+        .where(sync_tombstones.c.sync_seq > since, sync_tombstones.c.sync_seq <= token)
+    ):
+        ids = markers.setdefault(table_name, set())
+        if ids is not None:
+            markers[table_name] = None if row_id is None else ids | {row_id}
+
+    result = {"token": str(token), "next_page": None}
+    for name, model in ENTITIES.items():
+        reset = name in markers and markers[name] is None
+        query, soft_deleted = _entity_query(name, model)
+        if reset:
+            if soft_deleted is not None:
+                query = query.where(soft_deleted.is_(None))
+        else:
+            query = query.where(model.sync_seq > since, model.sync_seq <= token)
+        updated, deleted = _split_deleted(db, query)
+        if not reset:
+            deleted |= markers.get(name) or set()
+        result[name] = {"reset": reset, "updated": updated, "deleted": [] if reset else sorted(deleted)}
+
+    reset = LINKS in markers and markers[LINKS] is None
+    result[LINKS] = _links_entry(reset, _professors_by_course(db, None if reset else markers.get(LINKS, set())))
+    return result
+
+
+def _page_cursor(page):
+    try:
+        token, position, after = (int(part) for part in page.split("."))
+    except ValueError:
+        raise ValueError(f"Invalid sync page: {page}")
+    if not 0 <= position <= len(ENTITIES):
+        raise ValueError(f"Invalid sync page: {page}")
+    return token, position, after
+
+
+def snapshot_page(db, page=None, limit=PAGE_SIZE):
+    """One page of the full state: up to `limit` rows, table by table in ID order
+
+    Every page carries the token read for the first one, so a later `since` covers what
+    changed while paging. A table comes with reset=True on the page where it starts; its
+    rows on later pages are added to it. `next_page` is None on the last page.
+    """
+    if page is None:
+        token, position, after = current_token(db), 0, 0
+    else:
+        token, position, after = _page_cursor(page)
+
+    result = {"token": str(token), "next_page": None}
+    remaining = limit
+    names = list(ENTITIES)
+    for index, name in enumerate(names):
+        start = after if index == position else 0
+        if index < position or result["next_page"] is not None:
+            result[name] = {"reset": False, "updated": [], "deleted": []}
+            continue
+        if not remaining:
+            # Página llena justo al final de la tabla anterior: esta empieza en la siguiente
+            result["next_page"] = f"{token}.{index}.0"
+            result[name] = {"reset": False, "updated": [], "deleted": []}
+            continue
+        model = ENTITIES[name]
+        query, soft_deleted = _entity_query(name, model)
+        query = query.where(model.id > start).limit(remaining + 1)
+        if soft_deleted is not None:
+            query = query.where(soft_deleted.is_(None))
+        updated, _ = _split_deleted(db, query)
+        if len(updated) > remaining:
+            updated = updated[:remaining]
+            result["next_page"] = f"{token}.{index}.{updated[-1]['id']}"
+        remaining -= len(updated)
+        result[name] = {"reset": start == 0, "updated": updated, "deleted": []}
+
+    links_index = len(names)
+    if result["next_page"] is not None or not remaining:
+        if result["next_page"] is None:
+            result["next_page"] = f"{token}.{links_index}.0"
+        result[LINKS] = _links_entry(False, {})
+        return result
+    start = after if position == links_index else 0
+    professors_by_course = _professors_by_course(db, after=start, limit=remaining + 1)
+    if len(professors_by_course) > remaining:
+        kept = sorted(professors_by_course)[:remaining]
+        professors_by_course = {course_id: professors_by_course[course_id] for course_id in kept}
+        result["next_page"] = f"{token}.{links_index}.{kept[-1]}"
+    result[LINKS] = _links_entry(start == 0, professors_by_course)
+    return result
@@ -0,0 +1,256 @@
+"""Contadores de versión por tabla y ETags derivados de ellos.
+
+Cada commit que escribe en una tabla seguida sube su contador en `data_versions`
+dentro de la misma transacción. Los GET calculan su ETag a partir de los contadores
+de las tablas que leen y responden 304 sin tocar el ORM si el cliente ya la tiene.
+"""
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import BigInteger, Column, String, Table, event, inspect, select, update
+
+from app import encoding
+from app.database import Base, SessionLocal, engine
+
+TRACKED_TABLES = ("courses", "modules", "professors", "professor_courses", "course_module_sessions")
+
+data_versions = Table(
+    "data_versions",
+    Base.metadata,
+    Column("table_name", String, primary_key=True),
+    Column("version", BigInteger, nullable=False, default=0),
+)
+
+
+@event.listens_for(data_versions, "after_create")
+def _seed_versions(target, connection, **kw):
+    connection.execute(data_versions.insert(), [{"table_name": name, "version": 0} for name in TRACKED_TABLES])
+
+
+# ---------- REGISTRO DE CAMBIOS ----------
+# session.info["touched"]: tabla -> set de IDs modificados, o None si no se conocen (UPDATE/DELETE masivo)
+
+_listeners = []
+_commit_hooks = []
+
+
+def add_listener(callback):
+    """Call `callback(changes)` after every commit that wrote to a tracked table
+
+    `changes` maps table name -> {"ids": sorted IDs or None when unknown, "version": new version}.
+    Changes committed by this process may also carry a "scope" added by a commit hook (see app.events).
+    """
+    _listeners.append(callback)
+
+
+def add_commit_hook(callback):
+    """Call `callback(session)` in every before_commit, once the flush and the version bump are done
+
+    Runs in the committing transaction; session.info["touched"] still holds what the commit wrote.
+    """
+    _commit_hooks.append(callback)
+
+
+def _mark(session, table, ids=None):
+    if table not in TRACKED_TABLES:
+        return
+    touched = session.info.setdefault("touched", {})
+    if ids is None or touched.get(table, set()) is None:
+        touched[table] = None
+    else:
+        touched.setdefault(table, set()).update(ids)
+
+
+def _link_changes(obj):
+    """Course IDs whose professor_courses rows change with this object's collections"""
+    state = inspect(obj)
+    course_ids = set()
+    for relationship in state.mapper.relationships:
+        if relationship.secondary is None or relationship.secondary.name not in TRACKED_TABLES:
+            continue
+        history = state.attrs[relationship.key].history
+        if not history.has_changes():
+            continue
+        if obj.__table__.name == "courses":
+            course_ids.add(obj.id)
+        else:
+            course_ids.update(course.id for course in (*history.added, *history.deleted))
+    return course_ids
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = obj.__table__.name
+        if obj in session.new or obj in session.deleted or session.is_modified(obj, include_collections=False):
+            _mark(session, table, {obj.id})
+        link_course_ids = _link_changes(obj)
+        if link_course_ids:
+            _mark(session, "professor_courses", link_course_ids)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_bulk(execute_state):
+    if not (execute_state.is_insert or execute_state.is_update or execute_state.is_delete):
+        return
+    table = execute_state.statement.table.name
+    params = execute_state.parameters
+    # UPDATE masivo por clave primaria (lista de dicts con "id"): los IDs se conocen
+    if execute_state.is_update and isinstance(params, list) and params and all("id" in row for row in params):
+        _mark(execute_state.session, table, {row["id"] for row in params})
+    elif execute_state.is_insert and table == "professor_courses" and isinstance(params, list):
+        _mark(execute_state.session, table, {row["course_id"] for row in params})
+    else:
+        _mark(execute_state.session, table)
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _bump_versions(session):
+    session.flush()
+    touched = session.info.get("touched")
+    if touched:
+        rows = session.connection().execute(
+            update(data_versions)
+            .where(data_versions.c.table_name.in_(touched))
+            .values(version=data_versions.c.version + 1)
+            .returning(data_versions.c.table_name, data_versions.c.version)
+        ).all()
+        session.info["committed"] = {
+            table: {"ids": sorted(ids) if ids is not None else None, "version": version}
+            for table, version in rows
+            for ids in [touched[table]]
+        }
+    # Desde aquí y no como listeners propios: el orden no depende del orden de los imports
+    for hook in _commit_hooks:
+        hook(session)
+
+
+def dispatch(changes):
+    """Record the new versions in `changes` and pass them to every listener"""
+    _remember(changes)
+    for listener in _listeners:
+        listener(changes)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_changes(session):
+    session.info.pop("touched", None)
+    changes = session.info.pop("committed", None)
+    if not changes:
+        return
+    deferred = session.info.get("deferred_changes")
+    if deferred is None:
+        dispatch(changes)
+        return
+    # Commit de un savepoint: los cambios esperan a que se confirme la transacción externa
+    for table, change in changes.items():
+        previous = deferred.get(table)
+        if previous is not None:
+            change = _merge_change(previous, change)
+        deferred[table] = change
+
+
+def _merge_change(previous, change):
+    if change["ids"] is None or previous["ids"] is None:
+        return {"ids": None, "version": change["version"]}
+    merged = {"ids": sorted({*previous["ids"], *change["ids"]}), "version": change["version"]}
+    if previous.get("scope") is not None and change.get("scope") is not None:
+        # (cursos, profesores) de cada commit: el cambio conjunto afecta a ambos
+        merged["scope"] = tuple(a | b for a, b in zip(previous["scope"], change["scope"]))
+    return merged
+
+
+def defer_changes(session):
+    """Hold back the changes committed by `session` until publish_deferred (or discard them on rollback)"""
+    session.info["deferred_changes"] = {}
+
+
+def publish_deferred(session, committed=True):
+    """Dispatch the changes held back by defer_changes once the outer transaction commits"""
+    changes = session.info.pop("deferred_changes", None)
+    if committed and changes:
+        dispatch(changes)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget_changes(session, previous_transaction):
+    session.info.pop("touched", None)
+    session.info.pop("committed", None)
+
+
+# ---------- LECTURA Y ETAGS ----------
+# Mientras app.notify escucha los cambios de los demás workers, las versiones se sirven
+# desde memoria; si la escucha se corta, se vuelve a leer la tabla en cada llamada.
+
+_known = {}
+_live = False
+
+
+def _merge(versions):
+    for table, version in versions.items():
+        # Las notificaciones pueden llegar desordenadas: las versiones solo suben
+        if version > _known.get(table, 0):
+            _known[table] = version
+
+
+def _remember(changes):
+    if _live:
+        _merge({table: change["version"] for table, change in changes.items()})
+
+
+def _read(tables):
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(data_versions.c.table_name, data_versions.c.version)
+            .where(data_versions.c.table_name.in_(tables))
+        ).all()
+    versions = dict.fromkeys(tables, 0)
+    versions.update(rows)
+    return versions
+
+
+def set_live(live):
+    """Serve versions from memory (True) or from the database on every call (False)"""
+    global _live, _known
+    _live = False
+    if live:
+        _known = _read(TRACKED_TABLES)
+        _live = True
+        # Un commit entre la primera lectura y el cambio de modo no pasó por _remember
+        _merge(_read(TRACKED_TABLES))
+
+
+def is_live():
+    return _live
+
+
+def current(tables):
+    """Current version of each table, read with a single Core query unless it is being kept in memory"""
+    if _live:
+        known = _known
+        return {table: known.get(table, 0) for table in tables}
+    return _read(tables)
+
+
+def etag_for(versions):
+    return '"' + "-".join(str(versions[table]) for table in sorted(versions)) + '"'
+
+
+def _client_tags(request: Request):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return set()
+    # Un proxy que comprime puede devolver la ETag como débil (W/"...")
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def etag(*tables):
+    """Route dependency: answer 304 when the client's ETag matches the versions of `tables`"""
+    def check_etag(request: Request, response: Response):
+        # JSON y MessagePack son representaciones distintas: cada una con su ETag
+        tag = encoding.tag_variant(etag_for(current(tables)))
+        client_tags = _client_tags(request)
+        if tag in client_tags or "*" in client_tags:
+            raise HTTPException(status_code=304, headers={"ETag": tag, "Cache-Control": "no-cache"})
+        response.headers["ETag"] = tag
+        # El navegador revalida siempre; con la ETag la revalidación cuesta un 304
+        response.headers["Cache-Control"] = "no-cache"
+    return Depends(check_etag)
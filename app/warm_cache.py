@@ -0,0 +1,147 @@
+"""Caché en disco de artefactos ya calculados, para arrancar en caliente tras un deploy.
+
+Cada módulo registra una sección con `register(nombre, exportar, importar, tablas)`.
+Al arrancar, `restore()` lee el archivo y entrega a cada sección sus datos si las
+versiones de sus tablas siguen siendo las de la base (las secciones sin tablas se
+validan solas, entrada por entrada). Un hilo guarda el archivo cada
+`WARM_CACHE_SAVE_SECONDS` si algo cambió, y `save()` se llama también al apagar.
+
+El archivo va en el directorio privado de estado (ver app.state) y es MessagePack con
+datos planos: dicts, listas (vuelven como tuplas), strings, números, bytes y fechas
+(extensión propia). Al leerlo no se ejecuta nada, y si está corrupto o es de otro formato
+simplemente se ignora. Sin msgpack instalado no hay caché en disco.
+"""
+import datetime
+import logging
+import os
+import struct
+import threading
+import time
+
+try:
+    import msgpack
+except ImportError:  # opcional: ver requirements.txt
+    msgpack = None
+
+from app import state, versions
+
+logger = logging.getLogger(__name__)
+
+FORMAT = 2
+
+_DATE = 1  # código de extensión MessagePack: fecha como ordinal int32
+
+
+def default_path():
+    return state.path("warm-cache") + ".msgpack"
+
+
+PATH = os.getenv("WARM_CACHE_PATH", default_path()) if msgpack is not None else ""
+SAVE_SECONDS = float(os.getenv("WARM_CACHE_SAVE_SECONDS", "60"))
+
+_sections = {}  # nombre -> (exportar, importar, tablas)
+_dirty = threading.Event()
+_saver = None
+_stats = {"restored": [], "skipped": [], "saves": 0, "restore_seconds": None}
+
+
+def register(name, export, restore, tables=()):
+    """Persist `export()` under `name`; `restore(data)` receives it back on the next start"""
+    _sections[name] = (export, restore, tuple(tables))
+
+
+def touch():
+    """Mark the cache as changed so the next periodic save writes it"""
+    _dirty.set()
+
+
+def _default(value):
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return msgpack.ExtType(_DATE, struct.pack("<i", value.toordinal()))
+    raise TypeError(f"Cannot store {type(value).__name__} in the warm cache")
+
+
+def _ext_hook(code, data):
+    if code == _DATE:
+        return datetime.date.fromordinal(struct.unpack("<i", data)[0])
+    raise ValueError(f"Unknown warm cache extension type {code}")
+
+
+def dumps(data):
+    return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+def loads(raw):
+    # Las tuplas vuelven como tuplas (las claves compuestas siguen siendo hashables)
+    return msgpack.unpackb(raw, ext_hook=_ext_hook, raw=False, use_list=False, strict_map_key=False)
+
+
+def save():
+    if not PATH:
+        return
+    _dirty.clear()
+    data = {"format": FORMAT, "sections": {}}
+    for name, (export, _, tables) in list(_sections.items()):
+        # Versiones leídas antes de exportar: si algo cambia entretanto, la sección se descarta al leerla
+        data["sections"][name] = (versions.current(tables) if tables else {}, export())
+    try:
+        state.write(dumps(data), PATH)
+        _stats["saves"] += 1
+    except (OSError, TypeError, ValueError):
+        logger.exception("Could not write the warm cache to %s", PATH)
+
+
+def restore():
+    """Hand every registered section its saved data if it is still valid"""
+    if not PATH:
+        return
+    started = time.perf_counter()
+    try:
+        # Solo un archivo de este usuario que nadie más pueda reescribir
+        with state.open_private(PATH) as cache_file:
+            data = loads(cache_file.read())
+    except FileNotFoundError:
+        return
+    except Exception:
+        logger.warning("Ignoring unreadable warm cache at %s", PATH, exc_info=True)
+        return
+    if not isinstance(data, dict) or data.get("format") != FORMAT or not isinstance(data.get("sections"), dict):
+        return
+
+    for name, saved in data["sections"].items():
+        section = _sections.get(name)
+        if section is None:
+            continue
+        _, restore_section, tables = section
+        try:
+            saved_versions, payload = saved
+            if tables and saved_versions != versions.current(tables):
+                _stats["skipped"].append(name)
+                continue
+            restore_section(payload)
+        except Exception:
+            logger.warning("Ignoring unreadable warm cache section %s", name, exc_info=True)
+            _stats["skipped"].append(name)
+            continue
+        _stats["restored"].append(name)
+    _stats["restore_seconds"] = round(time.perf_counter() - started, 4)
+
+
+def _save_periodically():
+    while True:
+        time.sleep(SAVE_SECONDS)
+        if _dirty.is_set():
+            save()
+
+
+def start():
+    """Start the background saver thread (once)"""
+    global _saver
+    if not PATH or _saver is not None:
+        return
+    _saver = threading.Thread(target=_save_periodically, name="warm-cache-saver", daemon=True)
+    _saver.start()
+
+
+def stats():
+    return {**_stats, "path": PATH, "sections": sorted(_sections)}
@@ -0,0 +1,83 @@
+"""Compara la codificación del payload de /courses/: ruta por defecto de FastAPI vs app.encoding.
+
+    python -m benchmarks.encode_courses [cursos] [repeticiones]
+
+No necesita base de datos: arma un payload con la misma forma que `read_courses`.
+"""
+import datetime
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app import encoding, models, schemas  # noqa: E402,F401  (models antes que schemas: import circular)
+
+
+def payload(courses):
+    professors = [
+        {
+            "id": professor_id,
+            "name": f"Profesor {professor_id}",
+            "first_name": None,
+            "last_name": None,
+            "email": f"profesor{professor_id}@mali.pe",
+            "phone": None,
+            "bio": None,
+            "specialties": "Pintura, Dibujo",
+            "is_active": True,
+            "courses": [f"Curso {professor_id}", f"Curso {professor_id + 1}"],
+        }
+        for professor_id in range(courses)
+    ]
+    return [
+        {
+            "id": course_id,
+            "name": f"Curso {course_id}",
+            "duration_months": 3,
+            "start_date": datetime.date(2025, 3, 3),
+            "schedule": "Lunes y Miércoles",
+            "is_active": True,
+            "category": "Arte",
+            "modules": [
+                {"id": course_id * 10 + order, "name": f"Módulo {order}", "order": order, "course_id": course_id}
+                for order in range(1, 6)
+            ],
+            "professors": professors[course_id:course_id + 3],
+        }
+        for course_id in range(courses)
+    ]
+
+
+def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    data = payload(courses)
+    response_model = List[schemas.Course]
+
+    # Lo que hace FastAPI con un response_model: validar, volcar a tipos JSON y json.dumps
+    adapter = TypeAdapter(response_model)
+
+    def fastapi_default():
+        return json.dumps(
+            adapter.dump_python(adapter.validate_python(data, from_attributes=True), mode="json"),
+            ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+        ).encode()
+
+    fast = encoding.serializer(response_model)
+    assert json.loads(fast(data)) == json.loads(fastapi_default())
+
+    backend = "orjson" if encoding.orjson is not None else "json (orjson no instalado)"
+    print(f"{courses} cursos, {len(fast(data)) / 1024:.0f} KiB, {repeat} repeticiones, backend {backend}")
+    baseline = min(timeit.repeat(fastapi_default, number=1, repeat=repeat))
+    for name, func in (("fastapi (validación + json)", fastapi_default), ("encoding.serializer", lambda: fast(data))):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"  {name:<30} {best * 1000:8.2f} ms  x{baseline / best:.1f}")
+
+
+if __name__ == "__main__":
+    main()
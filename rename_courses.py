@@ -6,27 +6,29 @@ BASE_URL = "http://127.0.0.1:8000"
 with open("rename_courses.json", "r", encoding="utf-8") as f:
     updates = json.load(f)
 
+# 1. Buscar todos los cursos por nombre en una sola petición
+res = requests.get(f"{BASE_URL}/courses/", params={"names": [entry["old"] for entry in updates]})
+courses = {course["name"]: course for course in res.json()["items"]}
+
+operations = []
+renames = []
 for entry in updates:
     old_name = entry["old"]
     new_name = entry["new"]
 
-    # 1. Buscar curso por nombre
-    res = requests.get(f"{BASE_URL}/courses/")
-    courses = res.json()
-
-    course = next((c for c in courses if c["name"] == old_name), None)
-
+    course = courses.get(old_name)
     if not course:
         print(f"❌ Curso '{old_name}' no encontrado.")
         continue
 
-    course_id = course["id"]
-    course["name"] = new_name
+    operations.append({"method": "PUT", "path": f"/courses/{course['id']}", "body": {"name": new_name}})
+    renames.append((old_name, new_name))
 
-    # 2. Enviar PUT para actualizar
-    put_res = requests.put(f"{BASE_URL}/courses/{course_id}", json=course)
-    if put_res.status_code == 200:
+# 2. Enviar todos los PUT en un único batch
+results = requests.post(f"{BASE_URL}/batch", json={"operations": operations}).json() if operations else []
+for (old_name, new_name), result in zip(renames, results):
+    if result["status"] == 200:
         print(f"✅ Renombrado: '{old_name}' → '{new_name}'")
     else:
-        print(f"❌ Error al renombrar '{old_name}': {put_res.status_code}")
-        print(put_res.text)
+        print(f"❌ Error al renombrar '{old_name}': {result['status']}")
+        print(result["body"])
@@ -0,0 +1,94 @@
+"""Fixtures comunes: la API completa sobre una base SQLite temporal.
+
+La base y el directorio de estado (snapshot, caché en disco) van a un directorio temporal
+que se crea antes de importar la app (la conexión se abre al importar app.database).
+Cada test empieza con las tablas vacías; el borrado pasa por el ORM, así que sube las
+versiones de datos e invalida las cachés igual que un commit normal.
+"""
+import os
+import tempfile
+
+_STATE_DIR = tempfile.mkdtemp(prefix="mali-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_STATE_DIR, 'mali.db')}"
+# Snapshot del catálogo, caché en caliente y candados, con sus rutas por defecto
+os.environ["MALI_STATE_DIR"] = os.path.join(_STATE_DIR, "state")
+# Sin ventana stale-while-revalidate: cada test debe ver los datos del anterior ya borrados
+os.environ["RESPONSE_CACHE_STALE_SECONDS"] = "0"
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app import models
+from app.database import SessionLocal, engine
+from app.main import app
+
+# La base temporal se crea con las migraciones, igual que en producción (sin alembic.ini:
+# no reconfigura el logging)
+_alembic = Config()
+_alembic.set_main_option(
+    "script_location", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+)
+with engine.begin() as _connection:
+    _alembic.attributes["connection"] = _connection
+    command.upgrade(_alembic, "head")
+
+_CLEARED = (
+    models.CourseModuleSession.__table__,
+    models.professor_courses,
+    models.Module.__table__,
+    models.Course.__table__,
+    models.Professor.__table__,
+)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def empty_tables():
+    db = SessionLocal()
+    try:
+        for table in _CLEARED:
+            db.execute(delete(table))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def seeded(client):
+    """Two courses with two modules each and two professors: Ana on both courses, Beto on C2"""
+    courses = client.post("/courses/bulk-load/", json=[
+        {"name": name, "duration_months": 2, "start_date": "2025-03-03", "schedule": "Lunes y Miércoles", "category": category}
+        for name, category in (("C1", "Arte"), ("C2", "Diseño"))
+    ])
+    assert courses.status_code == 200, courses.text
+    modules = client.post("/modules/bulk-load/", json=[
+        {"course_name": name, "modules": [{"name": "M1", "order": 1}, {"name": "M2", "order": 2}]}
+        for name in ("C1", "C2")
+    ])
+    assert modules.status_code == 200, modules.text
+    professors = client.post("/professors/bulk-load/", json=[
+        {"name": "Ana", "course_names": ["C1", "C2"]},
+        {"name": "Beto", "course_names": ["C2"]},
+    ])
+    assert professors.status_code == 200, professors.text
+
+    db = SessionLocal()
+    try:
+        ids = {
+            "courses": {course.name: course.id for course in db.query(models.Course)},
+            "professors": {professor.name: professor.id for professor in db.query(models.Professor)},
+            "modules": {
+                (module.course.name, module.name): module.id for module in db.query(models.Module)
+            },
+        }
+    finally:
+        db.close()
+    return ids
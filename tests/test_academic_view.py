@@ -0,0 +1,20 @@
+def test_academic_view_reads_module_fields(client, seeded):
+    c1_m1, c2_m2 = seeded["modules"][("C1", "M1")], seeded["modules"][("C2", "M2")]
+    assigned = client.put(f"/modules/{c1_m1}/assign-professor", params={"professor_id": seeded["professors"]["Ana"]})
+    assert assigned.status_code == 200, assigned.text
+    sessions = [
+        client.post("/sessions/", json={"session_number": 1, "date": "2025-03-03", "status": "Programada", "module_id": module_id})
+        for module_id in (c1_m1, c2_m2)
+    ]
+    assert all(session.status_code == 200 for session in sessions), [session.text for session in sessions]
+
+    response = client.get("/coursemodules/academic-view")
+    assert response.status_code == 200, response.text
+    assert [(row["course_name"], row["module_name"], row["professor_name"]) for row in response.json()] == [
+        ("C1", "M1", "Ana"),
+        ("C2", "M2", None),
+    ]
+
+    # Reasignar el módulo invalida la respuesta cacheada
+    client.put(f"/modules/{c2_m2}/assign-professor", params={"professor_id": seeded["professors"]["Beto"]})
+    assert [row["professor_name"] for row in client.get("/coursemodules/academic-view").json()] == ["Ana", "Beto"]
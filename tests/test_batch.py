@@ -0,0 +1,46 @@
+def _batch(client, operations, atomic):
+    response = client.post("/batch", json={"atomic": atomic, "operations": operations})
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _preview_professors(client):
+    previews = client.get("/courses/schedule-preview").json()
+    return {preview["course_name"]: preview["professors"] for preview in previews}
+
+
+def test_atomic_rollback_leaves_no_cached_rows(client, seeded):
+    response = _batch(client, [
+        {"method": "POST", "path": "/professors/", "body": {"name": "Zed", "course_names": ["C1"]}},
+        # Lecturas con la escritura sin confirmar: no deben quedar en las cachés
+        {"method": "GET", "path": "/courses/schedule-preview"},
+        # Zed ya existe dentro del batch: 400 y se deshace todo
+        {"method": "POST", "path": "/professors/", "body": {"name": "Zed"}},
+    ], atomic=True)
+    assert response.headers["X-Batch-Committed"] == "false"
+    results = response.json()
+    assert [result["status"] for result in results] == [200, 200, 400]
+    assert "Zed" in {name for preview in results[1]["body"] for name in preview["professors"]}
+
+    assert _preview_professors(client) == {"C1": ["Ana"], "C2": ["Ana", "Beto"]}
+    assert client.get("/professors/", params={"names": "Zed"}).json()["not_found"]["names"] == ["Zed"]
+    # Con Zed en la caché de entidades, el alta diría que ya existe
+    created = client.post("/professors/", json={"name": "Zed"})
+    assert created.status_code == 200, created.text
+
+
+def test_non_atomic_failure_keeps_earlier_writes_only(client, seeded):
+    response = _batch(client, [
+        {"method": "POST", "path": "/professors/", "body": {"name": "Zed", "course_names": ["C1"]}},
+        {"method": "POST", "path": "/professors/", "body": {"name": "Zed"}},
+        {"method": "GET", "path": "/courses/schedule-preview"},
+    ], atomic=False)
+    assert response.headers["X-Batch-Committed"] == "true"
+    results = response.json()
+    assert [result["status"] for result in results] == [200, 400, 200]
+
+    # Lo confirmado por la primera operación sí queda, en la base y en las cachés
+    assert "Zed" in _preview_professors(client)["C1"]
+    found = client.get("/professors/", params={"names": "Zed"}).json()
+    assert [row["name"] for row in found["items"]] == ["Zed"]
+    assert client.post("/professors/", json={"name": "Zed"}).status_code == 400
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import threading
+import time
+
+from app import entity_cache, models, response_cache, singleflight
+from app.database import SessionLocal
+
+
+def _course_names(response):
+    return [course["name"] for course in response.json()]
+
+
+def test_response_cache_is_fresh_after_a_write(client, seeded):
+    first = client.get("/courses/")
+    assert first.headers["x-cache"] == "MISS"
+    again = client.get("/courses/")
+    assert again.headers["x-cache"] == "HIT"
+    assert again.content == first.content
+
+    created = client.post("/courses/", json={"name": "C3", "duration_months": 1, "start_date": "2025-04-07", "schedule": "Viernes"})
+    assert created.status_code == 200, created.text
+    after = client.get("/courses/")
+    assert after.headers["x-cache"] == "MISS"
+    assert _course_names(after) == ["C1", "C2", "C3"]
+
+
+def test_stale_while_revalidate(client, seeded):
+    calls = []
+
+    @response_cache.cached_response("courses", response_model=list[str], stale_seconds=60)
+    def course_names(db):
+        calls.append(threading.current_thread().name)
+        return [course.name for course in db.query(models.Course).order_by(models.Course.id)]
+
+    def read():
+        db = SessionLocal()
+        try:
+            response = course_names(db=db)
+        finally:
+            db.close()
+        return response.headers["x-cache"], json.loads(response.body)
+
+    assert read() == ("MISS", ["C1", "C2"])
+    client.post("/courses/", json={"name": "C3", "duration_months": 1, "start_date": "2025-04-07", "schedule": "Viernes"})
+
+    # Dentro de la ventana: los bytes viejos salen enseguida y un hilo los recalcula
+    assert read() == ("STALE", ["C1", "C2"])
+    deadline = time.monotonic() + 5
+    while response_cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert read() == ("HIT", ["C1", "C2", "C3"])
+    assert len(calls) == 2
+
+
+def test_entity_cache_is_invalidated_by_commits(client, seeded):
+    ana = seeded["professors"]["Ana"]
+    module_id = seeded["modules"][("C1", "M1")]
+
+    def assign():
+        response = client.put(f"/professors/{ana}/assign-to-module/{module_id}")
+        assert response.status_code == 200, response.text
+        return response.json()["message"]
+
+    assert assign().startswith("Professor Ana ")
+    hits = entity_cache.stats()["professors"]["hits"]
+    assert assign().startswith("Professor Ana ")
+    assert entity_cache.stats()["professors"]["hits"] == hits + 1
+
+    renamed = client.put(f"/professors/{ana}/details", json={"name": "Ana María"})
+    assert renamed.status_code == 200, renamed.text
+    assert assign().startswith("Professor Ana María ")
+
+    # La entrada por nombre también cae: el nombre viejo vuelve a estar libre
+    assert client.post("/professors/", json={"name": "Ana María"}).status_code == 400
+    assert client.post("/professors/", json={"name": "Ana"}).status_code == 200
+
+
+def test_concurrent_misses_run_the_loader_once():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    @singleflight.coalesce
+    def load(key):
+        calls.append(key)
+        started.set()
+        release.wait(5)
+        return {"key": key, "call": len(calls)}
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        first = asyncio.ensure_future(load(key="a"))
+        await loop.run_in_executor(None, started.wait, 5)
+        waiting = [asyncio.ensure_future(load(key="a")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        shared = await asyncio.gather(first, *waiting)
+        # Terminada la ejecución, la siguiente llamada vuelve a cargar
+        return shared, await load(key="a")
+
+    shared, later = asyncio.run(run())
+    assert shared == [{"key": "a", "call": 1}] * 4
+    assert later == {"key": "a", "call": 2}
+    assert calls == ["a", "a"]
@@ -0,0 +1,51 @@
+import asyncio
+import zlib
+
+import pytest
+
+from app import compression
+
+ROWS = [b'{"id": %d, "name": "Curso %d"}\n' % (number, number) for number in range(200)]
+
+
+def _decoder(coding):
+    if coding == "br":
+        import brotli
+        return brotli.Decompressor().process
+    if coding == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj().decompress
+    return zlib.decompressobj(zlib.MAX_WBITS | 16).decompress
+
+
+@pytest.mark.parametrize("coding", compression.CODINGS)
+def test_each_streamed_chunk_decodes_on_arrival(coding):
+    stream = compression._StreamCompressor(coding)
+    decode = _decoder(coding)
+    for start in range(0, len(ROWS), 50):
+        chunk = b"".join(ROWS[start:start + 50])
+        assert decode(stream.chunk(chunk)) == chunk
+    assert decode(stream.last(b"")) == b""
+
+
+def test_middleware_flushes_streamed_responses():
+    chunks = [b"".join(ROWS[:100]), b"".join(ROWS[100:])]
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/export", "query_string": b"stream=ndjson", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(compression.CompressionMiddleware(app)(scope, None, send))
+
+    assert (b"content-encoding", b"gzip") in sent[0]["headers"]
+    decode = _decoder("gzip")
+    bodies = [message["body"] for message in sent[1:]]
+    assert [decode(body) for body in bodies] == [*chunks, b""]
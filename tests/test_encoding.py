@@ -0,0 +1,98 @@
+import datetime
+import json
+import typing
+from types import SimpleNamespace
+from typing import List, Optional, Union
+
+import pytest
+from pydantic import BaseModel, TypeAdapter
+
+from app import encoding
+from app.main import app
+from app.schemas import SessionStatusEnum
+
+
+class Inner(BaseModel):
+    id: int
+    label: Optional[str] = None
+
+
+class Outer(BaseModel):
+    id: int
+    when: Optional[datetime.date]
+    status: Optional[SessionStatusEnum] = SessionStatusEnum.PROGRAMADA
+    inner: Optional[Inner] = None
+    inners: List[Inner] = []
+    either: Union[int, str] = 0
+    tags: Optional[List[str]] = None
+
+
+def _fastapi(model, data):
+    """What FastAPI sends for `data`: validate against the response_model, then dump as JSON"""
+    adapter = TypeAdapter(model)
+    return adapter.dump_python(adapter.validate_python(data, from_attributes=True), mode="json")
+
+
+@pytest.mark.parametrize("data", [
+    {"id": 1, "when": datetime.date(2025, 3, 3)},
+    {"id": 2, "when": None, "status": None, "inner": None, "either": "x", "tags": ["a"]},
+    SimpleNamespace(
+        id=3, when=datetime.date(2025, 3, 4), status=SessionStatusEnum.CONFIRMADA,
+        inner=SimpleNamespace(id=7, label=None), inners=[{"id": 8, "label": "b"}], either=5, tags=None,
+    ),
+])
+def test_serializer_matches_fastapi_for_optional_and_union_fields(data):
+    assert json.loads(encoding.serializer(Outer)(data)) == _fastapi(Outer, data)
+    assert json.loads(encoding.serializer(List[Outer])([data])) == _fastapi(List[Outer], [data])
+
+
+def _response_model(method, path):
+    route = next(route for route in app.routes if getattr(route, "path", None) == path and method in route.methods)
+    model = route.response_model
+    # Rutas con varias formas: la forma completa es la primera (ver encoding._encoder)
+    if typing.get_origin(model) is Union:
+        model = typing.get_args(model)[0]
+    return model
+
+
+def _assert_parity(response, method, path):
+    assert response.status_code == 200, f"{method} {path}: {response.text}"
+    body = response.json()
+    assert _fastapi(_response_model(method, path), body) == body, f"{method} {path}"
+
+
+def test_converted_routes_match_their_response_model(client, seeded):
+    c1, ana = seeded["courses"]["C1"], seeded["professors"]["Ana"]
+    module_id = seeded["modules"][("C1", "M1")]
+    client.put(f"/modules/{module_id}/assign-professor", params={"professor_id": ana})
+    created = client.post("/sessions/", json={"session_number": 1, "date": "2025-03-03", "status": "Programada", "module_id": module_id})
+    _assert_parity(created, "POST", "/sessions/")
+
+    for path, concrete in (
+        ("/courses/", "/courses/"),
+        ("/courses/{course_id}", f"/courses/{c1}"),
+        ("/courses/{course_id}/sessions", f"/courses/{c1}/sessions"),
+        ("/courses/schedule-preview", "/courses/schedule-preview"),
+        ("/professors/", "/professors/"),
+        ("/professors/{professor_id}/details", f"/professors/{ana}/details"),
+        ("/professors/{professor_id}/sessions", f"/professors/{ana}/sessions"),
+        ("/modules/", "/modules/"),
+        ("/modules/by-course/{course_id}", f"/modules/by-course/{c1}"),
+        ("/sessions/", "/sessions/"),
+        ("/views/course-schedule", "/views/course-schedule"),
+        ("/sync", "/sync"),
+    ):
+        _assert_parity(client.get(concrete), "GET", path)
+
+    _assert_parity(client.put(f"/courses/{c1}", json={"schedule": "Martes"}), "PUT", "/courses/{course_id}")
+    _assert_parity(client.post("/professors/", json={"name": "Zed", "course_names": ["C1"]}), "POST", "/professors/")
+    _assert_parity(client.put(f"/professors/{ana}/details", json={"bio": "Pintora"}), "PUT", "/professors/{professor_id}/details")
+    _assert_parity(client.post("/courses/", json={"name": "C3", "duration_months": 1, "start_date": None, "schedule": None}), "POST", "/courses/")
+    _assert_parity(client.delete(f"/courses/{seeded['courses']['C2']}"), "DELETE", "/courses/{course_id}")
+    _assert_parity(client.delete(f"/professors/{seeded['professors']['Beto']}"), "DELETE", "/professors/{professor_id}")
+
+
+def test_course_detail_matches_the_listing(client, seeded):
+    listed = {course["id"]: course for course in client.get("/courses/").json()}
+    for course_id in seeded["courses"].values():
+        assert client.get(f"/courses/{course_id}").json() == listed[course_id]
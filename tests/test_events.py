@@ -0,0 +1,85 @@
+import queue
+
+import pytest
+
+from app import events
+
+
+def _event(courses=None, professors=None, categories=None):
+    return events.Event(1, "course", [1], 1, courses, professors, categories)
+
+
+def _filter(professors=(), courses=(), categories=()):
+    return events.Filter(frozenset(professors), frozenset(courses), frozenset(categories))
+
+
+def test_filter_matching():
+    event = _event(frozenset({1}), frozenset({7}), frozenset({"Arte"}))
+    assert _filter().matches(event)
+    assert _filter(courses={1, 2}).matches(event)
+    assert not _filter(courses={2}).matches(event)
+    assert _filter(professors={7}, categories={"Arte"}).matches(event)
+    assert not _filter(professors={7}, categories={"Diseño"}).matches(event)
+    # Alcance desconocido: llega a todos
+    assert _filter(courses={2}, professors={8}).matches(_event())
+
+
+@pytest.fixture
+def changes(monkeypatch):
+    """Changes published by commits, as the resolver thread would receive them (with a client connected)"""
+    pending = queue.Queue()
+    monkeypatch.setattr(events, "_pending", pending)
+    listener = object()
+    events._subscribers.add(listener)
+
+    def drain():
+        resolved = {}
+        while not pending.empty():
+            for table, change in pending.get().items():
+                if table in events.EVENT_TYPES:
+                    resolved[table] = events._event(table, change)
+        return resolved
+
+    try:
+        yield drain
+    finally:
+        events._subscribers.discard(listener)
+
+
+def test_deleted_session_keeps_its_course(client, seeded, changes):
+    created = client.post("/sessions/", json={
+        "session_number": 1, "date": "2025-03-03", "status": "Programada", "module_id": seeded["modules"][("C1", "M1")],
+    }).json()
+    changes()
+    assert client.delete(f"/sessions/{created['id']}").status_code == 200
+
+    event = changes()["course_module_sessions"]
+    assert event.courses == {seeded["courses"]["C1"]}
+    assert _filter(courses={seeded["courses"]["C1"]}).matches(event)
+    assert not _filter(courses={seeded["courses"]["C2"]}).matches(event)
+
+
+def test_deleted_session_without_captured_scope_goes_to_everyone(client, seeded):
+    assert events._scope("course_module_sessions", [999999]) is None
+
+
+def test_unassigned_professor_still_gets_the_event(client, seeded, changes):
+    module_id = seeded["modules"][("C1", "M1")]
+    beto = seeded["professors"]["Beto"]
+    client.put(f"/modules/{module_id}/assign-professor", params={"professor_id": beto})
+    changes()
+
+    assert client.put(f"/modules/{module_id}/assign-professor").status_code == 200
+    event = changes()["modules"]
+    assert beto in event.professors
+    assert _filter(professors={beto}).matches(event)
+
+
+def test_removed_course_link_reaches_the_professor(client, seeded, changes):
+    course_id = seeded["courses"]["C2"]
+    assert client.put(f"/courses/{course_id}/professors", json=[seeded["professors"]["Ana"]]).status_code == 200
+
+    # Si el commit conoce los cursos, el alcance anterior incluye a Beto; si no, va a todos
+    event = changes()["professor_courses"]
+    assert event.professors is None or seeded["professors"]["Beto"] in event.professors
+    assert _filter(professors={seeded["professors"]["Beto"]}).matches(event)
@@ -0,0 +1,80 @@
+def _response_schema(client, path):
+    operation = client.get("/openapi.json").json()["paths"][path]["get"]
+    return operation["responses"]["200"]["content"]["application/json"]["schema"]
+
+
+def test_listings_declare_every_shape(client):
+    for path in ("/courses/", "/modules/", "/professors/"):
+        shapes = _response_schema(client, path)["anyOf"]
+        assert {"$ref": "#/components/schemas/BatchLookup"} in shapes
+        assert len(shapes) == 3
+
+
+def test_course_listing_shapes(client, seeded):
+    full = client.get("/courses/").json()
+    assert [course["name"] for course in full] == ["C1", "C2"]
+    assert {"modules", "professors", "is_active"} <= set(full[0])
+
+    sparse = client.get("/courses/", params={"fields": "id,name"}).json()
+    assert sparse == [{"id": course["id"], "name": course["name"]} for course in full]
+
+    found = client.get("/courses/", params={"ids": f"{seeded['courses']['C2']},999"}).json()
+    assert [course["name"] for course in found["items"]] == ["C2"]
+    assert found["not_found"] == {"ids": [999], "names": []}
+
+
+def test_relation_only_fields_keep_the_id(client, seeded):
+    course_id = seeded["courses"]["C1"]
+    response = client.get(f"/courses/{course_id}", params={"fields": "modules"})
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "id": course_id,
+        "modules": [
+            {"id": seeded["modules"][("C1", name)], "name": name, "order": order, "course_id": course_id}
+            for order, name in ((1, "M1"), (2, "M2"))
+        ],
+    }
+
+    listed = client.get("/courses/", params={"fields": "professors"}).json()
+    assert [sorted(row) for row in listed] == [["id", "professors"], ["id", "professors"]]
+
+
+def test_listing_etag_revalidation(client, seeded):
+    for path in ("/courses/", "/professors/", "/modules/", "/sessions/"):
+        first = client.get(path)
+        tag = first.headers["etag"]
+        assert first.headers["cache-control"] == "no-cache"
+
+        not_modified = client.get(path, headers={"If-None-Match": tag})
+        assert not_modified.status_code == 304, path
+        assert not_modified.headers["etag"] == tag
+        assert not_modified.content == b""
+        # Un proxy puede devolverla débil, y en una lista con otras
+        assert client.get(path, headers={"If-None-Match": f'"0", W/{tag}'}).status_code == 304
+
+
+def test_listing_etag_changes_after_a_write(client, seeded):
+    tag = client.get("/professors/").headers["etag"]
+    created = client.post("/professors/", json={"name": "Zed", "course_names": ["C1"]})
+    assert created.status_code == 200, created.text
+
+    refreshed = client.get("/professors/", headers={"If-None-Match": tag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != tag
+    assert "Zed" in {professor["name"] for professor in refreshed.json()}
+    # Los cursos leen professor_courses: su ETag también cambia
+    course_tag = client.get("/courses/").headers["etag"]
+    client.put(f"/modules/{seeded['modules'][('C1', 'M1')]}/assign-professor", params={"professor_id": seeded["professors"]["Beto"]})
+    assert client.get("/courses/", headers={"If-None-Match": course_tag}).status_code == 200
+
+
+def test_listing_etag_per_format(client, seeded):
+    json_tag = client.get("/modules/").headers["etag"]
+    msgpack_tag = client.get("/modules/", headers={"Accept": "application/msgpack"}).headers["etag"]
+    int_dates_tag = client.get("/modules/", headers={"Accept": "application/msgpack; dates=int"}).headers["etag"]
+    assert len({json_tag, msgpack_tag, int_dates_tag}) == 3
+
+    assert client.get("/modules/", headers={"If-None-Match": msgpack_tag}).status_code == 200
+    assert client.get(
+        "/modules/", headers={"Accept": "application/msgpack; dates=int", "If-None-Match": int_dates_tag},
+    ).status_code == 304
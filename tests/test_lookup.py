@@ -0,0 +1,50 @@
+import pytest
+
+from app import catalogue, models, snapshot
+from app.database import SessionLocal
+
+
+@pytest.fixture(params=["memory", "mapped"])
+def backend(request, monkeypatch):
+    """Name lookups against the in-memory catalogue and against the mapped snapshot file"""
+    if request.param == "memory":
+        monkeypatch.setattr(snapshot, "PATH", "")
+    monkeypatch.setattr(catalogue, "_current", None)
+    yield request.param
+    monkeypatch.setattr(catalogue, "_current", None)
+
+
+def _expected_class(backend):
+    return catalogue.Catalogue if backend == "memory" else snapshot.MappedCatalogue
+
+
+def test_courses_by_name(backend, client, seeded):
+    response = client.get("/courses/", params={"names": "C2,Nope,C1", "fields": "id,name"})
+    assert response.status_code == 200, response.text
+    assert isinstance(catalogue.get(), _expected_class(backend))
+    assert response.json() == {
+        "items": [{"id": seeded["courses"][name], "name": name} for name in ("C2", "C1")],
+        "not_found": {"ids": [], "names": ["Nope"]},
+        "ambiguous": {},
+    }
+
+
+def test_repeated_professor_names_are_ambiguous(backend, client, seeded):
+    # La API no deja crear nombres repetidos, pero la tabla no lo impide
+    db = SessionLocal()
+    try:
+        twin = models.Professor(name="Beto")
+        db.add(twin)
+        db.commit()
+        twin_id = twin.id
+    finally:
+        db.close()
+
+    response = client.get("/professors/", params={"names": ["Ana", "Beto"], "ids": "999", "fields": "id,name"})
+    assert response.status_code == 200, response.text
+    assert isinstance(catalogue.get(), _expected_class(backend))
+    assert response.json() == {
+        "items": [{"id": seeded["professors"]["Ana"], "name": "Ana"}],
+        "not_found": {"ids": [999], "names": []},
+        "ambiguous": {"Beto": [seeded["professors"]["Beto"], twin_id]},
+    }
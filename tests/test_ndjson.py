@@ -0,0 +1,56 @@
+import gzip
+import json
+
+
+def _events(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _lines(*rows):
+    return b"".join((row if isinstance(row, bytes) else json.dumps(row).encode()) + b"\n" for row in rows)
+
+
+def test_mixed_valid_and_invalid_lines(client):
+    body = _lines(
+        {"name": "C1", "category": "Arte"},
+        {"name": "C2"},  # sin category
+        b"",  # las líneas en blanco no cuentan
+        b"{not json",
+        {"name": "C3", "category": "Arte", "duration_months": 3},
+        {"name": "C4", "category": "Diseño"},
+    )
+    events = _events(client.post(
+        "/courses/bulk-load/ndjson", params={"chunk_size": 2}, content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    ))
+
+    errors = [event for event in events if "line" in event]
+    assert [event["line"] for event in errors] == [2, 4]
+    assert errors[0]["error"][0]["loc"] == ["category"]
+    chunks = [event for event in events if "chunk" in event]
+    assert [(event["lines"], event["created"]) for event in chunks] == [([1, 5], 2), ([6, 6], 1)]
+    assert events[-1] == {"done": True, "lines": 5, "invalid": 2, "created": 3, "chunks": 2, "failed_chunks": 0}
+
+    assert [course["name"] for course in client.get("/courses/").json()] == ["C1", "C3", "C4"]
+
+
+def test_gzip_upload(client):
+    for prefix, headers in (("A", {"Content-Encoding": "gzip"}), ("B", {"Content-Type": "application/x-ndjson+gzip"})):
+        rows = [{"name": f"{prefix}{number}", "category": "Arte"} for number in range(1, 6)]
+        # El último registro sin salto de línea final también se lee
+        body = gzip.compress(_lines(*rows[:-1]) + json.dumps(rows[-1]).encode())
+        events = _events(client.post("/courses/bulk-load/ndjson", content=body, headers=headers))
+        assert events[-1] == {"done": True, "lines": 5, "invalid": 0, "created": 5, "chunks": 1, "failed_chunks": 0}
+
+    names = [course["name"] for course in client.get("/courses/").json()]
+    assert sorted(names) == [f"{prefix}{number}" for prefix in "AB" for number in range(1, 6)]
+
+
+def test_corrupt_gzip_is_reported(client):
+    events = _events(client.post(
+        "/courses/bulk-load/ndjson", content=b"\x1f\x8b not gzip", headers={"Content-Encoding": "gzip"},
+    ))
+    assert events[-1]["done"] is False
+    assert "error" in events[-1]
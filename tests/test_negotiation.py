@@ -0,0 +1,57 @@
+import datetime
+
+import msgpack
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def _vary(response):
+    return {item.strip().lower() for item in response.headers.get("vary", "").split(",")}
+
+
+def test_msgpack_response_matches_json(client, seeded):
+    as_json = client.get("/courses/")
+    as_msgpack = client.get("/courses/", headers=MSGPACK)
+    assert as_msgpack.status_code == 200, as_msgpack.text
+    assert as_msgpack.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.content, raw=False) == as_json.json()
+
+    # Misma URL, dos representaciones: las dos avisan que dependen de Accept
+    assert "accept" in _vary(as_json)
+    assert "accept" in _vary(as_msgpack)
+    # También fuera de la caché de respuestas
+    assert "accept" in _vary(client.get("/sessions/"))
+
+
+def test_msgpack_int_dates(client, seeded):
+    response = client.get("/courses/", headers={"Accept": "application/msgpack; dates=int"})
+    assert response.status_code == 200, response.text
+    course = msgpack.unpackb(response.content, raw=False)[0]
+    assert course["start_date"] == (datetime.date(2025, 3, 3) - datetime.date(1970, 1, 1)).days
+
+
+def test_msgpack_request_body(client, seeded):
+    body = {"name": "C3", "duration_months": 1, "start_date": "2025-04-07", "schedule": "Viernes"}
+    response = client.post(
+        "/courses/", content=msgpack.packb(body), headers={"Content-Type": "application/msgpack", **MSGPACK},
+    )
+    assert response.status_code == 200, response.text
+    assert msgpack.unpackb(response.content, raw=False)["name"] == "C3"
+    assert "C3" in {course["name"] for course in client.get("/courses/").json()}
+
+    broken = client.post("/courses/", content=b"\xc1", headers={"Content-Type": "application/msgpack"})
+    assert broken.status_code == 400
+
+
+def test_etag_variant_per_format(client, seeded):
+    json_tag = client.get("/courses/").headers["etag"]
+    msgpack_tag = client.get("/courses/", headers=MSGPACK).headers["etag"]
+    assert json_tag != msgpack_tag
+
+    # La ETag de JSON no valida la copia MessagePack, y al revés
+    assert client.get("/courses/", headers={**MSGPACK, "If-None-Match": json_tag}).status_code == 200
+    assert client.get("/courses/", headers={"If-None-Match": msgpack_tag}).status_code == 200
+    not_modified = client.get("/courses/", headers={**MSGPACK, "If-None-Match": msgpack_tag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == msgpack_tag
+    assert "accept" in _vary(not_modified)
@@ -0,0 +1,40 @@
+from app import purge, state
+
+
+def _join_purge(kind):
+    worker = purge._workers.get(kind)
+    if worker is not None:
+        worker.join(timeout=10)
+
+
+def test_sessions_of_tombstoned_modules_are_hidden(client, seeded, monkeypatch):
+    module_id = seeded["modules"][("C1", "M1")]
+    created = client.post("/sessions/", json={"session_number": 1, "date": "2025-03-03", "status": "Programada", "module_id": module_id})
+    assert created.status_code == 200, created.text
+    professor_sessions = f"/professors/{seeded['professors']['Ana']}/sessions"
+    assert len(client.get("/sessions/").json()) == 1
+    assert len(client.get(professor_sessions).json()) == 1
+
+    # Sin purga: las filas quedan marcadas y solo las oculta el filtro de lectura
+    monkeypatch.setattr(purge, "schedule", lambda kind, marked=0, wait=True: {"status": "running"})
+    assert client.delete("/courses/delete-all/").status_code == 200
+
+    assert client.get("/sessions/").json() == []
+    assert client.get("/sessions/", params={"stream": "ndjson"}).text == ""
+    assert client.get(professor_sessions).json() == []
+
+
+def test_resume_skips_a_purge_held_by_another_process(client):
+    lock_path = state.path("purge-professors") + ".lock"
+    with state.lock(lock_path) as acquired:
+        assert acquired
+        purge.resume()
+        _join_purge("professors")
+        assert purge.status("professors")["status"] == "skipped"
+
+        # delete-all sí espera al otro proceso y purga después
+        purge.schedule("professors")
+        waiting = purge._workers.get("professors")
+        assert waiting is not None and waiting.is_alive()
+    _join_purge("professors")
+    assert purge.status("professors")["status"] == "done"
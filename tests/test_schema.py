@@ -0,0 +1,55 @@
+import os
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+from app.database import Base
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+
+
+def _config():
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    return config
+
+
+def test_migrations_build_the_models_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    config = _config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"compare_type": True})
+        assert compare_metadata(context, Base.metadata) == []
+
+
+def test_migrations_downgrade_to_base(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    config = _config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+        command.downgrade(config, "base")
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+
+
+def test_database_stamped_on_the_old_root_gets_session_number(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stamped.db'}")
+    config = _config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        # Tablas sin session_number, marcada en la antigua raíz 6df59101a620 sin haberla aplicado
+        command.upgrade(config, "1f0c6a2b8e47")
+        command.stamp(config, "6df59101a620")
+        command.upgrade(config, "head")
+
+    assert "session_number" in {column["name"] for column in inspect(engine).get_columns("course_module_sessions")}
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"compare_type": True})
+        assert compare_metadata(context, Base.metadata) == []
@@ -0,0 +1,104 @@
+import json
+from datetime import datetime
+
+from app import models
+from app.database import SessionLocal
+
+
+def _create_sessions(client, module_id, count=2):
+    ids = []
+    for number in range(1, count + 1):
+        response = client.post("/sessions/", json={
+            "session_number": number, "date": f"2025-03-{number + 2:02d}", "status": "Programada", "module_id": module_id,
+        })
+        assert response.status_code == 200, response.text
+        assert response.json()["status"] == "Programada"
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_patch_status_round_trip(client, seeded):
+    first, second = _create_sessions(client, seeded["modules"][("C1", "M1")])
+
+    response = client.patch("/sessions/", json=[
+        {"id": first, "status": "Confirmada"},
+        {"id": second, "status": "Falta profe", "extra_note": "Aviso tarde"},
+        {"id": 999999, "status": "Cancelada"},
+    ])
+    assert response.status_code == 200, response.text
+    assert [result["updated"] for result in response.json()] == [True, True, False]
+
+    listed = client.get("/sessions/")
+    assert listed.status_code == 200, listed.text
+    by_id = {row["id"]: row for row in listed.json()}
+    assert by_id[first]["status"] == "Confirmada"
+    assert by_id[second]["status"] == "Falta profe"
+    assert by_id[second]["extra_note"] == "Aviso tarde"
+
+    streamed = client.get("/sessions/", params={"stream": "ndjson"})
+    assert streamed.status_code == 200, streamed.text
+    statuses = {row["id"]: row["status"] for row in map(json.loads, streamed.text.splitlines())}
+    assert statuses == {first: "Confirmada", second: "Falta profe"}
+
+
+def test_patch_rejects_unknown_status(client, seeded):
+    (session_id,) = _create_sessions(client, seeded["modules"][("C1", "M1")], count=1)
+
+    response = client.patch("/sessions/", json=[{"id": session_id, "status": "active"}])
+    assert response.status_code == 422
+
+    assert client.get("/sessions/").json()[0]["status"] == "Programada"
+
+
+def test_transition_round_trip(client, seeded):
+    c1_sessions = _create_sessions(client, seeded["modules"][("C1", "M1")])
+    c2_sessions = _create_sessions(client, seeded["modules"][("C2", "M1")])
+
+    dry_run = client.post("/sessions/transition", json={
+        "course_id": seeded["courses"]["C1"], "target_status": "Cancelada", "dry_run": True,
+    })
+    assert dry_run.status_code == 200, dry_run.text
+    assert dry_run.json()["matched"] == 2
+    assert {row["status"] for row in client.get("/sessions/").json()} == {"Programada"}
+
+    response = client.post("/sessions/transition", json={
+        "course_id": seeded["courses"]["C1"], "current_status": "Programada", "target_status": "Cancelada",
+    })
+    assert response.status_code == 200, response.text
+    assert sorted(row["id"] for row in response.json()["sessions"]) == sorted(c1_sessions)
+
+    statuses = {row["id"]: row["status"] for row in client.get("/sessions/").json()}
+    assert statuses == {**dict.fromkeys(c1_sessions, "Cancelada"), **dict.fromkeys(c2_sessions, "Programada")}
+
+    # El filtro por estado actual usa el mismo tipo: las ya canceladas no vuelven a coincidir
+    again = client.post("/sessions/transition", json={
+        "course_id": seeded["courses"]["C1"], "current_status": "Programada", "target_status": "Confirmada",
+    })
+    assert again.json()["matched"] == 0
+
+
+def test_transition_skips_sessions_of_tombstoned_modules(client, seeded):
+    deleted = _create_sessions(client, seeded["modules"][("C1", "M1")])
+    live = _create_sessions(client, seeded["modules"][("C2", "M1")])
+    # Marcado como lo deja un delete-all antes de que el purgador pase: sus sesiones siguen en la tabla
+    db = SessionLocal()
+    try:
+        db.get(models.Module, seeded["modules"][("C1", "M1")]).deleted_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+    dry_run = client.post("/sessions/transition", json={"date": "2025-03-03", "target_status": "Cancelada", "dry_run": True})
+    assert dry_run.status_code == 200, dry_run.text
+    applied = client.post("/sessions/transition", json={"date": "2025-03-03", "target_status": "Cancelada"})
+    assert applied.status_code == 200, applied.text
+    assert dry_run.json()["matched"] == applied.json()["matched"] == 1
+    assert [row["id"] for row in applied.json()["sessions"]] == [live[0]]
+
+    # Las sesiones del módulo marcado conservan su estado por si el borrado se deshace
+    db = SessionLocal()
+    try:
+        stored = {session.id: session.status.value for session in db.query(models.CourseModuleSession).execution_options(include_deleted=True)}
+    finally:
+        db.close()
+    assert stored == {deleted[0]: "Programada", deleted[1]: "Programada", live[0]: "Cancelada", live[1]: "Programada"}
@@ -0,0 +1,56 @@
+import os
+import stat
+
+import pytest
+
+from app import catalogue, snapshot, state
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_snapshot_is_only_readable_by_the_owner(client, seeded):
+    catalogue.load()
+    assert os.path.dirname(snapshot.PATH) == state.DIR
+    assert _mode(state.DIR) == 0o700
+    assert _mode(snapshot.PATH) == 0o600
+    assert catalogue.get().professors_named("Ana") != []
+
+
+def test_snapshot_writable_by_others_is_not_mapped(client, seeded):
+    catalogue.load()
+    os.chmod(snapshot.PATH, 0o666)
+    try:
+        with pytest.raises(PermissionError):
+            snapshot.MappedCatalogue()
+        assert snapshot.open_current(catalogue.get().versions) is None
+    finally:
+        os.chmod(snapshot.PATH, 0o600)
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="changing the owner needs root")
+def test_snapshot_owned_by_another_user_is_not_mapped(client, seeded):
+    catalogue.load()
+    os.chown(snapshot.PATH, 4242, -1)
+    try:
+        assert snapshot.open_current(catalogue.get().versions) is None
+    finally:
+        os.chown(snapshot.PATH, os.getuid(), -1)
+
+
+def test_symlinks_are_not_followed(tmp_path):
+    target = tmp_path / "elsewhere"
+    target.write_bytes(b"data")
+    os.chmod(target, 0o600)
+    (tmp_path / "link").symlink_to(target)
+    with pytest.raises(OSError):
+        state.open_private(str(tmp_path / "link"))
+
+
+def test_state_directory_is_closed_to_other_users(tmp_path):
+    directory = tmp_path / "state"
+    directory.mkdir(mode=0o755)
+    os.chmod(directory, 0o755)
+    state.directory(str(directory))
+    assert _mode(directory) == 0o700
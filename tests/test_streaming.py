@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from app import streaming
+
+
+@pytest.fixture
+def scheduled(client, seeded):
+    ana = seeded["professors"]["Ana"]
+    for (course, name), module_id in seeded["modules"].items():
+        client.put(f"/modules/{module_id}/assign-professor", params={"professor_id": ana})
+        for number in (1, 2):
+            response = client.post("/sessions/", json={
+                "session_number": number, "date": f"2025-03-{number + 2:02d}", "status": "Programada", "module_id": module_id,
+            })
+            assert response.status_code == 200, response.text
+    return seeded
+
+
+def _streamed(client, path, **params):
+    response = client.get(path, params={**params, "stream": "json"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/json")
+    # Un array JSON válido de punta a punta
+    return json.loads(response.content)
+
+
+@pytest.mark.parametrize("rows", [1, 3, 500])
+def test_stream_json_equals_the_listing(client, scheduled, monkeypatch, rows):
+    # Bloques de distinto tamaño: las comas entre bloques también deben quedar bien
+    monkeypatch.setattr(streaming, "CHUNK_ROWS", rows)
+    for path in ("/sessions/", "/modules/"):
+        assert _streamed(client, path) == client.get(path).json(), path
+        assert _streamed(client, path, fields="id,name" if path == "/modules/" else "id,date") == client.get(
+            path, params={"fields": "id,name" if path == "/modules/" else "id,date"}
+        ).json()
+
+    schedule = f"/professors/{scheduled['professors']['Ana']}/schedule"
+    assert _streamed(client, schedule) == client.get(schedule).json()
+
+
+def test_stream_json_of_an_empty_listing(client):
+    assert _streamed(client, "/sessions/") == []
+    assert _streamed(client, "/modules/") == []
@@ -0,0 +1,95 @@
+import pytest
+
+from app import sync
+from app.database import SessionLocal
+
+TABLES = (*sync.ENTITIES, sync.LINKS)
+
+
+def _token(client):
+    # El estado completo en una sola página: solo interesa el token
+    return client.get("/sync", params={"limit": sync.MAX_PAGE_SIZE}).json()["token"]
+
+
+def _changes(client, since):
+    response = client.get("/sync", params={"since": since})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_update_comes_back_as_updated(client, seeded):
+    since = _token(client)
+    course_id = seeded["courses"]["C1"]
+    assert client.put(f"/courses/{course_id}", json={"category": "Pintura"}).status_code == 200
+
+    changes = _changes(client, since)
+    assert int(changes["token"]) > int(since)
+    assert [(row["id"], row["category"]) for row in changes["courses"]["updated"]] == [(course_id, "Pintura")]
+    assert changes["courses"]["reset"] is False
+    assert changes["modules"]["updated"] == [] and changes["professors"]["updated"] == []
+
+
+def test_hard_delete_comes_back_as_deleted(client, seeded):
+    created = client.post("/sessions/", json={
+        "session_number": 1, "date": "2025-03-03", "status": "Programada", "module_id": seeded["modules"][("C1", "M1")],
+    }).json()
+    since = _token(client)
+    assert client.delete(f"/sessions/{created['id']}").status_code == 200
+
+    changes = _changes(client, since)
+    assert changes["course_module_sessions"]["deleted"] == [created["id"]]
+    assert changes["course_module_sessions"]["updated"] == []
+
+
+def test_link_change_sends_the_course_professors(client, seeded):
+    since = _token(client)
+    course_id = seeded["courses"]["C1"]
+    professor_ids = sorted(seeded["professors"].values())
+    assert client.put(f"/courses/{course_id}/professors", json=professor_ids).status_code == 200
+
+    links = _changes(client, since)[sync.LINKS]
+    assert links == {"reset": False, "updated": [{"course_id": course_id, "professor_ids": professor_ids}]}
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7])
+def test_full_snapshot_pages_add_up_to_the_whole_state(client, seeded, limit):
+    whole = client.get("/sync", params={"limit": sync.MAX_PAGE_SIZE}).json()
+    assert whole["next_page"] is None
+
+    pages, params = [], {"limit": limit}
+    while True:
+        response = client.get("/sync", params=params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        if pages[-1]["next_page"] is None:
+            break
+        params = {"limit": limit, "page": pages[-1]["next_page"]}
+
+    assert len(pages) > 1
+    assert {page["token"] for page in pages} == {whole["token"]}
+    for table in TABLES:
+        assert [row for page in pages for row in page[table]["updated"]] == whole[table]["updated"]
+        # Cada tabla se reemplaza solo en la página donde empieza
+        assert sum(page[table]["reset"] for page in pages) == 1
+    assert max(sum(len(page[table]["updated"]) for table in TABLES) for page in pages) == limit
+
+
+def test_pruned_tokens_are_gone(client, seeded, monkeypatch):
+    created = client.post("/sessions/", json={
+        "session_number": 1, "date": "2025-03-03", "status": "Programada", "module_id": seeded["modules"][("C1", "M1")],
+    }).json()
+    since = _token(client)
+    client.delete(f"/sessions/{created['id']}")
+    assert _changes(client, since)["course_module_sessions"]["deleted"] == [created["id"]]
+
+    monkeypatch.setattr(sync, "RETENTION_DAYS", -1)
+    db = SessionLocal()
+    try:
+        assert sync.prune(db.connection()) is not None
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get("/sync", params={"since": since})
+    assert response.status_code == 410
+    assert client.get("/sync", params={"since": _token(client)}).status_code == 200
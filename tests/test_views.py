@@ -0,0 +1,49 @@
+def _names(view, section):
+    return {entity["name"] for entity in view[section].values()}
+
+
+def _course_professor_names(view):
+    professors = {int(id_): professor["name"] for id_, professor in view["professors"].items()}
+    return {
+        view["courses"][course_id]["name"]: [professors[professor_id] for professor_id in professor_ids]
+        for course_id, professor_ids in view["course_professors"].items()
+    }
+
+
+def test_course_schedule_view(client, seeded):
+    response = client.get("/views/course-schedule")
+    assert response.status_code == 200, response.text
+    view = response.json()
+
+    assert _names(view, "courses") == {"C1", "C2"}
+    assert _names(view, "professors") == {"Ana", "Beto"}
+    assert view["course_modules"] == {
+        str(seeded["courses"][course]): [seeded["modules"][(course, "M1")], seeded["modules"][(course, "M2")]]
+        for course in ("C1", "C2")
+    }
+    assert _course_professor_names(view) == {"C1": ["Ana"], "C2": ["Ana", "Beto"]}
+    assert set(map(int, view["modules"])) == set(seeded["modules"].values())
+
+
+def test_course_schedule_view_inside_an_atomic_batch(client, seeded):
+    response = client.post("/batch", json={"atomic": True, "operations": [
+        {"method": "POST", "path": "/courses/", "body": {"name": "C3", "duration_months": 1, "start_date": "2025-04-07", "schedule": "Viernes"}},
+        {"method": "POST", "path": "/professors/", "body": {"name": "Zed", "course_names": ["C1", "C3"]}},
+        {"method": "GET", "path": "/views/course-schedule"},
+        # Zed ya existe dentro del batch: 400 y se deshace todo
+        {"method": "POST", "path": "/professors/", "body": {"name": "Zed"}},
+    ]})
+    assert response.status_code == 200, response.text
+    assert response.headers["X-Batch-Committed"] == "false"
+    results = response.json()
+    assert [result["status"] for result in results] == [200, 200, 200, 400]
+
+    # Las cuatro secciones ven las escrituras sin confirmar del lote
+    view = results[2]["body"]
+    assert _names(view, "courses") == {"C1", "C2", "C3"}
+    assert _names(view, "professors") == {"Ana", "Beto", "Zed"}
+    assert _course_professor_names(view) == {"C1": ["Ana", "Zed"], "C2": ["Ana", "Beto"], "C3": ["Zed"]}
+
+    after = client.get("/views/course-schedule").json()
+    assert _names(after, "courses") == {"C1", "C2"}
+    assert _course_professor_names(after) == {"C1": ["Ana"], "C2": ["Ana", "Beto"]}
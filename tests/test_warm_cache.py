@@ -0,0 +1,48 @@
+import datetime
+import os
+import stat
+
+import pytest
+
+from app import state, warm_cache
+
+
+def test_plain_data_round_trip():
+    data = {
+        "calendar": {
+            "bitmap": b"\x00\xff",
+            "expanded": {(datetime.date(2025, 3, 3), 2, "Lunes"): (datetime.date(2025, 3, 3), datetime.date(2025, 3, 5))},
+        },
+        7: ({"courses": 3}, [{"id": 1, "date": datetime.date(2025, 3, 3)}]),
+    }
+    restored = warm_cache.loads(warm_cache.dumps(data))
+    assert restored["calendar"]["bitmap"] == b"\x00\xff"
+    assert restored["calendar"]["expanded"] == data["calendar"]["expanded"]
+    assert restored[7] == ({"courses": 3}, ({"id": 1, "date": datetime.date(2025, 3, 3)},))
+
+
+def test_objects_are_not_stored():
+    with pytest.raises(TypeError):
+        warm_cache.dumps({"value": object()})
+
+
+def test_cache_file_is_private_and_restored(client, seeded):
+    assert client.get("/courses/").status_code == 200
+    warm_cache.save()
+    assert os.path.dirname(warm_cache.PATH) == state.DIR
+    assert stat.S_IMODE(os.stat(warm_cache.PATH).st_mode) == 0o600
+
+    restored_before = len(warm_cache.stats()["restored"])
+    warm_cache.restore()
+    assert len(warm_cache.stats()["restored"]) > restored_before
+
+
+def test_cache_writable_by_others_is_ignored(client, seeded):
+    warm_cache.save()
+    os.chmod(warm_cache.PATH, 0o666)
+    try:
+        restored_before = len(warm_cache.stats()["restored"])
+        warm_cache.restore()
+        assert len(warm_cache.stats()["restored"]) == restored_before
+    finally:
+        os.chmod(warm_cache.PATH, 0o600)